@@ -45,7 +45,8 @@ def run_single_experiment(
         def get_system_prompt(self):
             return system_prompt
 
-    agent = CustomAgent()
+    # Bypass the completion cache: a cache hit would be timed as a response
+    agent = CustomAgent(OpenAIClient(use_cache=False))
 
     # Time the response
     start_time = time.time()
@@ -102,7 +103,13 @@ def run_all_experiments():
     for i, query in enumerate(TEST_QUERIES, 1):
         print(f"  [{i}/{len(TEST_QUERIES)}] {QUERY_DESCRIPTIONS[i-1]}")
         query_results[query] = serpapi_client.search(query, num_results=7)
-        time.sleep(0.5)  # Rate limiting
+        if not serpapi_client.last_from_cache:
+            time.sleep(0.5)  # Rate limiting (only needed for real SerpAPI calls)
+
+    if serpapi_client.cache is not None:
+        cache_stats = serpapi_client.cache.stats()
+        print(f"  Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"(saved {cache_stats['saved_seconds']:.1f}s)")
 
     print(f"\n✓ All search results fetched\n")
     print("=" * 80 + "\n")
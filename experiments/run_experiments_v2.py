@@ -15,6 +15,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.config import Config
 from src.search.serpapi_client import SerpAPIClient
 from src.agents.comprehensive_agent import ComprehensiveAgent
+from src.llm.openai_client import OpenAIClient
 from experiment_queries import TEST_QUERIES, QUERY_DESCRIPTIONS
 from experiment_prompts_v2 import SYSTEM_PROMPTS_V2, PROMPT_DESCRIPTIONS_V2
 
@@ -74,7 +75,8 @@ def run_single_experiment(
         def get_system_prompt(self):
             return system_prompt
 
-    agent = CustomAgent()
+    # Bypass the completion cache: a cache hit would be timed as a response
+    agent = CustomAgent(OpenAIClient(use_cache=False))
     start_time = time.time()
 
     try:
@@ -135,7 +137,13 @@ def run_all_experiments():
     for i, query in enumerate(TEST_QUERIES, 1):
         print(f"  [{i}/{len(TEST_QUERIES)}] {QUERY_DESCRIPTIONS[i-1]}")
         query_results[query] = serpapi_client.search(query, num_results=7)
-        time.sleep(0.5)
+        if not serpapi_client.last_from_cache:
+            time.sleep(0.5)  # Rate limiting (only needed for real SerpAPI calls)
+
+    if serpapi_client.cache is not None:
+        cache_stats = serpapi_client.cache.stats()
+        print(f"  Search cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+              f"(saved {cache_stats['saved_seconds']:.1f}s)")
 
     print(f"\n✓ Search results fetched\n")
     print("=" * 80 + "\n")
@@ -1,20 +1,32 @@
 """Base agent class defining the interface for all search result processing agents."""
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, AsyncIterator, Optional, Tuple
+from src.config import Config
 from src.llm.openai_client import OpenAIClient
+from src.search.context_blocks import select_blocks, format_block
+from src.utils.token_counter import count_tokens, truncate_to_tokens
+from src.utils.source_compactor import format_source_header
+from src.utils.stream_guard import EarlyStopGuard, STOP_SEQUENCES
 
 
 class BaseAgent(ABC):
     """Abstract base class for all agents that process search results."""
 
-    def __init__(self, llm_client: OpenAIClient = None):
+    def __init__(self, llm_client: OpenAIClient = None, max_tokens: int = 2000, output_cap: int = None):
         """Initialize the agent.
 
         Args:
             llm_client: OpenAI client instance. If not provided, creates a new one.
+            max_tokens: Upper bound on tokens in the generated answer (the
+                actual limit may be lower if the prompt is large)
+            output_cap: Optional soft cap on answer tokens; the answer is cut
+                at the first line break past it (see EarlyStopGuard)
         """
         self.llm_client = llm_client or OpenAIClient()
+        self.max_tokens = max_tokens
+        self.output_cap = output_cap
+        self.last_prompt_report: Dict[str, Any] = {}
 
     @abstractmethod
     def get_strategy_name(self) -> str:
@@ -34,12 +46,28 @@ class BaseAgent(ABC):
         """
         pass
 
-    def process_query(self, query: str, search_results: List[Dict[str, Any]]) -> str:
+    def get_required_sections(self) -> List[str]:
+        """Return the section headings every answer from this agent must have.
+
+        Used by the race's quality gate (see ResponseValidator.check_quality).
+
+        Returns:
+            Section heading texts; empty if the answer format is free-form
+        """
+        return []
+
+    def process_query(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
         """Process a query using search results and return an answer with citations.
 
         Args:
             query: The user's search query
             search_results: List of search results from SerpAPI
+            context_blocks: Optional extra context blocks from SerpAPIClient.search_full()
 
         Returns:
             Answer with numbered citations in format [1], [2], etc.
@@ -47,55 +75,396 @@ class BaseAgent(ABC):
         Raises:
             Exception: If LLM API call fails
         """
-        # Format search results for the prompt
-        results_text = self._format_search_results(search_results)
+        user_prompt, max_tokens = self._prepare_request(query, search_results, context_blocks)
 
-        # Build the user prompt
-        user_prompt = f"""Query: {query}
+        try:
+            response = self.llm_client.generate(
+                prompt=user_prompt,
+                system_prompt=self.get_system_prompt(),
+                max_tokens=max_tokens,
+                temperature=0.7,
+                stop=STOP_SEQUENCES
+            )
+            return self._apply_guard(response)
 
-Search Results:
-{results_text}
+        except Exception as e:
+            raise Exception(f"{self.get_strategy_name()} agent failed: {str(e)}") from e
 
-Provide a comprehensive answer to the query using the search results above. You MUST cite sources using numbered citations in the format [1], [2], etc., where the number corresponds to the search result index.
+    def process_query_stream(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        usage: Optional[Dict[str, Any]] = None,
+        context_blocks: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = True
+    ) -> Iterator[str]:
+        """Stream the answer for a query as text deltas.
 
-Your answer should:
-1. Directly address the user's query
-2. Use information from the search results
-3. Include numbered citations [N] immediately after facts, quotes, or claims
-4. Be well-structured and coherent
-5. Provide the citation list at the end in the format:
+        Uses the same prompt as process_query(), so the concatenated deltas
+        form the same kind of answer with numbered citations.
+
+        Generation stops before a citation list header (the list is added
+        locally) and, if the agent has an output_cap, at the first line
+        break past it; usage then gets 'early_stop' ('citations' or
+        'length') and 'early_stop_tokens'.
 
-Citations:
-[1] Title - URL
-[2] Title - URL
-..."""
+        Args:
+            query: The user's search query
+            search_results: List of search results from SerpAPI
+            usage: Optional dict receiving token usage (see OpenAIClient.generate_stream),
+                the prompt budget report (see _build_request) and any early stop
+            context_blocks: Optional extra context blocks from SerpAPIClient.search_full()
+            use_cache: Set to False to bypass the completion cache, e.g. for
+                a fresh attempt replacing a rejected answer
+
+        Yields:
+            Text deltas of the answer as the LLM generates them
+
+        Raises:
+            Exception: If LLM API call fails
+        """
+        user_prompt, max_tokens = self._prepare_request(query, search_results, context_blocks, usage)
+        guard = EarlyStopGuard(self.output_cap)
+        stream = self.llm_client.generate_stream(
+            prompt=user_prompt,
+            system_prompt=self.get_system_prompt(),
+            max_tokens=max_tokens,
+            temperature=0.7,
+            usage=usage,
+            use_cache=use_cache,
+            stop=STOP_SEQUENCES
+        )
 
         try:
-            response = self.llm_client.generate(
+            for delta in stream:
+                text = guard.feed(delta)
+                if text:
+                    yield text
+                if guard.stopped:
+                    break
+            tail = guard.flush()
+            if tail:
+                yield tail
+
+        except Exception as e:
+            raise Exception(f"{self.get_strategy_name()} agent failed: {str(e)}") from e
+        finally:
+            # Closing the generator early also closes the HTTP stream
+            stream.close()
+            self._record_early_stop(guard, usage)
+
+    async def aprocess_query(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """Async variant of process_query().
+
+        Args:
+            query: The user's search query
+            search_results: List of search results from SerpAPI
+            context_blocks: Optional extra context blocks from SerpAPIClient.search_full()
+
+        Returns:
+            Answer with numbered citations in format [1], [2], etc.
+
+        Raises:
+            Exception: If LLM API call fails
+        """
+        user_prompt, max_tokens = self._prepare_request(query, search_results, context_blocks)
+
+        try:
+            response = await self.llm_client.agenerate(
                 prompt=user_prompt,
                 system_prompt=self.get_system_prompt(),
-                max_tokens=2000,
-                temperature=0.7
+                max_tokens=max_tokens,
+                temperature=0.7,
+                stop=STOP_SEQUENCES
             )
-            return response
+            return self._apply_guard(response)
 
         except Exception as e:
             raise Exception(f"{self.get_strategy_name()} agent failed: {str(e)}") from e
 
-    def _format_search_results(self, search_results: List[Dict[str, Any]]) -> str:
+    async def aprocess_query_stream(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        usage: Optional[Dict[str, Any]] = None,
+        context_blocks: Optional[List[Dict[str, Any]]] = None,
+        use_cache: bool = True
+    ) -> AsyncIterator[str]:
+        """Async variant of process_query_stream().
+
+        Args:
+            query: The user's search query
+            search_results: List of search results from SerpAPI
+            usage: Optional dict receiving token usage (see OpenAIClient.generate_stream),
+                the prompt budget report (see _build_request) and any early stop
+            context_blocks: Optional extra context blocks from SerpAPIClient.search_full()
+            use_cache: Set to False to bypass the completion cache, e.g. for
+                a fresh attempt replacing a rejected answer
+
+        Yields:
+            Text deltas of the answer as the LLM generates them
+
+        Raises:
+            Exception: If LLM API call fails
+        """
+        user_prompt, max_tokens = self._prepare_request(query, search_results, context_blocks, usage)
+        guard = EarlyStopGuard(self.output_cap)
+        stream = self.llm_client.agenerate_stream(
+            prompt=user_prompt,
+            system_prompt=self.get_system_prompt(),
+            max_tokens=max_tokens,
+            temperature=0.7,
+            usage=usage,
+            use_cache=use_cache,
+            stop=STOP_SEQUENCES
+        )
+
+        try:
+            async for delta in stream:
+                text = guard.feed(delta)
+                if text:
+                    yield text
+                if guard.stopped:
+                    break
+            tail = guard.flush()
+            if tail:
+                yield tail
+
+        except Exception as e:
+            raise Exception(f"{self.get_strategy_name()} agent failed: {str(e)}") from e
+        finally:
+            await stream.aclose()
+            self._record_early_stop(guard, usage)
+
+    def _apply_guard(self, response: str) -> str:
+        """Cut a complete (non-streamed) answer the way the streaming guard would."""
+        guard = EarlyStopGuard(self.output_cap)
+        text = guard.feed(response) + guard.flush()
+        self._record_early_stop(guard, self.last_prompt_report)
+        return text
+
+    @staticmethod
+    def _record_early_stop(guard: EarlyStopGuard, usage: Optional[Dict[str, Any]]):
+        """Note in usage why the answer was stopped early, if it was."""
+        if usage is not None and guard.stopped:
+            usage["early_stop"] = guard.reason
+            usage["early_stop_tokens"] = guard.tokens
+
+    def _prepare_request(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None,
+        usage: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, int]:
+        """Build the budgeted prompt and record its report on the agent (and in usage)."""
+        user_prompt, max_tokens, report = self._build_request(query, search_results, context_blocks)
+        self.last_prompt_report = report
+        if usage is not None:
+            usage.update(report)
+        return user_prompt, max_tokens
+
+    def _build_request(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None
+    ) -> Tuple[str, int, Dict[str, Any]]:
+        """Assemble the prompt against the input-token budget and size the answer.
+
+        The system prompt, instructions and query are always included; search
+        results fill the rest of Config.PROMPT_TOKEN_BUDGET in rank order (see
+        _pack_search_results). max_tokens is whatever remains of
+        Config.TOTAL_TOKEN_BUDGET, capped by the agent's max_tokens for the
+        query class and floored at Config.MIN_OUTPUT_TOKENS.
+
+        Args:
+            query: The user's search query
+            search_results: List of search results from SerpAPI
+            context_blocks: Optional extra context blocks
+
+        Returns:
+            Tuple of (user_prompt, max_tokens, report) where report has
+            'prompt_tokens_estimate', 'prompt_budget', 'max_tokens',
+            'results_used', 'results_truncated', 'results_dropped' and
+            'context_blocks_used'
+        """
+        system_tokens = count_tokens(self.get_system_prompt())
+        overhead = system_tokens + count_tokens(self._render_user_prompt(query, ""))
+        results_text, report = self._pack_search_results(
+            search_results,
+            context_blocks,
+            query,
+            Config.PROMPT_TOKEN_BUDGET - overhead
+        )
+
+        user_prompt = self._render_user_prompt(query, results_text)
+        prompt_tokens = system_tokens + count_tokens(user_prompt)
+        max_tokens = min(self.max_tokens, Config.TOTAL_TOKEN_BUDGET - prompt_tokens)
+        max_tokens = max(max_tokens, Config.MIN_OUTPUT_TOKENS)
+
+        report.update({
+            "prompt_tokens_estimate": prompt_tokens,
+            "prompt_budget": Config.PROMPT_TOKEN_BUDGET,
+            "max_tokens": max_tokens,
+        })
+        return user_prompt, max_tokens, report
+
+    def _build_user_prompt(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None
+    ) -> str:
+        """Build the user prompt sent to the LLM.
+
+        Args:
+            query: The user's search query
+            search_results: List of search results from SerpAPI
+            context_blocks: Optional extra context blocks
+
+        Returns:
+            The user prompt with the formatted search results
+        """
+        return self._build_request(query, search_results, context_blocks)[0]
+
+    def _render_user_prompt(self, query: str, results_text: str) -> str:
+        """Fill the user prompt template with the query and formatted results."""
+        return f"""Query: {query}
+
+Search Results:
+{results_text}
+
+Provide a comprehensive answer to the query using the search results above. You MUST cite sources using numbered citations in the format [1], [2], etc., where the number corresponds to the search result index.
+
+Your answer should:
+1. Directly address the user's query
+2. Use information from the search results
+3. Include numbered citations [N] immediately after facts, quotes, or claims
+4. Be well-structured and coherent
+5. End after the last point: do NOT write a citation, reference or source list (it is added automatically from the [N] markers)"""
+
+    def _format_search_results(
+        self,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None,
+        query: str = "",
+        budget_tokens: int = None
+    ) -> str:
         """Format search results for inclusion in the prompt.
 
         Args:
             search_results: List of search result dictionaries
+            context_blocks: Optional extra context blocks
+            query: The user's query, used to rank the context blocks
+            budget_tokens: Token budget for the formatted results. If not
+                provided, uses Config.PROMPT_TOKEN_BUDGET
 
         Returns:
             Formatted string of search results
         """
+        budget = budget_tokens if budget_tokens is not None else Config.PROMPT_TOKEN_BUDGET
+        return self._pack_search_results(search_results, context_blocks, query, budget)[0]
+
+    def _pack_search_results(
+        self,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]],
+        query: str,
+        budget_tokens: int
+    ) -> Tuple[str, Dict[str, int]]:
+        """Format search results in rank order until the token budget is spent.
+
+        A result that does not fit whole has its snippet truncated if at
+        least Config.MIN_SNIPPET_TOKENS of it would remain; otherwise it and
+        every lower-ranked result are dropped. Extra context blocks
+        (answer snippets, related questions, top stories) then get the most
+        useful ones that fit in what is left, up to
+        Config.CONTEXT_BLOCK_TOKEN_BUDGET. Finally, passages fetched from
+        the result pages (see PageFetcher) are added as 'Extracts:' lines,
+        in rank order, while budget remains.
+
+        With Config.PROMPT_COMPACT_SOURCES, each source is identified by its
+        [N] index, a shortened title and its site name instead of the full
+        URL. Citations still resolve to the real links, which are looked up
+        by index when the citation list is rendered.
+
+        Args:
+            search_results: List of search result dictionaries, best first
+            context_blocks: Optional extra context blocks
+            query: The user's query, used to rank the context blocks
+            budget_tokens: Token budget for the formatted results
+
+        Returns:
+            Tuple of (formatted text, counts of results used/truncated/dropped,
+            context blocks used and extracts used, and 'source_tokens_saved'
+            by compact headers)
+        """
+        compact = Config.PROMPT_COMPACT_SOURCES
         formatted = []
-        for result in search_results:
-            formatted.append(
-                f"[{result['index']}] {result['title']}\n"
-                f"URL: {result['link']}\n"
-                f"Snippet: {result['snippet']}\n"
+        used = 0
+        truncated = 0
+        dropped = 0
+        for rank, result in enumerate(search_results):
+            header = format_source_header(result, compact=compact)
+            entry = f"{header}{result['snippet']}\n"
+            # +1 for the blank line joining entries
+            cost = count_tokens(entry) + 1
+            if used + cost > budget_tokens:
+                snippet_budget = budget_tokens - used - count_tokens(header) - 2
+                if snippet_budget < Config.MIN_SNIPPET_TOKENS:
+                    dropped = len(search_results) - rank
+                    break
+                entry = f"{header}{truncate_to_tokens(result['snippet'], snippet_budget)}\n"
+                cost = count_tokens(entry) + 1
+                truncated += 1
+            formatted.append(entry)
+            used += cost
+
+        block_budget = min(Config.CONTEXT_BLOCK_TOKEN_BUDGET, budget_tokens - used)
+        blocks = select_blocks(query, context_blocks or [], block_budget)
+        used += sum(count_tokens(format_block(block)) + 1 for block in blocks)
+
+        # Page extracts only use what is left, so they never displace a result
+        extracts = 0
+        for position, result in enumerate(search_results[:len(formatted)]):
+            if not result.get("passages"):
+                continue
+            extract_budget = budget_tokens - used - count_tokens("Extracts: ") - 1
+            if extract_budget < Config.MIN_SNIPPET_TOKENS:
+                break
+            text = truncate_to_tokens(" … ".join(result["passages"]), extract_budget)
+            line = f"Extracts: {text}\n"
+            formatted[position] += line
+            used += count_tokens(line)
+            extracts += 1
+
+        formatted.extend(format_block(block) for block in blocks)
+
+        # Tokens the full headers (title + URL line) would have cost for the same sources
+        saved = 0
+        if compact:
+            used_sources = search_results[:len(search_results) - dropped]
+            saved = sum(
+                count_tokens(format_source_header(source, compact=False))
+                - count_tokens(format_source_header(source))
+                for source in used_sources
+            ) + sum(
+                count_tokens(format_block(block, compact=False)) - count_tokens(format_block(block))
+                for block in blocks
             )
-        return "\n".join(formatted)
+
+        report = {
+            "results_used": len(search_results) - dropped,
+            "results_truncated": truncated,
+            "results_dropped": dropped,
+            "context_blocks_used": len(blocks),
+            "extracts_used": extracts,
+            "source_tokens_saved": saved,
+        }
+        return "\n".join(formatted), report
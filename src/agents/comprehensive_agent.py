@@ -1,5 +1,6 @@
 """Comprehensive agent that focuses on broad coverage of the topic."""
 
+from typing import List
 from src.agents.base_agent import BaseAgent
 
 
@@ -10,6 +11,10 @@ class ComprehensiveAgent(BaseAgent):
         """Return the name of this agent's strategy."""
         return "Comprehensive Agent"
 
+    def get_required_sections(self) -> List[str]:
+        """Return the sections of the v2_sections template."""
+        return ["Direct Answer", "Key Points"]
+
     def get_system_prompt(self) -> str:
         """Return the optimized system prompt (v2_sections - Round 2 winner).
 
@@ -27,7 +32,5 @@ Format template:
 - [Bullet 2 with citation]
 - [Bullet 3-5 as needed]
 
-## Citations
-[Standard list]
-
-Rules: Clear headers, scannable bullets, cite everything."""
+Rules: Clear headers, scannable bullets, cite everything with inline [N] markers.
+Do not write a Citations section; it is generated from your markers."""
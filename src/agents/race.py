@@ -0,0 +1,504 @@
+"""Asyncio orchestration for racing agents against each other."""
+
+import asyncio
+import time
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+from src.agents.base_agent import BaseAgent
+from src.config import Config
+from src.utils.citation_formatter import IncrementalCitationValidator
+from src.utils.latency_profile import LatencyProfile, get_latency_profile
+from src.utils.response_validator import ResponseValidator
+
+
+class AgentRace:
+    """Hedged race of agents on one event loop; the first to stream a token wins.
+
+    Only the first agent is launched up front. A backup agent is launched
+    when no attempt has produced its first token within the learned
+    percentile time-to-first-token for the model (or immediately when an
+    attempt fails), up to one attempt per agent. This keeps the tail-latency
+    benefit of racing without paying for several generations on every query.
+
+    Each agent runs as an asyncio task that pushes (agent_num, kind, payload)
+    events onto a shared queue, where kind is 'delta' (payload is a text
+    chunk), 'done' (payload is None) or 'error' (payload is the exception).
+
+    Each attempt's citations are checked as it streams (see
+    IncrementalCitationValidator) and the finished answer goes through a
+    local quality gate (ResponseValidator.check_quality). The winner is
+    picked at its first token and streams live, but while the gate can
+    still reject it the other attempts already in flight keep running as
+    standbys (their text is buffered); no new backups are launched. If the
+    winner is rejected (or fails) mid-stream, stream_winner() falls back to
+    the standby that has finished or streamed the most, replaying its
+    buffered text. Only when no standby is left is a fresh attempt launched
+    (bypassing the completion cache), up to Config.RACE_MAX_REPLACEMENTS per
+    race; once none is left either, answers are no longer rejected.
+
+    Once the winner has passed the gate (or right away, when both checks
+    are disabled) the remaining tasks are cancelled, which closes their HTTP
+    streams so the provider stops generating (and billing) tokens.
+    """
+
+    def __init__(
+        self,
+        agents: List[BaseAgent],
+        latency_profile: LatencyProfile = None,
+        hedge_percentile: float = None
+    ):
+        """Initialize the race.
+
+        Args:
+            agents: Agents to race, in launch order; they are numbered from 1
+            latency_profile: Rolling latency profile. If not provided, uses the shared one
+            hedge_percentile: Time-to-first-token percentile that triggers a
+                backup. If not provided, uses Config.HEDGE_PERCENTILE
+        """
+        self.agents = agents
+        self.latency_profile = latency_profile or get_latency_profile()
+        self.hedge_percentile = hedge_percentile or Config.HEDGE_PERCENTILE
+        self.first_token = asyncio.Event()
+        self.winner_num: Optional[int] = None
+        self.failures: Dict[int, Exception] = {}
+        self.usage: Dict[int, Dict[str, Any]] = {}
+        self.cancelled: List[int] = []
+        self.rejections: Dict[int, str] = {}
+        self.gate_results: Dict[int, bool] = {}
+        self.fastest_num: Optional[int] = None
+        self.replacements = 0
+        self.hedge_delays: List[float] = []
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._attempt_failed = asyncio.Event()
+        self._hedger: Optional[asyncio.Task] = None
+        self._next_agent = 0
+        self._buffers: Dict[int, List[str]] = {}
+        self._finished: List[int] = []
+        self._num_sources: Optional[int] = None
+        self._query = ""
+        self._search_results: List[Dict[str, Any]] = []
+        self._context_blocks: List[Dict[str, Any]] = []
+
+    def start(
+        self,
+        query: str,
+        search_results: List[Dict[str, Any]],
+        context_blocks: Optional[List[Dict[str, Any]]] = None
+    ):
+        """Launch the first agent and the hedging policy as background tasks.
+
+        Args:
+            query: User query
+            search_results: Search results from SerpAPI
+            context_blocks: Optional extra context blocks from SerpAPI
+        """
+        self._query = query
+        self._search_results = search_results
+        self._context_blocks = context_blocks or []
+        # Results and context blocks share one [N] numbering
+        self._num_sources = max(
+            (source["index"] for source in self._search_results + self._context_blocks),
+            default=0
+        ) or None
+        self._launch_next()
+        self._hedger = asyncio.create_task(self._hedge())
+
+    @property
+    def launched(self) -> int:
+        """Number of attempts launched so far (including replacements)."""
+        return len(self._tasks)
+
+    def _launch_next(self) -> bool:
+        """Launch the next unused agent, returning False if none are left."""
+        if self._next_agent >= len(self.agents):
+            return False
+
+        self._next_agent += 1
+        self._launch(self.agents[self._next_agent - 1])
+        return True
+
+    def _launch(self, agent: BaseAgent, use_cache: bool = True):
+        """Start an attempt for the agent; attempts are numbered from 1 in launch order."""
+        agent_num = self.launched + 1
+        self.usage[agent_num] = {}
+        self._tasks[agent_num] = asyncio.create_task(self._run_agent(agent_num, agent, use_cache))
+
+    def hedge_delay(self, agent: BaseAgent) -> float:
+        """Return how long to wait for a first token before launching a backup.
+
+        Args:
+            agent: The agent whose model's latency profile is consulted
+
+        Returns:
+            Delay in seconds (learned percentile, or the configured default)
+        """
+        delay = self.latency_profile.percentile(
+            self._profile_key("ttft", agent),
+            self.hedge_percentile,
+            default=Config.HEDGE_DEFAULT_DELAY
+        )
+        return max(delay, Config.HEDGE_MIN_DELAY)
+
+    async def _hedge(self):
+        """Launch backups while no attempt has produced a first token in time."""
+        while not self.first_token.is_set() and self._next_agent < len(self.agents):
+            delay = self.hedge_delay(self.agents[self._next_agent - 1])
+            waiters = [
+                asyncio.create_task(self.first_token.wait()),
+                asyncio.create_task(self._attempt_failed.wait()),
+            ]
+            try:
+                await asyncio.wait(waiters, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for waiter in waiters:
+                    waiter.cancel()
+
+            if self.first_token.is_set():
+                return
+            if self._attempt_failed.is_set():
+                self._attempt_failed.clear()
+            else:
+                self.hedge_delays.append(delay)
+            self._launch_next()
+
+    async def _run_agent(self, agent_num: int, agent: BaseAgent, use_cache: bool = True):
+        """Stream one agent's answer onto the event queue, recording its latency."""
+        start = time.time()
+        got_first_token = False
+        validator = None
+        if Config.CITATION_VALIDATION_ENABLED:
+            validator = IncrementalCitationValidator(self._num_sources, Config.CITATION_GRACE_TOKENS)
+        parts = []
+        stream = agent.aprocess_query_stream(
+            self._query,
+            self._search_results,
+            usage=self.usage[agent_num],
+            context_blocks=self._context_blocks,
+            use_cache=use_cache
+        )
+        try:
+            try:
+                async for delta in stream:
+                    issue = validator.feed(delta) if validator is not None else None
+                    if issue and agent_num not in self.gate_results:
+                        issue = self._gate_failed(agent_num, agent, f"{agent.get_strategy_name()}: {issue}")
+                        if self._can_reject(agent_num):
+                            raise self._reject(agent_num, agent, issue)
+                    if not got_first_token:
+                        got_first_token = True
+                        self.latency_profile.record(self._profile_key("ttft", agent), time.time() - start)
+                        self.first_token.set()
+                    parts.append(delta)
+                    await self._events.put((agent_num, "delta", delta))
+            finally:
+                # Closes the HTTP stream right away when the attempt is rejected
+                await stream.aclose()
+
+            validation = None
+            if parts and agent_num not in self.gate_results:
+                validation = self._check_answer(agent_num, agent, "".join(parts))
+            if validation is not None:
+                if validation["valid"]:
+                    self.gate_results[agent_num] = True
+                else:
+                    issue = self._gate_failed(agent_num, agent, validation["issues"][0])
+                    if self._can_reject(agent_num):
+                        raise self._reject(agent_num, agent, issue)
+            self.latency_profile.record(self._profile_key("total", agent), time.time() - start)
+            await self._events.put((agent_num, "done", None))
+        except Exception as e:
+            # Agent errors already name the agent ("Comprehensive Agent agent failed: ...")
+            await self._events.put((agent_num, "error", e))
+
+        if not got_first_token and not self._others_in_flight(agent_num):
+            # Nothing left in flight: hand the slot to a backup right away
+            self._attempt_failed.set()
+
+    def _check_answer(self, agent_num: int, agent: BaseAgent, text: str) -> Optional[Dict[str, Any]]:
+        """Run the quality gate (or just the citation checks) on a finished answer, if enabled."""
+        if Config.QUALITY_GATE_ENABLED:
+            return ResponseValidator.check_quality(
+                text,
+                agent.get_strategy_name(),
+                self._num_sources,
+                agent.get_required_sections(),
+                self.usage[agent_num].get("max_tokens")
+            )
+        if Config.CITATION_VALIDATION_ENABLED:
+            return ResponseValidator.validate_agent_response(text, agent.get_strategy_name(), self._num_sources)
+        return None
+
+    def _gate_failed(self, agent_num: int, agent: BaseAgent, issue: str) -> str:
+        """Record that an attempt failed its checks, returning the issue.
+
+        A completion that streamed to the end was already written to the
+        completion cache (and a replayed one came from it); it is evicted so
+        that re-asking the query does not replay the rejected answer.
+        """
+        self.gate_results[agent_num] = False
+        agent.llm_client.discard_cached(self.usage[agent_num].get("cache_key"))
+        return issue
+
+    def _can_reject(self, agent_num: int) -> bool:
+        """Return True if a flawed attempt can be dropped without leaving the query unanswered.
+
+        That is the case while another attempt can still answer (see
+        _has_fallback) or a fresh one may be launched in its slot.
+        """
+        return self._has_fallback(agent_num) or self.replacements < Config.RACE_MAX_REPLACEMENTS
+
+    def _has_fallback(self, agent_num: int) -> bool:
+        """Return True if another attempt is still running or has finished with an answer."""
+        return self._others_in_flight(agent_num) or any(
+            other_num != agent_num for other_num in self._finished
+        )
+
+    def _reject(self, agent_num: int, agent: BaseAgent, issue: str) -> Exception:
+        """Record a rejected attempt, launching a fresh one if no other can take over.
+
+        The replacement bypasses the completion cache so it cannot replay
+        the rejected answer.
+
+        Returns:
+            The exception to report for the rejected attempt
+        """
+        self.rejections[agent_num] = issue
+        if not self._has_fallback(agent_num):
+            self.replacements += 1
+            self._launch(agent, use_cache=False)
+        return Exception(issue)
+
+    def _others_in_flight(self, agent_num: int) -> bool:
+        """Return True if any agent other than agent_num is still running."""
+        return any(
+            not task.done()
+            for other_num, task in self._tasks.items()
+            if other_num != agent_num
+        )
+
+    async def wait_for_winner(
+        self,
+        on_failure: Optional[Callable[[int, Exception], None]] = None
+    ) -> str:
+        """Wait until some agent streams its first token.
+
+        Args:
+            on_failure: Optional callback invoked with (agent_num, error) for
+                each agent that fails before producing any text
+
+        Returns:
+            The winner's first text delta
+
+        Raises:
+            Exception: If every agent fails to produce text
+        """
+        while True:
+            agent_num, kind, payload = await self._events.get()
+            if kind == "delta":
+                self.winner_num = agent_num
+                if self.fastest_num is None:
+                    self.fastest_num = agent_num
+                if self._hedger is not None:
+                    self._hedger.cancel()
+                if not (Config.QUALITY_GATE_ENABLED or Config.CITATION_VALIDATION_ENABLED):
+                    # Nothing can reject the winner, so standbys would only cost tokens
+                    await self.cancel_losers()
+                return payload
+
+            self._record_failure(agent_num, payload, on_failure)
+
+            # Every attempt that will ever run has failed or been cancelled
+            if len(self.failures) + len(self.cancelled) == len(self.agents) + self.replacements:
+                raise Exception("All agents failed to generate a response")
+
+    async def stream_winner(
+        self,
+        on_restart: Optional[Callable[[int, Exception], None]] = None,
+        on_failure: Optional[Callable[[int, Exception], None]] = None
+    ) -> AsyncIterator[str]:
+        """Yield the winner's remaining text deltas until it finishes.
+
+        Standby attempts' deltas are buffered meanwhile. If the winner is
+        rejected (or fails) mid-stream while a standby or replacement can
+        take over, on_restart is called and the new winner's answer is
+        streamed from its start: the caller should discard the text it has
+        so far. The standbys are cancelled once the winner has finished.
+
+        Args:
+            on_restart: Optional callback invoked with (agent_num, error)
+                when the winner's answer is dropped for another attempt
+            on_failure: Optional callback for standby attempts that fail or
+                are rejected (see wait_for_winner)
+
+        Raises:
+            Exception: If the winning agent fails mid-stream and no other
+                attempt is left
+        """
+        while True:
+            agent_num, kind, payload = await self._events.get()
+            if agent_num != self.winner_num:
+                self._record_standby(agent_num, kind, payload, on_failure)
+                continue
+            if kind == "delta":
+                yield payload
+                continue
+            if kind == "done":
+                await self.cancel_losers()
+                return
+            if agent_num not in self.rejections and not self._has_fallback(agent_num):
+                raise payload
+
+            if on_restart:
+                on_restart(agent_num, payload)
+            yield await self._fall_back(agent_num, payload, on_failure)
+            if self.winner_num in self._finished:
+                await self.cancel_losers()
+                return
+
+    def _record_standby(
+        self,
+        agent_num: int,
+        kind: str,
+        payload: Any,
+        on_failure: Optional[Callable[[int, Exception], None]] = None
+    ):
+        """Buffer a standby attempt's event while the winner streams."""
+        if kind == "delta":
+            self._buffers.setdefault(agent_num, []).append(payload)
+        elif kind == "done" and self._buffers.get(agent_num):
+            self._finished.append(agent_num)
+        else:
+            self._record_failure(agent_num, payload, on_failure)
+
+    def _record_failure(
+        self,
+        agent_num: int,
+        payload: Optional[Exception],
+        on_failure: Optional[Callable[[int, Exception], None]] = None
+    ):
+        """Record an attempt that failed, was rejected or finished without any text."""
+        if payload is None:
+            payload = Exception("Returned an empty response")
+        self.failures[agent_num] = payload
+        if on_failure:
+            on_failure(agent_num, payload)
+
+    async def _fall_back(
+        self,
+        agent_num: int,
+        error: Exception,
+        on_failure: Optional[Callable[[int, Exception], None]] = None
+    ) -> str:
+        """Drop the winner for the best standby, or race a replacement (with hedging) for the win.
+
+        Returns:
+            The new winner's text so far (its buffered deltas)
+        """
+        self.failures[agent_num] = error
+        standbys = [
+            other_num for other_num in self._buffers
+            if other_num not in self.failures and other_num != agent_num
+        ]
+        if standbys:
+            # A finished answer first (it already passed the gate), else the furthest along
+            self.winner_num = max(
+                standbys,
+                key=lambda other_num: (other_num in self._finished, len(self._buffers[other_num]))
+            )
+            return "".join(self._buffers[self.winner_num])
+
+        self.winner_num = None
+        self.first_token.clear()
+        self._hedger = asyncio.create_task(self._hedge())
+        return await self.wait_for_winner(on_failure)
+
+    async def cancel_losers(self):
+        """Cancel every running agent except the winner (e.g. standbys), and stop hedging.
+
+        Cancellation interrupts the agent mid-stream; closing the stream
+        aborts the HTTP request so the provider stops generating tokens.
+        """
+        if self._hedger is not None:
+            self._hedger.cancel()
+
+        losers = [
+            (agent_num, task) for agent_num, task in self._tasks.items()
+            if agent_num != self.winner_num and not task.done()
+        ]
+        for agent_num, task in losers:
+            task.cancel()
+            self.cancelled.append(agent_num)
+        await asyncio.gather(*(task for _, task in losers), return_exceptions=True)
+
+    def token_report(self) -> Dict[str, int]:
+        """Estimate the output tokens saved by cancelling the losing agents.
+
+        Each cancelled agent is assumed to have been heading for an answer
+        as long as the winner's, so its saving is the winner's output tokens
+        minus what it had already generated when it was cancelled. Output
+        tokens are taken from the provider's usage report when available,
+        otherwise from the number of streamed deltas (about one token each).
+
+        Returns:
+            Dict with 'launched' (attempts started), 'cancelled' (attempts
+            stopped early), 'rejected' (attempts aborted by the citation
+            checks or quality gate), 'fastest_rejected' (whether the first
+            attempt to stream failed them), 'generated_by_cancelled' (tokens
+            cancelled attempts produced) and 'saved' (estimate)
+        """
+        winner_usage = self.usage.get(self.winner_num, {})
+        winner_tokens = winner_usage.get("completion_tokens", winner_usage.get("chunks", 0))
+
+        generated = 0
+        saved = 0
+        for agent_num in self.cancelled:
+            loser_tokens = self.usage[agent_num].get("chunks", 0)
+            generated += loser_tokens
+            saved += max(winner_tokens - loser_tokens, 0)
+
+        return {
+            "launched": self.launched,
+            "cancelled": len(self.cancelled),
+            "rejected": len(self.rejections),
+            "fastest_rejected": self.gate_results.get(self.fastest_num) is False,
+            "generated_by_cancelled": generated,
+            "saved": saved,
+        }
+
+    def fastest_rejection_rate(self) -> Tuple[float, int]:
+        """Return how often the fastest attempt failed the checks over recent races.
+
+        A high rate means the first answer to stream is often not usable,
+        so racing more attempts (NUM_AGENTS, hedging) buys quality; a rate
+        near zero means extra width only buys latency.
+
+        Returns:
+            Tuple of (rejection rate 0-1, number of races it covers)
+        """
+        key = self._profile_key("fastest_rejected", self.agents[0])
+        return self.latency_profile.mean(key, default=0.0), self.latency_profile.count(key)
+
+    async def cancel(self):
+        """Cancel all agent tasks that are still running and persist latencies.
+
+        Also records whether the fastest attempt passed the checks (see
+        fastest_rejection_rate), once per race in which it got that far.
+        """
+        tasks = list(self._tasks.values())
+        if self._hedger is not None:
+            tasks.append(self._hedger)
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self.fastest_num in self.gate_results:
+            self.latency_profile.record(
+                self._profile_key("fastest_rejected", self.agents[0]),
+                0.0 if self.gate_results[self.fastest_num] else 1.0
+            )
+        self.latency_profile.save()
+
+    @staticmethod
+    def _profile_key(metric: str, agent: BaseAgent) -> str:
+        """Latency profile key for a metric of the agent's model."""
+        return f"{metric}:{agent.llm_client.model}"
@@ -0,0 +1,157 @@
+"""Answers keyed on the query plus a fingerprint of the search results behind them."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Any, Optional
+from src.cache.search_cache import normalize_query
+from src.config import Config
+
+
+def fingerprint_results(search_results: List[Dict[str, Any]]) -> str:
+    """Hash the evidence in a result set (links and snippets, in rank order).
+
+    Titles, positions and other metadata are ignored: if every source says
+    the same thing in the same order, an answer generated from them is
+    still valid.
+
+    Args:
+        search_results: Results as returned by SerpAPIClient.search
+
+    Returns:
+        Hex digest identifying the result set
+    """
+    evidence = [[r.get("link", ""), r.get("snippet", "")] for r in search_results]
+    payload = json.dumps(evidence, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """On-disk cache of agent answers keyed on (model, strategy, query, result-set fingerprint).
+
+    Search is cheap and fast compared to generation, so a re-asked query is
+    searched again and only regenerated when the evidence actually changed.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_entries: int = None):
+        """Initialize the answer cache.
+
+        Args:
+            path: SQLite database path. If not provided, uses Config.CACHE_DIR/answer_cache.sqlite3
+            ttl_seconds: Entry lifetime. If not provided, uses Config.ANSWER_CACHE_TTL
+            max_entries: Size cap (LRU eviction). If not provided, uses Config.ANSWER_CACHE_MAX_ENTRIES
+        """
+        self.path = path or os.path.join(Config.CACHE_DIR, "answer_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.ANSWER_CACHE_TTL
+        self.max_entries = (
+            max_entries if max_entries is not None else Config.ANSWER_CACHE_MAX_ENTRIES
+        )
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS answer_cache (
+                cache_key TEXT PRIMARY KEY,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_answer_cache_last_accessed
+                ON answer_cache(last_accessed);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, strategy: str, query: str, fingerprint: str) -> str:
+        """Hash the model, agent strategy, normalized query and result fingerprint into a key."""
+        payload = json.dumps([model, strategy, normalize_query(query), fingerprint])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored answer for a key, or None on a miss.
+
+        Args:
+            key: Key built with make_key()
+
+        Returns:
+            Dict with 'answer' and 'age_seconds', or None
+        """
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, created_at FROM answer_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM answer_cache WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE answer_cache SET last_accessed = ? WHERE cache_key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return {"answer": row[0], "age_seconds": now - row[1]}
+
+    def set(self, key: str, answer: str):
+        """Store an answer, evicting expired and least recently used entries.
+
+        Args:
+            key: Key built with make_key()
+            answer: The agent's full answer
+        """
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answer_cache "
+                "(cache_key, answer, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, answer, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM answer_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+            self._conn.execute(
+                "DELETE FROM answer_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM answer_cache ORDER BY last_accessed DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all stored answers."""
+        with self._lock:
+            self._conn.execute("DELETE FROM answer_cache")
+            self._conn.commit()
+
+
+_shared_cache: Optional[AnswerCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Return the process-wide answer cache."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AnswerCache()
+        return _shared_cache
@@ -0,0 +1,208 @@
+"""Exact-match cache for LLM completions (in-memory LRU plus SQLite tier)."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+from src.config import Config
+
+
+class CompletionCache:
+    """Two-tier cache of LLM completions keyed on the exact request.
+
+    The key is a hash of (model, system_prompt, prompt, max_tokens,
+    temperature), so only byte-identical requests share an entry. Lookups
+    check a small in-memory LRU first and fall back to an on-disk SQLite
+    tier that survives between runs. Both tiers honour the same TTL.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        ttl_seconds: int = None,
+        max_entries: int = None,
+        memory_entries: int = None
+    ):
+        """Initialize the completion cache.
+
+        Args:
+            path: SQLite database path. If not provided, uses Config.CACHE_DIR/completion_cache.sqlite3
+            ttl_seconds: Entry lifetime. If not provided, uses Config.LLM_CACHE_TTL
+            max_entries: Disk tier size cap. If not provided, uses Config.LLM_CACHE_MAX_ENTRIES
+            memory_entries: Memory tier size cap. If not provided, uses Config.LLM_CACHE_MEMORY_ENTRIES
+        """
+        self.path = path or os.path.join(Config.CACHE_DIR, "completion_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.LLM_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else Config.LLM_CACHE_MAX_ENTRIES
+        self.memory_entries = (
+            memory_entries if memory_entries is not None else Config.LLM_CACHE_MEMORY_ENTRIES
+        )
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS completion_cache (
+                cache_key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_completion_cache_last_accessed
+                ON completion_cache(last_accessed);
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str,
+        system_prompt: Optional[str],
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        stop: Optional[List[str]] = None
+    ) -> str:
+        """Hash the request parameters into a cache key."""
+        params = [model, system_prompt or "", prompt, max_tokens, temperature]
+        if stop:
+            # Only part of the key when set, so older entries stay valid
+            params.append(stop)
+        payload = json.dumps(params, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for a key, or None on a miss.
+
+        Args:
+            key: Key built with make_key()
+
+        Returns:
+            The cached completion text, or None
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return response
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT response, created_at FROM completion_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM completion_cache WHERE cache_key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE completion_cache SET last_accessed = ? WHERE cache_key = ?",
+                (now, key)
+            )
+            self._conn.commit()
+            self._remember(key, row[0], row[1])
+            self.disk_hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str):
+        """Store a completion in both tiers, evicting old and excess entries.
+
+        Args:
+            key: Key built with make_key()
+            response: The completion text
+        """
+        now = time.time()
+
+        with self._lock:
+            self._remember(key, response, now)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completion_cache "
+                "(cache_key, response, created_at, last_accessed) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM completion_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+            # LRU eviction down to the size cap
+            self._conn.execute(
+                "DELETE FROM completion_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM completion_cache ORDER BY last_accessed DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str):
+        """Remove one completion from both tiers, e.g. an answer that was rejected.
+
+        Args:
+            key: Key built with make_key()
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+            self._conn.execute("DELETE FROM completion_cache WHERE cache_key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached completions from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM completion_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process.
+
+        Returns:
+            Dict with 'memory_hits', 'disk_hits', 'hits', 'misses' and 'hit_rate'
+        """
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "hits": hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
+
+    def _remember(self, key: str, response: str, created_at: float):
+        """Insert into the memory tier (caller holds the lock)."""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+
+_shared_cache: Optional[CompletionCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_completion_cache() -> CompletionCache:
+    """Return the process-wide completion cache shared by all OpenAI clients."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = CompletionCache()
+        return _shared_cache
@@ -0,0 +1,93 @@
+"""Freshness classes that decide how long a cached answer stays servable."""
+
+import hashlib
+import os
+import re
+import time
+from typing import Tuple
+from src.config import Config
+
+
+EVERGREEN = "evergreen"
+STANDARD = "standard"
+TIME_SENSITIVE = "time_sensitive"
+
+# Wording that signals the answer depends on when the question is asked
+_TIME_SENSITIVE_PATTERN = re.compile(
+    r"\b(latest|newest|recent(ly)?|current(ly)?|today|tonight|tomorrow|yesterday|now|"
+    r"this (week|month|year|season)|news|breaking|update[sd]?|developments?|trending|"
+    r"live|score[sd]?|price[sd]?|stocks?|weather|forecast|election|poll[sd]?|upcoming|"
+    r"release date|schedule|20[2-9]\d)\b",
+    re.IGNORECASE
+)
+
+# Questions about definitions, geography, history and how things work rarely change
+_EVERGREEN_PATTERN = re.compile(
+    r"\b(capital of|define|definition|meaning of|what does .+ mean|history of|origin of|"
+    r"who (was|invented|discovered|wrote|painted)|when (was|did)|how (does|do|is) .+ work|"
+    r"explain|formula|difference between|how many .+ in a|born)\b",
+    re.IGNORECASE
+)
+
+
+def classify_freshness(query: str) -> str:
+    """Classify how quickly the answer to a query goes out of date.
+
+    Args:
+        query: The user query
+
+    Returns:
+        One of 'time_sensitive', 'evergreen' or 'standard'
+    """
+    if _TIME_SENSITIVE_PATTERN.search(query):
+        return TIME_SENSITIVE
+    if _EVERGREEN_PATTERN.search(query):
+        return EVERGREEN
+    return STANDARD
+
+
+def freshness_ttls(query: str) -> Tuple[str, int, int]:
+    """Return the freshness class of a query and its (soft, hard) TTLs in seconds.
+
+    Args:
+        query: The user query
+
+    Returns:
+        Tuple of (freshness class, soft TTL, hard TTL)
+    """
+    freshness = classify_freshness(query)
+    soft_ttl, hard_ttl = Config.FRESHNESS_TTLS[freshness]
+    return freshness, soft_ttl, hard_ttl
+
+
+def claim_refresh(query: str) -> bool:
+    """Claim the right to refresh a query's cached answer.
+
+    Uses a marker file in the cache directory so that several CLI runs
+    hitting the same stale entry start only one background refresh.
+
+    Args:
+        query: The user query
+
+    Returns:
+        True if the caller should start a refresh, False if one was started
+        within the last Config.REFRESH_LOCK_SECONDS
+    """
+    digest = hashlib.sha256(query.strip().lower().encode("utf-8")).hexdigest()[:16]
+    marker = os.path.join(Config.CACHE_DIR, "refresh", f"{digest}.lock")
+
+    try:
+        os.makedirs(os.path.dirname(marker), exist_ok=True)
+        if time.time() - os.path.getmtime(marker) < Config.REFRESH_LOCK_SECONDS:
+            return False
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return False
+
+    try:
+        with open(marker, "w") as f:
+            f.write(query)
+    except OSError:
+        return False
+    return True
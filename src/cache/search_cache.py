@@ -0,0 +1,217 @@
+"""Persistent SQLite cache for SerpAPI search results."""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+from src.config import Config
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry.
+
+    Lowercases, collapses whitespace and strips surrounding punctuation, so
+    "What is the capital of France?" and "what is the capital of france"
+    map to the same key.
+
+    Args:
+        query: The raw user query
+
+    Returns:
+        Normalized query string
+    """
+    normalized = re.sub(r'\s+', ' ', query.strip().lower())
+    return normalized.strip(' ?!.,;:')
+
+
+class SearchCache:
+    """On-disk cache of search results with a TTL, size cap and LRU eviction.
+
+    Entries are keyed on the normalized query, the number of requested
+    results and the search engine. Hit/miss counters are kept both for the current process and
+    cumulatively in the database, together with the SerpAPI latency that
+    each hit avoided.
+    """
+
+    def __init__(self, path: str = None, ttl_seconds: int = None, max_entries: int = None):
+        """Initialize the search cache.
+
+        Args:
+            path: SQLite database path. If not provided, uses Config.CACHE_DIR/search_cache.sqlite3
+            ttl_seconds: Entry lifetime. If not provided, uses Config.SEARCH_CACHE_TTL
+            max_entries: Size cap. If not provided, uses Config.SEARCH_CACHE_MAX_ENTRIES
+        """
+        self.path = path or os.path.join(Config.CACHE_DIR, "search_cache.sqlite3")
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.SEARCH_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else Config.SEARCH_CACHE_MAX_ENTRIES
+
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS search_cache (
+                cache_key TEXT PRIMARY KEY,
+                results TEXT NOT NULL,
+                fetch_seconds REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_search_cache_last_accessed
+                ON search_cache(last_accessed);
+            CREATE TABLE IF NOT EXISTS search_cache_stats (
+                name TEXT PRIMARY KEY,
+                value REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, num_results: int, engine: str = "google") -> str:
+        """Build the cache key for a query, result count and search engine."""
+        key = f"{num_results}:{normalize_query(query)}"
+        # Google entries keep the original key format
+        return key if engine == "google" else f"{engine}:{key}"
+
+    def get(self, query: str, num_results: int, engine: str = "google") -> Optional[Any]:
+        """Return cached results for the query, or None on a miss.
+
+        Expired entries are deleted and count as misses. A hit refreshes the
+        entry's LRU position.
+
+        Args:
+            query: The search query
+            num_results: Number of results that were requested
+            engine: SerpAPI engine the results came from
+
+        Returns:
+            The cached search response (any JSON-serializable value), or None
+        """
+        key = self.make_key(query, num_results, engine)
+        now = time.time()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT results, fetch_seconds, created_at FROM search_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+
+            if row is not None and now - row[2] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM search_cache WHERE cache_key = ?", (key,))
+                row = None
+
+            if row is None:
+                self.misses += 1
+                self._bump_stat("misses", 1)
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE search_cache SET last_accessed = ? WHERE cache_key = ?",
+                (now, key)
+            )
+            self.hits += 1
+            self.saved_seconds += row[1]
+            self._bump_stat("hits", 1)
+            self._bump_stat("saved_seconds", row[1])
+            self._conn.commit()
+
+        return json.loads(row[0])
+
+    def set(
+        self,
+        query: str,
+        num_results: int,
+        results: Any,
+        fetch_seconds: float = 0.0,
+        engine: str = "google"
+    ):
+        """Store search results, evicting expired and least recently used entries.
+
+        Args:
+            query: The search query
+            num_results: Number of results that were requested
+            results: The search response to cache (any JSON-serializable value)
+            fetch_seconds: How long the uncached SerpAPI request took
+            engine: SerpAPI engine the results came from
+        """
+        key = self.make_key(query, num_results, engine)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache "
+                "(cache_key, results, fetch_seconds, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(results), fetch_seconds, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE created_at < ?",
+                (now - self.ttl_seconds,)
+            )
+            # LRU eviction down to the size cap
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE cache_key IN ("
+                "SELECT cache_key FROM search_cache ORDER BY last_accessed DESC "
+                "LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove all cached entries (counters are kept)."""
+        with self._lock:
+            self._conn.execute("DELETE FROM search_cache")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process and across all runs.
+
+        Returns:
+            Dict with 'hits', 'misses', 'hit_rate', 'saved_seconds', 'entries'
+            and 'lifetime' (the same counters accumulated in the database)
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+            lifetime = dict(self._conn.execute(
+                "SELECT name, value FROM search_cache_stats"
+            ).fetchall())
+
+        lifetime_hits = int(lifetime.get("hits", 0))
+        lifetime_misses = int(lifetime.get("misses", 0))
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self._hit_rate(self.hits, self.misses),
+            "saved_seconds": round(self.saved_seconds, 3),
+            "entries": entries,
+            "lifetime": {
+                "hits": lifetime_hits,
+                "misses": lifetime_misses,
+                "hit_rate": self._hit_rate(lifetime_hits, lifetime_misses),
+                "saved_seconds": round(lifetime.get("saved_seconds", 0.0), 3),
+            },
+        }
+
+    def _bump_stat(self, name: str, amount: float):
+        """Increment a persisted counter (caller holds the lock)."""
+        self._conn.execute(
+            "INSERT INTO search_cache_stats (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    @staticmethod
+    def _hit_rate(hits: int, misses: int) -> float:
+        """Compute a hit rate, returning 0.0 when there were no lookups."""
+        total = hits + misses
+        return round(hits / total, 3) if total else 0.0
@@ -0,0 +1,619 @@
+"""Semantic cache of final answers for near-duplicate queries.
+
+Queries are embedded locally (CPU only, no model download) as hashed
+TF-IDF vectors over normalized words, so paraphrases such as "capital of
+France" and "what's France's capital" land on the same vector. Matching
+adjacent word pairs add a small bonus, so among similar entries the one
+worded in the same order wins. A hit must not conflict with the query's
+question word (a query without one, like "capital of France", is
+compatible with any), numbers, or conversion direction ("100 eur to usd"
+vs "100 usd to eur"). Lookups score candidates from an inverted index
+with one vectorized NumPy product, which keeps nearest-neighbour search
+sub-millisecond at 100k entries.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+from src.config import Config
+from src.utils.query_tokenizer import QUESTION_WORDS, STOPWORDS, tokenize_query, split_words, stem_word
+
+
+# Words whose object gives a query its direction ("eur to usd" vs "usd to eur")
+_DIRECTION_WORDS = {"to": "to", "into": "to", "from": "from"}
+
+_NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Bump when query features change, so stored entries are re-embedded on load
+FEATURES_VERSION = 2
+
+
+def query_features(query: str) -> Tuple[List[str], List[str]]:
+    """Return the semantic cache features of a query.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        Tuple of (content words, adjacent content word pairs); either may be empty
+    """
+    tokens = tokenize_query(query)
+    return tokens, [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+
+
+def query_signature(query: str) -> Tuple[frozenset, Tuple[str, ...], Dict[str, str]]:
+    """Return the parts of a query that tell otherwise similar questions apart.
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        Tuple of (question words, numbers in query order, directions), where
+        directions maps "to"/"from" to the word that follows it
+        ({"to": "usd"} for "100 eur to usd")
+    """
+    words = split_words(query)
+    questions = frozenset("what" if word == "whats" else word for word in words if word in QUESTION_WORDS)
+    directions: Dict[str, str] = {}
+    for word, following in zip(words, words[1:]):
+        if word in _DIRECTION_WORDS and following and following not in STOPWORDS:
+            directions.setdefault(_DIRECTION_WORDS[word], stem_word(following))
+    return questions, tuple(_NUMBER_PATTERN.findall(query)), directions
+
+
+def signatures_conflict(
+    first: Tuple[frozenset, Tuple[str, ...], Dict[str, str]],
+    second: Tuple[frozenset, Tuple[str, ...], Dict[str, str]]
+) -> bool:
+    """Return True if two query signatures ask different questions.
+
+    A missing question word or direction is compatible with any; only
+    different ones conflict. Numbers must match exactly.
+
+    Args:
+        first: Signature from query_signature()
+        second: Signature from query_signature()
+
+    Returns:
+        True if the queries cannot share an answer
+    """
+    first_questions, first_numbers, first_directions = first
+    second_questions, second_numbers, second_directions = second
+    if first_questions and second_questions and first_questions != second_questions:
+        return True
+    if first_numbers != second_numbers:
+        return True
+    return any(second_directions.get(key, word) != word for key, word in first_directions.items())
+
+
+class HashingTfidfVectorizer:
+    """Hashed TF-IDF vectorizer with incrementally maintained document frequencies."""
+
+    def __init__(self, dim: int = None):
+        """Initialize the vectorizer.
+
+        Args:
+            dim: Number of hash buckets. If not provided, uses Config.SEMANTIC_CACHE_DIM
+        """
+        self.dim = dim or Config.SEMANTIC_CACHE_DIM
+        self.doc_freq = np.zeros(self.dim, dtype=np.float32)
+        self.num_docs = 0
+
+    def term_frequencies(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the sparse (feature indices, sublinear tf) of a query.
+
+        Word pair features share the buckets of word features and are told
+        apart by a negative tf.
+        """
+        words, pairs = query_features(query)
+        counts: Dict[Tuple[int, int], int] = defaultdict(int)
+        for token in words:
+            counts[(self._bucket(token), 1)] += 1
+        for pair in pairs:
+            counts[(self._bucket(pair), -1)] += 1
+
+        indices = np.fromiter((bucket for bucket, _ in counts), dtype=np.int32, count=len(counts))
+        signs = np.fromiter((sign for _, sign in counts), dtype=np.float32, count=len(counts))
+        values = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+        return indices, (signs * values).astype(np.float32)
+
+    def add_document(self, indices: np.ndarray):
+        """Count a stored query's features towards the document frequencies."""
+        self.doc_freq[indices] += 1
+        self.num_docs += 1
+
+    def idf(self) -> np.ndarray:
+        """Return the smoothed inverse document frequency of every bucket."""
+        return np.log((1.0 + self.num_docs) / (1.0 + self.doc_freq)) + 1.0
+
+    def dense(
+        self,
+        indices: np.ndarray,
+        values: np.ndarray,
+        idf: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Build L2-normalized dense TF-IDF vectors from sparse term frequencies.
+
+        Returns:
+            Tuple of (word vector, word pair vector), each normalized on its own
+        """
+        vectors = []
+        for kind in (values > 0, values < 0):
+            vector = np.zeros(self.dim, dtype=np.float32)
+            vector[indices[kind]] = np.abs(values[kind]) * idf[indices[kind]]
+            norm = np.linalg.norm(vector)
+            if norm > 0:
+                vector /= norm
+            vectors.append(vector)
+        return vectors[0], vectors[1]
+
+    def _bucket(self, token: str) -> int:
+        """Stable hash of a token into a bucket (Python's hash() is salted per run)."""
+        h = 2166136261
+        for byte in token.encode("utf-8"):
+            h = ((h ^ byte) * 16777619) & 0xFFFFFFFF
+        return h % self.dim
+
+
+class SemanticCache:
+    """Final-answer cache matched on query similarity rather than exact text.
+
+    Entries are persisted in SQLite and held in memory as a CSR-style sparse
+    matrix of TF-IDF rows (word and word pair features, each part
+    L2-normalized) plus an inverted index from feature to rows. A lookup
+    gathers the rows that share one of the query's highest-IDF words and
+    scores them all in one vectorized gather and segmented sum: the word
+    cosine similarity plus Config.SEMANTIC_CACHE_PAIR_BONUS times the word
+    pair cosine similarity. IDF weights are refreshed (and rows re-normalized)
+    whenever the cache has grown by a fixed fraction.
+
+    The arrays grow with amortized (doubling) capacity, so adding an entry
+    does not copy the index. Each refresh also saves the built index next to
+    the database (<path>.index.npz); a later run loads that snapshot and
+    only indexes the rows added since, instead of rebuilding from SQLite.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        threshold: float = None,
+        ttl_seconds: int = None,
+        max_entries: int = None
+    ):
+        """Initialize the semantic cache and load stored entries.
+
+        Args:
+            path: SQLite database path. If not provided, uses Config.CACHE_DIR/semantic_cache.sqlite3
+            threshold: Minimum cosine similarity for a hit. If not provided,
+                uses Config.SEMANTIC_CACHE_THRESHOLD
+            ttl_seconds: Entry lifetime. If not provided, uses Config.SEMANTIC_CACHE_TTL
+            max_entries: Size cap (oldest entries are evicted first). If not
+                provided, uses Config.SEMANTIC_CACHE_MAX_ENTRIES
+        """
+        self.path = path or os.path.join(Config.CACHE_DIR, "semantic_cache.sqlite3")
+        self.threshold = threshold if threshold is not None else Config.SEMANTIC_CACHE_THRESHOLD
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else Config.SEMANTIC_CACHE_TTL
+        self.max_entries = (
+            max_entries if max_entries is not None else Config.SEMANTIC_CACHE_MAX_ENTRIES
+        )
+
+        self.hits = 0
+        self.misses = 0
+
+        self.vectorizer = HashingTfidfVectorizer()
+        # Row and entry arrays are buffers: only the first _size rows / _nnz entries are in use
+        self._size = 0
+        self._nnz = 0
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._created_at = np.zeros(0, dtype=np.float64)
+        # CSR layout: row r owns entries _row_ptr[r]:_row_ptr[r + 1]
+        self._row_ptr = np.zeros(1, dtype=np.int64)
+        self._features = np.zeros(0, dtype=np.int32)
+        self._tf = np.zeros(0, dtype=np.float32)
+        self._weights = np.zeros(0, dtype=np.float32)
+        # Inverted index (CSR by feature) of the rows indexed at the last refresh,
+        # plus the rows appended since
+        self._posting_ptr = np.zeros(self.vectorizer.dim + 1, dtype=np.int64)
+        self._posting_rows = np.zeros(0, dtype=np.int64)
+        self._recent_postings: Dict[int, List[int]] = defaultdict(list)
+        self._idf = self.vectorizer.idf()
+        self._weighted_at_size = 0
+
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS semantic_cache (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                search_results TEXT NOT NULL,
+                features BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        self._conn.commit()
+        with self._lock:
+            self._migrate()
+            if not self._restore():
+                self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, query: str, max_age_seconds: float = None) -> Optional[Dict[str, Any]]:
+        """Return the stored answer for the most similar fresh query, if any.
+
+        Args:
+            query: The user query
+            max_age_seconds: Ignore entries older than this. If not provided,
+                uses the cache TTL
+
+        Returns:
+            Dict with 'query' (the cached query), 'answer', 'search_results',
+            'similarity', 'created_at' and 'age_seconds', or None on a miss
+        """
+        indices, values = self.vectorizer.term_frequencies(query)
+        signature = query_signature(query)
+
+        with self._lock:
+            max_age = min(max_age_seconds or self.ttl_seconds, self.ttl_seconds)
+            matches = self._nearest(indices, values, max_age) if len(indices) else []
+            for row, similarity in matches:
+                record = self._conn.execute(
+                    "SELECT query, answer, search_results FROM semantic_cache WHERE id = ?",
+                    (int(self._ids[row]),)
+                ).fetchone()
+                # Similar words are not enough: "where" vs "when", other numbers
+                # or "eur to usd" vs "usd to eur" is another question
+                if record is not None and not signatures_conflict(query_signature(record[0]), signature):
+                    break
+            else:
+                self.misses += 1
+                return None
+            created_at = float(self._created_at[row])
+            self.hits += 1
+
+        return {
+            "query": record[0],
+            "answer": record[1],
+            "search_results": json.loads(record[2]),
+            "similarity": round(min(similarity, 1.0), 3),
+            "created_at": created_at,
+            "age_seconds": time.time() - created_at,
+        }
+
+    def add(self, query: str, answer: str, search_results: List[Dict[str, Any]] = None):
+        """Store the final answer for a query.
+
+        Args:
+            query: The user query
+            answer: The final answer shown to the user
+            search_results: Search results the answer was based on
+        """
+        indices, values = self.vectorizer.term_frequencies(query)
+        if not len(indices):
+            return
+
+        now = time.time()
+        features = indices.tobytes() + values.tobytes()
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO semantic_cache (query, answer, search_results, features, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (query, answer, json.dumps(search_results or []), features, now)
+            )
+            self._conn.commit()
+            self._append(cursor.lastrowid, indices, values, now)
+            self._evict()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process and the number of entries."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "entries": len(self),
+        }
+
+    def _nearest(
+        self,
+        indices: np.ndarray,
+        values: np.ndarray,
+        max_age: float
+    ) -> List[Tuple[int, float]]:
+        """Find the most similar rows younger than max_age above the threshold (caller holds the lock).
+
+        Returns:
+            Up to Config.SEMANTIC_CACHE_VERIFY_CANDIDATES (row, similarity)
+            pairs, most similar first and newest first among equally similar
+            entries (e.g. a refreshed answer)
+        """
+        if not self._size:
+            return []
+
+        word_vector, pair_vector = self.vectorizer.dense(indices, values, self._idf)
+
+        # Candidates: rows sharing one of the query's most informative words.
+        # A row above the similarity threshold must share most of the query's
+        # weight, so it cannot miss all of these.
+        words = indices[values > 0]
+        ranked = words[np.argsort(-word_vector[words])][:Config.SEMANTIC_CACHE_PROBE_FEATURES]
+        postings = []
+        for feature in ranked.tolist():
+            postings.append(self._posting_rows[self._posting_ptr[feature]:self._posting_ptr[feature + 1]])
+            if feature in self._recent_postings:
+                postings.append(np.asarray(self._recent_postings[feature], dtype=np.int64))
+        candidates = np.unique(np.concatenate(postings))
+        if not len(candidates):
+            return []
+
+        # Sparse dot products of every candidate row with the query, vectorized
+        starts = self._row_ptr[candidates]
+        lengths = self._row_ptr[candidates + 1] - starts
+        segment_starts = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - segment_starts, lengths) + np.arange(lengths.sum())
+        features = self._features[positions]
+        query_weights = np.where(
+            self._tf[positions] < 0,
+            Config.SEMANTIC_CACHE_PAIR_BONUS * pair_vector[features],
+            word_vector[features]
+        )
+        scores = np.add.reduceat(query_weights * self._weights[positions], segment_starts)
+
+        fresh = (time.time() - self._created_at[candidates]) <= max_age
+        above = np.flatnonzero(fresh & (scores >= self.threshold))
+        order = np.lexsort((-self._created_at[candidates[above]], -np.round(scores[above], 6)))
+        best = above[order[:Config.SEMANTIC_CACHE_VERIFY_CANDIDATES]]
+        return [(int(candidates[i]), float(scores[i])) for i in best]
+
+    def _append(self, entry_id: int, indices: np.ndarray, values: np.ndarray, created_at: float):
+        """Add one entry to the in-memory index (caller holds the lock)."""
+        row, start, end = self._size, self._nnz, self._nnz + len(indices)
+        self._ids = _reserve(self._ids, row + 1)
+        self._created_at = _reserve(self._created_at, row + 1)
+        self._row_ptr = _reserve(self._row_ptr, row + 2)
+        self._features = _reserve(self._features, end)
+        self._tf = _reserve(self._tf, end)
+        self._weights = _reserve(self._weights, end)
+
+        self._ids[row] = entry_id
+        self._created_at[row] = created_at
+        self._row_ptr[row + 1] = end
+        self._features[start:end] = indices
+        self._tf[start:end] = values
+        self._size, self._nnz = row + 1, end
+        self.vectorizer.add_document(indices)
+        for feature in indices.tolist():
+            self._recent_postings[feature].append(row)
+
+        if self._size > self._weighted_at_size * (1 + Config.SEMANTIC_CACHE_REWEIGHT_GROWTH):
+            self._reweight()
+        else:
+            self._weights[start:end] = _row_weights(values, self._idf[indices], np.asarray([0, len(indices)]))
+
+    def _reweight(self):
+        """Recompute IDF weights, re-normalize every row and rebuild the inverted index (caller holds the lock).
+
+        The result is saved as the index snapshot for later runs.
+        """
+        features = self._features[:self._nnz]
+        row_ptr = self._row_ptr[:self._size + 1]
+        self._idf = self.vectorizer.idf()
+        self._weights[:self._nnz] = _row_weights(self._tf[:self._nnz], self._idf[features], row_ptr)
+
+        row_of_entry = np.repeat(np.arange(self._size, dtype=np.int64), np.diff(row_ptr))
+        self._posting_rows = row_of_entry[np.argsort(features, kind="stable")]
+        self._posting_ptr = np.concatenate(
+            [[0], np.cumsum(np.bincount(features, minlength=self.vectorizer.dim))]
+        ).astype(np.int64)
+        self._recent_postings = defaultdict(list)
+        self._weighted_at_size = self._size
+        self._save_snapshot()
+
+    @property
+    def _snapshot_path(self) -> str:
+        """Path of the saved index next to the SQLite database."""
+        return f"{self.path}.index.npz"
+
+    def _save_snapshot(self):
+        """Save the built index for later runs (atomic replace; errors are ignored)."""
+        if self.path == ":memory:":
+            return
+        try:
+            tmp_path = f"{self._snapshot_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez(
+                    f,
+                    meta=np.asarray([FEATURES_VERSION, self.vectorizer.dim], dtype=np.int64),
+                    ids=self._ids[:self._size],
+                    created_at=self._created_at[:self._size],
+                    row_ptr=self._row_ptr[:self._size + 1],
+                    features=self._features[:self._nnz],
+                    tf=self._tf[:self._nnz],
+                    weights=self._weights[:self._nnz],
+                    posting_ptr=self._posting_ptr,
+                    posting_rows=self._posting_rows,
+                )
+            os.replace(tmp_path, self._snapshot_path)
+        except OSError:
+            # The snapshot only speeds up loading; SQLite stays the source of truth
+            pass
+
+    def _restore(self) -> bool:
+        """Load the saved index if it still matches SQLite, then index newer rows (caller holds the lock).
+
+        Returns:
+            False if there is no usable snapshot: it is missing, was built
+            with other features, entries it holds were deleted (evicted) since,
+            or too many of them have expired
+        """
+        if self.path == ":memory:":
+            return False
+        try:
+            with np.load(self._snapshot_path) as snapshot:
+                arrays = {name: snapshot[name] for name in snapshot.files}
+            version, dim = arrays["meta"].tolist()
+        except (OSError, ValueError, KeyError):
+            return False
+        if version != FEATURES_VERSION or dim != self.vectorizer.dim:
+            return False
+
+        ids = arrays["ids"]
+        last_id = int(ids[-1]) if len(ids) else 0
+        stored = self._conn.execute(
+            "SELECT COUNT(*) FROM semantic_cache WHERE id <= ?", (last_id,)
+        ).fetchone()[0]
+        if stored != len(ids):
+            return False
+        expired = np.count_nonzero(time.time() - arrays["created_at"] > self.ttl_seconds)
+        if expired > len(ids) * Config.SEMANTIC_CACHE_REWEIGHT_GROWTH:
+            # Rebuild, which also purges them from SQLite
+            return False
+
+        self._size, self._nnz = len(ids), len(arrays["features"])
+        self._ids = ids
+        self._created_at = arrays["created_at"]
+        self._row_ptr = arrays["row_ptr"]
+        self._features = arrays["features"]
+        self._tf = arrays["tf"]
+        self._weights = arrays["weights"]
+        self._posting_ptr = arrays["posting_ptr"]
+        self._posting_rows = arrays["posting_rows"]
+        self.vectorizer.doc_freq = np.bincount(
+            self._features, minlength=self.vectorizer.dim
+        ).astype(np.float32)
+        self.vectorizer.num_docs = self._size
+        self._idf = self.vectorizer.idf()
+        self._weighted_at_size = self._size
+
+        # Rows added since the snapshot, by this or another process
+        for entry_id, blob, created_at in self._conn.execute(
+            "SELECT id, features, created_at FROM semantic_cache WHERE id > ? ORDER BY id", (last_id,)
+        ).fetchall():
+            half = len(blob) // 2
+            indices = np.frombuffer(blob[:half], dtype=np.int32)
+            self._append(entry_id, indices, np.frombuffer(blob[half:], dtype=np.float32), created_at)
+        return True
+
+    def _migrate(self):
+        """Re-embed stored queries saved with older features (caller holds the lock)."""
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= FEATURES_VERSION:
+            return
+        rows = self._conn.execute("SELECT id, query FROM semantic_cache").fetchall()
+        for entry_id, query in rows:
+            indices, values = self.vectorizer.term_frequencies(query)
+            if len(indices):
+                self._conn.execute(
+                    "UPDATE semantic_cache SET features = ? WHERE id = ?",
+                    (indices.tobytes() + values.tobytes(), entry_id)
+                )
+            else:
+                self._conn.execute("DELETE FROM semantic_cache WHERE id = ?", (entry_id,))
+        self._conn.execute(f"PRAGMA user_version = {FEATURES_VERSION}")
+        self._conn.commit()
+
+    def _evict(self):
+        """Drop the oldest entries beyond the size cap (caller holds the lock)."""
+        excess = self._size - self.max_entries
+        if excess <= 0:
+            return
+        # Evict an extra 10% so the index is not rebuilt on every insert at the cap
+        excess += self.max_entries // 10
+        self._conn.execute(
+            "DELETE FROM semantic_cache WHERE id IN ("
+            "SELECT id FROM semantic_cache ORDER BY created_at ASC LIMIT ?)",
+            (excess,)
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        """(Re)build the in-memory index from the fresh rows in SQLite (caller holds the lock)."""
+        self._conn.execute(
+            "DELETE FROM semantic_cache WHERE created_at < ?",
+            (time.time() - self.ttl_seconds,)
+        )
+        self._conn.commit()
+        rows = self._conn.execute(
+            "SELECT id, features, created_at FROM semantic_cache ORDER BY id"
+        ).fetchall()
+
+        self._ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+        self._created_at = np.asarray([row[2] for row in rows], dtype=np.float64)
+        blobs = [row[1] for row in rows]
+        sizes = np.asarray([len(blob) // 8 for blob in blobs], dtype=np.int64)
+        self._row_ptr = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self._features = np.frombuffer(
+            b"".join(blob[:len(blob) // 2] for blob in blobs), dtype=np.int32
+        ).copy()
+        self._tf = np.frombuffer(
+            b"".join(blob[len(blob) // 2:] for blob in blobs), dtype=np.float32
+        ).copy()
+        self._weights = np.zeros(len(self._features), dtype=np.float32)
+        self._size, self._nnz = len(rows), len(self._features)
+
+        # Counting features gives document frequencies
+        self.vectorizer = HashingTfidfVectorizer(self.vectorizer.dim)
+        self.vectorizer.doc_freq = np.bincount(
+            self._features, minlength=self.vectorizer.dim
+        ).astype(np.float32)
+        self.vectorizer.num_docs = len(rows)
+        self._reweight()
+
+
+def _reserve(array: np.ndarray, size: int) -> np.ndarray:
+    """Return the array, or a copy with at least doubled capacity if it holds fewer than size items."""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 64), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _row_weights(tf: np.ndarray, idf: np.ndarray, row_ptr: np.ndarray) -> np.ndarray:
+    """Return TF-IDF weights with the word and the word pair part of each row L2-normalized.
+
+    Args:
+        tf: Signed term frequencies of all rows (negative for word pairs)
+        idf: IDF of each entry's feature
+        row_ptr: CSR row boundaries
+
+    Returns:
+        float32 weights, one per entry
+    """
+    weighted = np.abs(tf) * idf
+    if not len(weighted):
+        return weighted.astype(np.float32)
+    is_pair = tf < 0
+    row_sizes = np.diff(row_ptr)
+    squares = weighted ** 2
+    word_norms = np.sqrt(np.add.reduceat(np.where(is_pair, 0.0, squares), row_ptr[:-1]))
+    pair_norms = np.sqrt(np.add.reduceat(np.where(is_pair, squares, 0.0), row_ptr[:-1]))
+    norms = np.where(is_pair, np.repeat(pair_norms, row_sizes), np.repeat(word_norms, row_sizes))
+    return (weighted / np.maximum(norms, 1e-12)).astype(np.float32)
+
+
+_shared_cache: Optional[SemanticCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    """Return the process-wide semantic answer cache."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SemanticCache()
+        return _shared_cache
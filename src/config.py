@@ -13,6 +13,7 @@ class Config:
     # OpenRouter Configuration
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
     OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")  # Default model
+    OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
     # SerpAPI Configuration
     SERPAPI_KEY = os.getenv("SERPAPI_KEY")
@@ -25,8 +26,122 @@ class Config:
     MIN_SEARCH_RESULTS = 5
     MAX_SEARCH_RESULTS = 10
 
+    # Local query classifier (sizes the search and the answer per query)
+    MAX_TOKENS_BY_COMPLEXITY = {"simple": 800, "moderate": 1400, "complex": 2000}
+    # Soft output cap: the answer ends at the first line break past it (max_tokens stays the hard cap)
+    OUTPUT_SOFT_CAP_ENABLED = os.getenv("OUTPUT_SOFT_CAP_ENABLED", "true").lower() != "false"
+    OUTPUT_SOFT_CAP_BY_COMPLEXITY = {"simple": 350, "moderate": 700, "complex": 1200}
+    MODEL_BY_COMPLEXITY = {
+        # Optional cheaper/faster model for simple queries (defaults to OPENROUTER_MODEL)
+        "simple": os.getenv("SIMPLE_QUERY_MODEL") or None,
+    }
+    CLASSIFIER_MIN_OUTCOMES = 20  # Logged outcomes needed before refitting the weights
+    CLASSIFIER_REFIT_EVERY = 20  # Refit after every N new outcomes
+    CLASSIFIER_MAX_OUTCOMES = 2000  # Most recent outcomes used for fitting
+    CLASSIFIER_RIDGE = 5.0  # Pull towards the hand-tuned weights
+
+    # Over-fetch search results and keep the best by local BM25 score
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "true").lower() != "false"
+    RERANK_FETCH_MULTIPLIER = 2  # Candidates fetched per result kept
+    RERANK_MAX_CANDIDATES = 20
+    RERANK_RANK_PRIOR = 0.3  # Weight of the search engine's own ranking
+
+    # Fetch result pages and add query-relevant passages (never delays the answer past the deadline)
+    PAGE_FETCH_ENABLED = os.getenv("PAGE_FETCH_ENABLED", "false").lower() == "true"
+    PAGE_FETCH_DEADLINE = float(os.getenv("PAGE_FETCH_DEADLINE", "1.5"))  # Seconds for the whole stage
+    PAGE_FETCH_CONCURRENCY = 8  # Pages fetched at once
+    PAGE_FETCH_TIMEOUT = 3.0  # Seconds per page
+    PAGE_FETCH_MAX_BYTES = 512 * 1024  # Stop reading a page after this many bytes
+    PAGE_FETCH_PASSAGES = 2  # Passages kept per page
+    PAGE_FETCH_PASSAGE_CHARS = 400  # Longer passages are cut
+    PAGE_FETCH_MIN_PARAGRAPH_CHARS = 60  # Shorter blocks are navigation/boilerplate
+
+    # Prompt budgeting (tokens, counted locally)
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))  # System + user prompt
+    TOTAL_TOKEN_BUDGET = int(os.getenv("TOTAL_TOKEN_BUDGET", "4000"))  # Prompt + answer per call
+    MIN_OUTPUT_TOKENS = 400  # Never size an answer below this
+    MIN_SNIPPET_TOKENS = 20  # Drop (rather than truncate) a result if less than this would fit
+    PROMPT_COMPACT_SOURCES = os.getenv("PROMPT_COMPACT_SOURCES", "true").lower() != "false"  # Site names instead of URLs
+    CONTEXT_BLOCK_TOKEN_BUDGET = 300  # Hard cap for related questions, top stories and answer snippets
+    DIRECT_ANSWER_ENABLED = os.getenv("DIRECT_ANSWER_ENABLED", "true").lower() != "false"  # Answer-box fast path
+
+    # Cache Configuration
+    CACHE_DIR = os.path.expanduser(os.getenv("PERP_CACHE_DIR", "~/.cache/perplexity-clone"))
+    SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() != "false"
+    SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "3600"))  # Seconds
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "86400"))  # Seconds
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))  # Disk tier
+    LLM_CACHE_MEMORY_ENTRIES = 256  # In-memory LRU tier
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() != "false"
+    ANSWER_CACHE_TTL = int(os.getenv("ANSWER_CACHE_TTL", "604800"))  # Seconds
+    ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+    SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() != "false"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))  # Cosine similarity
+    SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "2592000"))  # Seconds; upper bound for every class
+    SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "100000"))
+    SEMANTIC_CACHE_DIM = 2 ** 16  # Hash buckets for query features
+    SEMANTIC_CACHE_PROBE_FEATURES = 3  # Highest-IDF query features used to find candidates
+    SEMANTIC_CACHE_REWEIGHT_GROWTH = 0.1  # Refresh IDF after the cache grows by 10%
+    SEMANTIC_CACHE_PAIR_BONUS = 0.1  # Weight of matching word pairs (same word order) in the similarity
+    SEMANTIC_CACHE_VERIFY_CANDIDATES = 5  # Best matches checked for a conflicting question
+
+    # Stale-while-revalidate: (soft, hard) answer TTLs in seconds per freshness class.
+    # Past the soft TTL a cached answer is still served but refreshed in the background;
+    # past the hard TTL it is no longer served.
+    FRESHNESS_TTLS = {
+        "time_sensitive": (15 * 60, 6 * 3600),
+        "standard": (24 * 3600, 7 * 86400),
+        "evergreen": (7 * 86400, 30 * 86400),
+    }
+    REFRESH_LOCK_SECONDS = 300  # Don't start another refresh for the same query within this window
+
+    # Search engines queried concurrently through SerpAPI (primary first), fused with reciprocal rank fusion
+    SEARCH_ENGINES = [e.strip() for e in os.getenv("SEARCH_ENGINES", "google").split(",") if e.strip()]
+    SEARCH_ENGINE_DEADLINE = float(os.getenv("SEARCH_ENGINE_DEADLINE", "3"))  # Seconds; slower secondary engines are dropped
+    RRF_K = 60  # Reciprocal rank fusion damping constant
+
+    # Split comparison and multi-part queries into sub-queries searched concurrently
+    QUERY_PLANNER_ENABLED = os.getenv("QUERY_PLANNER_ENABLED", "true").lower() != "false"
+    PLANNER_MAX_SUBQUERIES = 3  # Extra searches per query (each is a SerpAPI credit)
+
+    # SerpAPI request policy (hedge a slow request, retry transient errors, never exceed the deadline)
+    SERPAPI_DEADLINE = float(os.getenv("SERPAPI_DEADLINE", "10"))  # Seconds for all attempts of one search
+    SERPAPI_ATTEMPT_TIMEOUT = 8.0  # Seconds per HTTP attempt
+    SERPAPI_HEDGE_PERCENTILE = 0.95  # Of past SerpAPI latencies
+    SERPAPI_HEDGE_DEFAULT_DELAY = 2.0  # Seconds, used until enough latency samples exist
+    SERPAPI_HEDGE_MIN_DELAY = 0.3  # Never hedge sooner than this
+    SERPAPI_MAX_RETRIES = 2  # Retries after a transient error (429, 5xx, timeouts, connection errors)
+    SERPAPI_RETRY_BASE_DELAY = 0.25  # Seconds; backoff doubles per retry with full jitter
+
+    # HTTP Transport Configuration (shared keep-alive pools)
+    HTTP_POOL_CONNECTIONS = 10  # Distinct hosts kept in the requests pool
+    HTTP_POOL_MAXSIZE = 20  # Connections kept alive per host
+    HTTP_KEEPALIVE_EXPIRY = 60.0  # Seconds an idle connection stays open
+    HTTP_TIMEOUT = 60.0  # Default request timeout in seconds
+    ASYNC_HTTP_MAX_CONNECTIONS = 500  # Concurrent in-flight requests on the event loop
+
     # Agent Configuration
-    NUM_AGENTS = 3
+    NUM_AGENTS = 3  # Maximum concurrent attempts per query (primary + hedges)
+
+    # Hedging Configuration (backup agents launch only when the primary is slow)
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "0.9"))  # Of time-to-first-token
+    HEDGE_DEFAULT_DELAY = 3.0  # Seconds, used until enough latency samples exist
+    HEDGE_MIN_DELAY = 0.5  # Never hedge sooner than this
+    LATENCY_WINDOW = 100  # Rolling samples kept per model
+    LATENCY_MIN_SAMPLES = 5  # Samples needed before percentiles are trusted
+
+    # Streaming citation checks (an attempt with broken citations is aborted and replaced)
+    CITATION_VALIDATION_ENABLED = os.getenv("CITATION_VALIDATION_ENABLED", "true").lower() != "false"
+    CITATION_GRACE_TOKENS = 150  # Abort an answer with no [N] citation after this many tokens
+    RACE_MAX_REPLACEMENTS = 2  # Fresh attempts launched for rejected ones, per query
+
+    # Local quality gate: the first answer that passes it wins the race
+    QUALITY_GATE_ENABLED = os.getenv("QUALITY_GATE_ENABLED", "true").lower() != "false"
+    GATE_MIN_TOKENS = 15  # Shorter answers are rejected
+    GATE_MAX_TOKENS_FRACTION = 0.95  # Answers this close to max_tokens were probably cut off
+    GATE_MIN_CITATION_COVERAGE = 0.5  # Share of statements that must cite a source
 
     # LLM Configuration
     MIN_MAX_TOKENS = 20  # Minimum max_tokens for OpenRouter (some models require >= 16)
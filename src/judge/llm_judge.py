@@ -1,7 +1,9 @@
 """LLM Judge that evaluates agent outputs and selects the best response."""
 
-from typing import List, Dict
+import re
+from typing import List, Dict, Tuple
 from src.llm.openai_client import OpenAIClient
+from src.utils.citation_formatter import CitationFormatter
 
 
 class LLMJudge:
@@ -35,13 +37,71 @@ class LLMJudge:
         if not agent_responses:
             raise ValueError("No agent responses to evaluate")
 
+        system_prompt, user_prompt = self._build_prompts(query, agent_responses)
+
+        try:
+            judgment = self.llm_client.generate(
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                max_tokens=50,  # Increased from 10 to give model more room
+                temperature=0  # Deterministic selection
+            )
+            return self._select_response(judgment, agent_responses)
+
+        except (ValueError, Exception) as e:
+            raise Exception(f"Judge evaluation failed: {str(e)}") from e
+
+    async def aevaluate_responses(
+        self,
+        query: str,
+        agent_responses: List[Dict[str, str]]
+    ) -> str:
+        """Async variant of evaluate_responses().
+
+        Args:
+            query: The original user query
+            agent_responses: List of dicts with 'agent_name' and 'response' keys
+
+        Returns:
+            The best response (unchanged from the winning agent)
+
+        Raises:
+            Exception: If LLM API call fails or no valid response is found
+        """
+        if not agent_responses:
+            raise ValueError("No agent responses to evaluate")
+
+        system_prompt, user_prompt = self._build_prompts(query, agent_responses)
+
+        try:
+            judgment = await self.llm_client.agenerate(
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                max_tokens=50,
+                temperature=0  # Deterministic selection
+            )
+            return self._select_response(judgment, agent_responses)
+
+        except (ValueError, Exception) as e:
+            raise Exception(f"Judge evaluation failed: {str(e)}") from e
+
+    def _build_prompts(self, query: str, agent_responses: List[Dict[str, str]]) -> Tuple[str, str]:
+        """Build the system and user prompts for the judge.
+
+        Args:
+            query: The original user query
+            agent_responses: List of response dictionaries
+
+        Returns:
+            Tuple of (system_prompt, user_prompt)
+        """
         # Format responses for evaluation
         responses_text = self._format_responses(agent_responses)
 
         system_prompt = """You are an expert judge evaluating search result answers. Your task is to select the BEST response based on these criteria:
 
 1. ACCURACY: Information is correct and well-supported by citations
-2. CITATION QUALITY: Proper use of numbered citations [1], [2], etc. with complete citation list
+2. CITATION QUALITY: Proper use of numbered citations [1], [2], etc. for every claim
 3. COHERENCE: Answer is well-structured, clear, and easy to understand
 4. COMPLETENESS: Answer thoroughly addresses the user's query
 5. RELEVANCE: Information directly pertains to the question asked
@@ -56,39 +116,39 @@ Based on the evaluation criteria (accuracy, citation quality, coherence, complet
 
 Respond with ONLY the number (1, 2, or 3) of the best response."""
 
-        try:
-            judgment = self.llm_client.generate(
-                prompt=user_prompt,
-                system_prompt=system_prompt,
-                max_tokens=50,  # Increased from 10 to give model more room
-                temperature=0  # Deterministic selection
-            )
+        return system_prompt, user_prompt
 
-            # Handle empty or invalid response - default to first agent
-            if not judgment or not judgment.strip():
-                print("⚠ Warning: Judge returned empty response, using first agent")
-                return agent_responses[0]["response"]
+    def _select_response(self, judgment: str, agent_responses: List[Dict[str, str]]) -> str:
+        """Pick the response named by the judge's answer.
 
-            # Extract number from response
-            import re
-            numbers = re.findall(r'\d+', judgment.strip())
+        Args:
+            judgment: Raw judge output, expected to contain a response number
+            agent_responses: List of response dictionaries
 
-            if not numbers:
-                print("⚠ Warning: Judge did not return a number, using first agent")
-                return agent_responses[0]["response"]
+        Returns:
+            The selected response, or the first one if the judgment is unusable
+        """
+        # Handle empty or invalid response - default to first agent
+        if not judgment or not judgment.strip():
+            print("⚠ Warning: Judge returned empty response, using first agent")
+            return agent_responses[0]["response"]
 
-            # Parse the judgment
-            selected_index = int(numbers[0]) - 1
+        # Extract number from response
+        numbers = re.findall(r'\d+', judgment.strip())
 
-            if 0 <= selected_index < len(agent_responses):
-                return agent_responses[selected_index]["response"]
-            else:
-                # Default to first agent if out of range
-                print(f"⚠ Warning: Judge returned invalid index {numbers[0]}, using first agent")
-                return agent_responses[0]["response"]
+        if not numbers:
+            print("⚠ Warning: Judge did not return a number, using first agent")
+            return agent_responses[0]["response"]
 
-        except (ValueError, Exception) as e:
-            raise Exception(f"Judge evaluation failed: {str(e)}") from e
+        # Parse the judgment
+        selected_index = int(numbers[0]) - 1
+
+        if 0 <= selected_index < len(agent_responses):
+            return agent_responses[selected_index]["response"]
+        else:
+            # Default to first agent if out of range
+            print(f"⚠ Warning: Judge returned invalid index {numbers[0]}, using first agent")
+            return agent_responses[0]["response"]
 
     def _format_responses(self, agent_responses: List[Dict[str, str]]) -> str:
         """Format agent responses for evaluation.
@@ -102,7 +162,9 @@ Respond with ONLY the number (1, 2, or 3) of the best response."""
         formatted = []
         for idx, response_data in enumerate(agent_responses, 1):
             agent_name = response_data.get("agent_name", f"Agent {idx}")
-            response = response_data.get("response", "")
+            # Citation lists are rendered locally from the same sources, so
+            # they carry no signal and only cost judge input tokens
+            response = CitationFormatter.strip_citation_list(response_data.get("response", ""))
             formatted.append(
                 f"Response {idx} ({agent_name}):\n{response}\n"
                 f"{'-' * 80}\n"
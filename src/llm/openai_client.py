@@ -1,18 +1,39 @@
 """OpenAI API client wrapper for LLM access via OpenRouter."""
 
-from openai import OpenAI
+from typing import Iterator, AsyncIterator, Dict, Any, List, Optional
+import httpx
+from openai import OpenAI, AsyncOpenAI
 from src.config import Config
+from src.cache.completion_cache import CompletionCache, get_completion_cache
+from src.transport.http_pool import get_httpx_client, get_async_httpx_client
 
 
 class OpenAIClient:
-    """Wrapper for OpenAI-compatible API calls via OpenRouter."""
+    """Wrapper for OpenAI-compatible API calls via OpenRouter.
 
-    def __init__(self, api_key: str = None, model: str = None):
+    Completions are served from an exact-match cache when an identical
+    request (model, prompts, max_tokens, temperature) was answered before.
+    Pass use_cache=False to the constructor or to a single call to bypass it.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        model: str = None,
+        http_client: httpx.Client = None,
+        cache: CompletionCache = None,
+        use_cache: bool = True
+    ):
         """Initialize OpenRouter client.
 
         Args:
             api_key: OpenRouter API key. If not provided, uses Config.OPENROUTER_API_KEY
             model: Model name. If not provided, uses Config.OPENROUTER_MODEL
+            http_client: httpx client to send requests with. If not provided,
+                uses the process-wide pooled client shared by all instances
+            cache: Completion cache. If not provided, uses the process-wide
+                cache (unless caching is disabled)
+            use_cache: Set to False to never read or write the completion cache
         """
         self.api_key = api_key or Config.OPENROUTER_API_KEY
         if not self.api_key:
@@ -21,15 +42,100 @@ class OpenAIClient:
         self.model = model or Config.OPENROUTER_MODEL
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url="https://openrouter.ai/api/v1"
+            base_url=Config.OPENROUTER_BASE_URL,
+            http_client=http_client or get_httpx_client()
         )
+        self._async_client = None
+
+        if not use_cache or not Config.LLM_CACHE_ENABLED:
+            self.cache = None
+        else:
+            self.cache = cache or get_completion_cache()
+
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """AsyncOpenAI client on the shared async pool, created on first use."""
+        if self._async_client is None:
+            self._async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=Config.OPENROUTER_BASE_URL,
+                http_client=get_async_httpx_client()
+            )
+        return self._async_client
+
+    def _build_messages(self, prompt: str, system_prompt: str = None) -> list:
+        """Build the chat messages list for a completion request.
+
+        Args:
+            prompt: The user prompt
+            system_prompt: Optional system prompt to guide behavior
+
+        Returns:
+            List of message dicts in OpenAI chat format
+        """
+        messages = []
+
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _cache_key(
+        self,
+        prompt: str,
+        max_tokens: int,
+        temperature: float,
+        system_prompt: str,
+        use_cache: bool,
+        stop: Optional[List[str]] = None
+    ) -> Optional[str]:
+        """Return the completion cache key, or None when caching is bypassed."""
+        if self.cache is None or not use_cache:
+            return None
+        return CompletionCache.make_key(self.model, system_prompt, prompt, max_tokens, temperature, stop)
+
+    @staticmethod
+    def _stop_kwargs(stop: Optional[List[str]]) -> Dict[str, Any]:
+        """Request arguments for stop sequences (omitted entirely when there are none)."""
+        return {"stop": stop} if stop else {}
+
+    def discard_cached(self, cache_key: Optional[str]):
+        """Evict a completion from the cache, e.g. once its answer was rejected.
+
+        Args:
+            cache_key: Key reported in the usage dict of a streamed call, or None
+        """
+        if self.cache is not None and cache_key is not None:
+            self.cache.delete(cache_key)
+
+    @staticmethod
+    def _record_usage(usage: Optional[Dict[str, Any]], chunk):
+        """Update a caller-supplied usage dict from one stream chunk."""
+        if usage is None:
+            return
+        if chunk.choices and chunk.choices[0].delta.content:
+            usage["chunks"] = usage.get("chunks", 0) + 1
+        if getattr(chunk, "usage", None) is not None:
+            usage["prompt_tokens"] = chunk.usage.prompt_tokens
+            usage["completion_tokens"] = chunk.usage.completion_tokens
+
+    @staticmethod
+    def _record_cache_hit(usage: Optional[Dict[str, Any]]):
+        """Mark a caller-supplied usage dict as served from the cache."""
+        if usage is not None:
+            usage["cached"] = True
+            usage["chunks"] = 1
+            usage["completion_tokens"] = 0
 
     def generate(
         self,
         prompt: str,
         max_tokens: int = 2000,
         temperature: float = 0.7,
-        system_prompt: str = None
+        system_prompt: str = None,
+        use_cache: bool = True,
+        stop: Optional[List[str]] = None
     ) -> str:
         """Generate a completion using OpenRouter.
 
@@ -38,6 +144,8 @@ class OpenAIClient:
             max_tokens: Maximum tokens in the response
             temperature: Sampling temperature (0-2)
             system_prompt: Optional system prompt to guide behavior
+            use_cache: Set to False to bypass the completion cache for this call
+            stop: Optional stop sequences; generation ends before any of them
 
         Returns:
             The generated text response
@@ -45,30 +153,248 @@ class OpenAIClient:
         Raises:
             Exception: If the API call fails
         """
+        # Ensure max_tokens meets minimum requirement for OpenRouter models
+        safe_max_tokens = max(max_tokens, Config.MIN_MAX_TOKENS)
+
+        cache_key = self._cache_key(prompt, safe_max_tokens, temperature, system_prompt, use_cache, stop)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
-            messages = []
+            messages = self._build_messages(prompt, system_prompt)
+
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=safe_max_tokens,
+                temperature=temperature,
+                **self._stop_kwargs(stop),
+            )
+
+            content = response.choices[0].message.content
+            # Handle None response
+            if content is None:
+                return ""
 
-            if system_prompt:
-                messages.append({"role": "system", "content": system_prompt})
+            if cache_key is not None:
+                self.cache.set(cache_key, content)
+            return content
 
-            messages.append({"role": "user", "content": prompt})
+        except Exception as e:
+            # Fail fast on API errors as per requirements
+            raise Exception(f"OpenRouter API request failed: {str(e)}") from e
 
-            # Ensure max_tokens meets minimum requirement for OpenRouter models
-            safe_max_tokens = max(max_tokens, Config.MIN_MAX_TOKENS)
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        system_prompt: str = None,
+        usage: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        stop: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """Stream a completion from OpenRouter, yielding text deltas as they arrive.
 
-            response = self.client.chat.completions.create(
+        Closing the generator early (e.g. via ``break`` in the consumer) closes
+        the underlying HTTP stream.
+
+        Args:
+            prompt: The user prompt
+            max_tokens: Maximum tokens in the response
+            temperature: Sampling temperature (0-2)
+            system_prompt: Optional system prompt to guide behavior
+            usage: Optional dict filled in while streaming with 'chunks' (deltas
+                received so far) and, once the provider reports them,
+                'prompt_tokens' and 'completion_tokens'; 'cached' is set to
+                True when the answer came from the completion cache, and
+                'cache_key' to its key (see discard_cached)
+            use_cache: Set to False to bypass the completion cache for this call
+            stop: Optional stop sequences; generation ends before any of them
+
+        Yields:
+            Non-empty text deltas of the generated response
+
+        Raises:
+            Exception: If the API call fails
+        """
+        messages = self._build_messages(prompt, system_prompt)
+        safe_max_tokens = max(max_tokens, Config.MIN_MAX_TOKENS)
+
+        cache_key = self._cache_key(prompt, safe_max_tokens, temperature, system_prompt, use_cache, stop)
+        if cache_key is not None:
+            if usage is not None:
+                usage["cache_key"] = cache_key
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_cache_hit(usage)
+                yield cached
+                return
+
+        try:
+            stream = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 max_tokens=safe_max_tokens,
                 temperature=temperature,
+                **self._stop_kwargs(stop),
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except Exception as e:
+            raise Exception(f"OpenRouter API request failed: {str(e)}") from e
+
+        parts = []
+        try:
+            for chunk in stream:
+                self._record_usage(usage, chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            # Fail fast on API errors as per requirements
+            raise Exception(f"OpenRouter API stream failed: {str(e)}") from e
+        finally:
+            stream.close()
+
+        # Only completions that streamed to the end are cached
+        if cache_key is not None and parts:
+            self.cache.set(cache_key, "".join(parts))
+
+    async def agenerate(
+        self,
+        prompt: str,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        system_prompt: str = None,
+        use_cache: bool = True,
+        stop: Optional[List[str]] = None
+    ) -> str:
+        """Async variant of generate() running on the event loop.
+
+        Args:
+            prompt: The user prompt
+            max_tokens: Maximum tokens in the response
+            temperature: Sampling temperature (0-2)
+            system_prompt: Optional system prompt to guide behavior
+            use_cache: Set to False to bypass the completion cache for this call
+            stop: Optional stop sequences; generation ends before any of them
+
+        Returns:
+            The generated text response
+
+        Raises:
+            Exception: If the API call fails
+        """
+        safe_max_tokens = max(max_tokens, Config.MIN_MAX_TOKENS)
+
+        cache_key = self._cache_key(prompt, safe_max_tokens, temperature, system_prompt, use_cache, stop)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, system_prompt),
+                max_tokens=safe_max_tokens,
+                temperature=temperature,
+                **self._stop_kwargs(stop),
             )
 
             content = response.choices[0].message.content
             # Handle None response
             if content is None:
                 return ""
+
+            if cache_key is not None:
+                self.cache.set(cache_key, content)
             return content
 
         except Exception as e:
             # Fail fast on API errors as per requirements
             raise Exception(f"OpenRouter API request failed: {str(e)}") from e
+
+    async def agenerate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 2000,
+        temperature: float = 0.7,
+        system_prompt: str = None,
+        usage: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        stop: Optional[List[str]] = None
+    ) -> AsyncIterator[str]:
+        """Async variant of generate_stream() yielding text deltas.
+
+        Cancelling the consuming task closes the underlying HTTP stream.
+
+        Args:
+            prompt: The user prompt
+            max_tokens: Maximum tokens in the response
+            temperature: Sampling temperature (0-2)
+            system_prompt: Optional system prompt to guide behavior
+            usage: Optional dict filled in while streaming with 'chunks' (deltas
+                received so far) and, once the provider reports them,
+                'prompt_tokens' and 'completion_tokens'; 'cached' is set to
+                True when the answer came from the completion cache, and
+                'cache_key' to its key (see discard_cached)
+            use_cache: Set to False to bypass the completion cache for this call
+            stop: Optional stop sequences; generation ends before any of them
+
+        Yields:
+            Non-empty text deltas of the generated response
+
+        Raises:
+            Exception: If the API call fails
+        """
+        safe_max_tokens = max(max_tokens, Config.MIN_MAX_TOKENS)
+
+        cache_key = self._cache_key(prompt, safe_max_tokens, temperature, system_prompt, use_cache, stop)
+        if cache_key is not None:
+            if usage is not None:
+                usage["cache_key"] = cache_key
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self._record_cache_hit(usage)
+                yield cached
+                return
+
+        try:
+            stream = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(prompt, system_prompt),
+                max_tokens=safe_max_tokens,
+                temperature=temperature,
+                **self._stop_kwargs(stop),
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+        except Exception as e:
+            raise Exception(f"OpenRouter API request failed: {str(e)}") from e
+
+        parts = []
+        try:
+            async for chunk in stream:
+                self._record_usage(usage, chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as e:
+            # Fail fast on API errors as per requirements
+            raise Exception(f"OpenRouter API stream failed: {str(e)}") from e
+        finally:
+            await stream.close()
+
+        # Only completions that streamed to the end are cached
+        if cache_key is not None and parts:
+            self.cache.set(cache_key, "".join(parts))
@@ -1,40 +1,571 @@
 #!/usr/bin/env python3
 """Main CLI application for Perplexity Clone - Multi-Agent Search System."""
 
-import sys
 import os
+import sys
 import time
+import subprocess
+import asyncio
 import argparse
-import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional
+from typing import List, Dict, Callable, Optional
 
 from src.config import Config
 from src.search.serpapi_client import SerpAPIClient
+from src.search.query_classifier import get_query_classifier
+from src.search.query_planner import plan_subqueries, asearch_plan
+from src.search.dedupe import dedupe_search_data
+from src.search.reranker import rerank_search_data
+from src.search.page_fetcher import PageFetcher
+from src.search.direct_answer import is_simple_query, extract_direct_answer, render_direct_answer
 from src.agents.comprehensive_agent import ComprehensiveAgent
+from src.agents.race import AgentRace
+from src.cache.semantic_cache import get_semantic_cache
+from src.cache.answer_cache import AnswerCache, get_answer_cache, fingerprint_results
+from src.cache.freshness import freshness_ttls, claim_refresh
+from src.llm.openai_client import OpenAIClient
+from src.transport.http_pool import aprewarm_openrouter, aclose_async_httpx_client
 from src.ui.console_display import Display
+from src.utils.citation_formatter import CitationFormatter
+from src.utils.token_counter import count_tokens
+
 
+def show_progress(
+    search_results: List[Dict],
+    from_cache: bool,
+    should_fast_forward: Callable[[], bool],
+    duplicates_removed: int = 0
+):
+    """Show the sequential progress UI while the agents work in the background.
 
-def run_agent(agent, query: str, search_results: List[Dict]) -> Dict[str, str]:
-    """Run a single agent and return its response.
+    All delays are purely cosmetic and are skipped as soon as
+    should_fast_forward() returns True. Runs in a worker thread so its
+    sleeps never block the event loop the agents are running on.
 
     Args:
-        agent: Agent instance to run
-        query: User query
         search_results: Search results from SerpAPI
+        from_cache: Whether the search results came from the cache
+        should_fast_forward: Callable returning True once delays should be skipped
+        duplicates_removed: Number of near-duplicate results merged away
+    """
+    # Show success after fetch completes
+    Display.pause(0.4, jitter=0.18, minimum=0.2, fast_forward=should_fast_forward())  # Slight pause for smooth reading
+    cached_note = " (cached)" if from_cache else ""
+    if duplicates_removed:
+        cached_note += f", {duplicates_removed} duplicate(s) merged"
+    Display.success(f"Retrieved {len(search_results)} results{cached_note}")
+
+    # Show ALL search results sequentially (one at a time for maximum engagement)
+    # While user reads these, agents are already processing in background
+    # With 7 sources @ 0.5s each = ~3.5s of engaging reading time
+    Display.pause(0.4, jitter=0.22, minimum=0.2, fast_forward=should_fast_forward())  # Frontend pause only
+    Display.search_results_preview(
+        search_results,
+        sequential_delay=0.5,
+        jitter=0.25,
+        is_fast_forward=should_fast_forward
+    )  # ~3.5s total with 7 sources
+
+    # By now agents have been working for ~4+ seconds already!
+    # Add more progress steps to keep user engaged
+    Display.pause(0.35, jitter=0.15, minimum=0.18, fast_forward=should_fast_forward())
+    Display.step(2, 5, "Analyzing query complexity...")
+    Display.progress_message(
+        "Identified key concepts and entities",
+        delay=0.5,
+        jitter=0.2,
+        is_fast_forward=should_fast_forward
+    )
+
+    Display.pause(0.38, jitter=0.18, minimum=0.2, fast_forward=should_fast_forward())
+    Display.step(3, 5, "Cross-referencing sources...")
+    Display.progress_message(
+        "Comparing information across sources",
+        delay=0.5,
+        jitter=0.2,
+        is_fast_forward=should_fast_forward
+    )
+    Display.progress_message(
+        "Fact-checking claims",
+        delay=0.45,
+        jitter=0.18,
+        is_fast_forward=should_fast_forward
+    )
+
+    Display.pause(0.42, jitter=0.2, minimum=0.22, fast_forward=should_fast_forward())
+    Display.step(4, 5, "Synthesizing information...")
+    Display.progress_message(
+        "Organizing key points",
+        delay=0.48,
+        jitter=0.18,
+        is_fast_forward=should_fast_forward
+    )
+    Display.progress_message(
+        "Building coherent narrative",
+        delay=0.52,
+        jitter=0.22,
+        is_fast_forward=should_fast_forward
+    )
+
+    Display.pause(0.36, jitter=0.17, minimum=0.18, fast_forward=should_fast_forward())
+    Display.step(5, 5, "Finalizing answer...")
+
+    # Agents have been working for ~10+ seconds already - skip if done
+    Display.pause(0.3, jitter=0.12, minimum=0.15, fast_forward=should_fast_forward())  # Frontend delay only
+
+
+async def answer_query(query: str, use_cache: bool = True):
+    """Run the full search + racing agents pipeline for one query.
+
+    Args:
+        query: User query
+        use_cache: Set to False to bypass cached results
+    """
+    # Track total time
+    total_start = time.time()
+
+    # Validate configuration (silent)
+    Config.validate()
+
+    # Display query header
+    Display.header(query)
+
+    # Near-duplicate of a recently answered query: skip search and generation entirely.
+    # Answers past the soft TTL of the query's freshness class are still served
+    # (stale-while-revalidate) while a background process fetches a fresh one.
+    semantic_cache = get_semantic_cache() if use_cache and Config.SEMANTIC_CACHE_ENABLED else None
+    if semantic_cache is not None:
+        freshness, soft_ttl, hard_ttl = freshness_ttls(query)
+        cached = semantic_cache.lookup(query, max_age_seconds=hard_ttl)
+        if cached is not None:
+            stale = cached["age_seconds"] > soft_ttl
+            refresh_note = ""
+            if stale and claim_refresh(query):
+                spawn_refresh(query)
+                refresh_note = ", refreshing in background"
+            Display.success(
+                f"Answered from cache (matched \"{cached['query']}\", "
+                f"similarity {cached['similarity']:.2f}, {freshness.replace('_', '-')}, "
+                f"{format_age(cached['age_seconds'])} old{refresh_note})"
+            )
+            Display.answer(cached["answer"], time.time() - total_start)
+            return
+
+    # Size the search and the answer locally (microseconds, no LLM round-trip)
+    classification = get_query_classifier().classify(query)
+    result_count = classification["result_count"]
+    subqueries = plan_search(query, classification)
+
+    # Step 1: Fetch search results
+    plan_note = f", {len(subqueries)} sub-queries" if subqueries else ""
+    Display.step(1, 2, f"Fetching {result_count} search results ({classification['complexity']} query{plan_note})...")
+
+    # Open the OpenRouter connection while the SerpAPI request is in flight
+    prewarm = asyncio.create_task(aprewarm_openrouter())
+
+    race = build_race(classification, use_cache=use_cache)
+    llm_client = race.agents[0].llm_client
+    ui_abort = False
+
+    def should_fast_forward() -> bool:
+        # Fast-forward the UI as soon as any agent starts streaming its answer
+        return ui_abort or race.first_token.is_set()
+
+    try:
+        serpapi_client = SerpAPIClient(use_cache=use_cache)
+        answer_cache = get_answer_cache() if use_cache and Config.ANSWER_CACHE_ENABLED else None
+        sources = await search_sources(query, classification, subqueries, serpapi_client, race, answer_cache)
+        search_data, direct, reused = sources["search_data"], sources["direct"], sources["reused"]
+        search_results = search_data["results"]
+        for engine, error in serpapi_client.last_engine_errors.items():
+            Display.warning(f"Skipped {engine} results: {error}")
+        for subquery, error in search_data.get("subquery_errors", {}).items():
+            Display.warning(f"Skipped sub-query \"{subquery}\": {error}")
+
+        if direct is not None:
+            cached_note = " (cached)" if serpapi_client.last_from_cache else ""
+            Display.success(f"Retrieved {len(search_results)} results{cached_note}")
+            Display.success(f"Answered directly from Google's {direct['block']}")
+            best_response = render_direct_answer(direct)
+            with Display.streaming_answer() as update:
+                first_token_elapsed = time.time() - total_start
+                update(best_response)
+        elif reused is not None:
+            cached_note = " (cached)" if serpapi_client.last_from_cache else ""
+            Display.success(f"Retrieved {len(search_results)} results{cached_note}")
+            Display.success(
+                f"Sources unchanged since an answer {format_age(reused['age_seconds'])} ago; reusing it"
+            )
+            best_response = reused["answer"]
+            with Display.streaming_answer() as update:
+                first_token_elapsed = time.time() - total_start
+                update(best_response)
+        else:
+            # === PRIMARY AGENT STARTS IMMEDIATELY (BACKGROUND TASKS) ===
+            # Don't wait for UI - start now; backups launch only if it is slow
+            await start_race(race, query, search_data)
+
+            # === FRONTEND: Smooth sequential UI (purely cosmetic delays) ===
+            await asyncio.to_thread(
+                show_progress,
+                search_results,
+                serpapi_client.last_from_cache,
+                should_fast_forward,
+                search_data["duplicates_removed"]
+            )
+
+            # Use spinner to show progress until the first token arrives (reactive UI)
+            with Display.spinner("Formatting response with citations"):
+                # The FIRST attempt to produce a token wins the race
+                best_response = await race.wait_for_winner(
+                    on_failure=report_failure(race)
+                )
+
+            # Stream the winner's answer into the answer panel, then add the
+            # citation list locally instead of having the model copy the URLs
+            def restart(agent_num: int, error: Exception):
+                # The winner was rejected mid-answer: a standby (or a fresh attempt) replaces it
+                Display.warning(f"Agent {agent_num} rejected: {str(error)}; switching to another attempt")
+
+            with Display.streaming_answer() as update:
+                first_token_elapsed = time.time() - total_start
+                update(best_response)
+                body = await stream_answer(
+                    race,
+                    best_response,
+                    update,
+                    on_restart=restart,
+                    on_failure=report_failure(race)
+                )
+                stream_seconds = time.time() - total_start - first_token_elapsed
+                best_response = with_citations(body, search_data)
+                update(best_response)
+
+    finally:
+        # Stop the cosmetic UI and cancel any agents that are still running
+        # (standbys are normally cancelled once the winner has passed the gate)
+        ui_abort = True
+        prewarm.cancel()
+        await race.cancel()
+        await aclose_async_httpx_client()
+
+    if answer_cache is not None and reused is None and direct is None:
+        answer_cache.set(sources["answer_key"], best_response)
+    if reused is None and direct is None:
+        get_query_classifier().record_outcome(query, best_response, len(search_results))
+    if semantic_cache is not None:
+        semantic_cache.add(query, best_response, search_results)
+
+    # Calculate total elapsed time
+    total_elapsed = time.time() - total_start
+
+    # Timing footer: time-to-first-token and total time
+    Display.timing(total_elapsed, first_token_elapsed)
+
+    token_report = race.token_report()
+    if token_report["launched"]:
+        Display.race_summary(
+            token_report["launched"],
+            token_report["cancelled"],
+            token_report["saved"],
+            token_report["rejected"]
+        )
+        rate, races = race.fastest_rejection_rate()
+        if token_report["fastest_rejected"] or (races >= Config.LATENCY_MIN_SAMPLES and rate):
+            Display.gate_summary(token_report["fastest_rejected"], rate, races)
+        Display.prompt_summary(race.usage.get(race.winner_num, {}))
+        # Nothing was saved if the model wrote its own list anyway
+        model_body = CitationFormatter.strip_citation_list(body)
+        citation_tokens = count_tokens(best_response[len(model_body):]) if model_body == body.rstrip() else 0
+        Display.citation_summary(
+            citation_tokens,
+            citation_tokens * seconds_per_token(race.usage.get(race.winner_num, {}), stream_seconds)
+        )
+    Display.cache_summary(
+        serpapi_client.last_from_cache if serpapi_client.cache is not None else None,
+        llm_client.cache.stats() if llm_client.cache is not None else None,
+        reused is not None if answer_cache is not None and direct is None else None
+    )
+
+
+def build_race(classification: Dict, use_cache: bool = True) -> AgentRace:
+    """Create the hedged race of answer agents for a classified query.
+
+    The agents are prepared upfront (instantiation is cheap; they share one
+    client and HTTP pool). Only the first is launched when the race starts;
+    the others are hedged backups.
+
+    Args:
+        classification: Result of QueryClassifier.classify()
+        use_cache: Set to False to bypass the completion cache
+
+    Returns:
+        The race, not yet started
+    """
+    llm_client = OpenAIClient(model=classification["model"], use_cache=use_cache)
+    return AgentRace([
+        ComprehensiveAgent(
+            llm_client,
+            max_tokens=classification["max_tokens"],
+            output_cap=classification["output_cap"]
+        )
+        for _ in range(Config.NUM_AGENTS)
+    ])
+
+
+async def search_sources(
+    query: str,
+    classification: Dict,
+    subqueries: List[str],
+    serpapi_client: SerpAPIClient,
+    race: AgentRace,
+    answer_cache: Optional[AnswerCache]
+) -> Dict:
+    """Search for a query and look for an answer that needs no generation.
+
+    A simple factual query that Google already answers gets a direct answer
+    (no LLM needed). Otherwise, an answer stored for the same query and the
+    same sources is reused instead of regenerating it.
+
+    Args:
+        query: User query
+        classification: Result of QueryClassifier.classify()
+        subqueries: Sub-queries from plan_search()
+        serpapi_client: Client for the search (its last_* attributes describe it)
+        race: The race that would generate the answer (keys the answer cache)
+        answer_cache: Answer cache to consult, or None
+
+    Returns:
+        Dict with 'search_data' (prepared, see prepare_search_data),
+        'direct' (from extract_direct_answer, or None), 'answer_key' and
+        'reused' (the answer cache entry, or None)
+    """
+    result_count = classification["result_count"]
+    search_data = await asearch_plan(serpapi_client, query, subqueries, fetch_count(result_count))
+    search_data = prepare_search_data(query, search_data, result_count)
+
+    direct = None
+    if Config.DIRECT_ANSWER_ENABLED and is_simple_query(query):
+        direct = extract_direct_answer(search_data, query)
+
+    answer_key = AnswerCache.make_key(
+        race.agents[0].llm_client.model,
+        race.agents[0].get_strategy_name(),
+        query,
+        fingerprint_results(search_data["results"] + search_data["context_blocks"])
+    )
+    reused = None
+    if answer_cache is not None and direct is None:
+        reused = answer_cache.get(answer_key)
+
+    return {"search_data": search_data, "direct": direct, "answer_key": answer_key, "reused": reused}
+
+
+async def start_race(race: AgentRace, query: str, search_data: Dict):
+    """Start the race on the prepared sources, with page extracts if enabled.
+
+    Args:
+        race: Race from build_race()
+        query: User query
+        search_data: Prepared search response (see search_sources)
+    """
+    # Optional page extracts, bounded by Config.PAGE_FETCH_DEADLINE
+    prompt_results = await enrich_results(query, search_data["results"])
+    race.start(query, prompt_results, search_data["context_blocks"])
+
+
+async def stream_answer(
+    race: AgentRace,
+    answer: str,
+    update: Optional[Callable[[str], None]] = None,
+    on_restart: Optional[Callable[[int, Exception], None]] = None,
+    on_failure: Optional[Callable[[int, Exception], None]] = None
+) -> str:
+    """Stream the rest of the race winner's answer, following any switch to another attempt.
+
+    Args:
+        race: Race whose winner is known (see AgentRace.wait_for_winner)
+        answer: The winner's first text delta
+        update: Optional callback invoked with the answer so far after each change
+        on_restart: Optional callback invoked when the winner is replaced
+            (the text so far is discarded before the new winner's is streamed)
+        on_failure: Optional callback for attempts that fail meanwhile
+
+    Returns:
+        The complete answer body, without the citation list
+    """
+    def restart(agent_num: int, error: Exception):
+        nonlocal answer
+        answer = ""
+        if on_restart:
+            on_restart(agent_num, error)
+
+    async for delta in race.stream_winner(on_restart=restart, on_failure=on_failure):
+        answer += delta
+        if update:
+            update(answer)
+    return answer
+
+
+def with_citations(body: str, search_data: Dict) -> str:
+    """Append the citation list, rendered locally from the sources, to an answer body."""
+    return CitationFormatter.with_citation_list(body, search_data["results"] + search_data["context_blocks"])
+
+
+def report_failure(race: AgentRace) -> Callable[[int, Exception], None]:
+    """Return an on_failure callback that warns about failed and rejected attempts."""
+    def on_failure(agent_num: int, error: Exception):
+        verb = "rejected" if agent_num in race.rejections else "failed"
+        Display.warning(f"Agent {agent_num} {verb}: {str(error)}")
+    return on_failure
+
+
+def plan_search(query: str, classification: Dict) -> List[str]:
+    """Return the sub-queries to search alongside the query (none for simple queries).
+
+    Args:
+        query: User query
+        classification: Result of QueryClassifier.classify()
 
     Returns:
-        Dict with 'agent_name' and 'response' keys
+        Sub-queries from the local planner, or an empty list
+    """
+    if not Config.QUERY_PLANNER_ENABLED or classification["complexity"] == "simple":
+        return []
+    return plan_subqueries(query)
+
+
+def fetch_count(result_count: int) -> int:
+    """Return how many search results to fetch so that result_count survive reranking."""
+    if not Config.RERANK_ENABLED:
+        return result_count
+    return max(result_count, min(result_count * Config.RERANK_FETCH_MULTIPLIER, Config.RERANK_MAX_CANDIDATES))
+
+
+def prepare_search_data(query: str, search_data: Dict, result_count: int) -> Dict:
+    """Dedupe the fetched candidates and keep the best result_count for the prompt.
+
+    Mirrored/duplicate results are collapsed so they don't waste prompt
+    tokens or citation slots; the survivors are reranked locally with BM25
+    (unless reranking is disabled, in which case the engine's order is kept).
+
+    Args:
+        query: User query
+        search_data: Response from SerpAPIClient.asearch_full()
+        result_count: Number of organic results to keep
+
+    Returns:
+        The prepared search response
+    """
+    search_data = dedupe_search_data(search_data)
+    if Config.RERANK_ENABLED:
+        return rerank_search_data(query, search_data, result_count)
+    return search_data
+
+
+async def enrich_results(query: str, search_results: List[Dict]) -> List[Dict]:
+    """Attach passages from the result pages when page fetching is enabled.
+
+    Pages that have not arrived by Config.PAGE_FETCH_DEADLINE are skipped,
+    so this never delays the answer by more than the deadline.
+
+    Args:
+        query: User query
+        search_results: Prepared search results
+
+    Returns:
+        The results to put in the prompt (the input list if disabled)
+    """
+    if not Config.PAGE_FETCH_ENABLED or not search_results:
+        return search_results
+    return await PageFetcher().enrich(query, search_results)
+
+
+def seconds_per_token(usage: Dict, stream_seconds: float) -> float:
+    """Return the winner's observed decode time per output token (0.0 if unknown).
+
+    Args:
+        usage: The winning agent's usage dict (see AgentRace.usage)
+        stream_seconds: Time from its first to its last token
+    """
+    tokens = usage.get("completion_tokens", usage.get("chunks", 0))
+    return stream_seconds / tokens if tokens else 0.0
+
+
+def format_age(seconds: float) -> str:
+    """Format an age in seconds as a short human-readable string."""
+    if seconds < 60:
+        return f"{seconds:.0f}s"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 86400:
+        return f"{seconds / 3600:.0f}h"
+    return f"{seconds / 86400:.0f}d"
+
+
+def spawn_refresh(query: str):
+    """Start a detached process that regenerates the cached answer for a query.
+
+    The CLI exits as soon as the stale answer is shown, so the refresh runs
+    in its own session and outlives this process. Failures are ignored; the
+    stale entry simply stays until its hard TTL.
+
+    Args:
+        query: User query to refresh
     """
     try:
-        response = agent.process_query(query, search_results)
-        return {
-            "agent_name": agent.get_strategy_name(),
-            "response": response
-        }
-    except Exception as e:
-        # Re-raise to fail fast
-        raise Exception(f"{agent.get_strategy_name()} failed: {str(e)}") from e
+        subprocess.Popen(
+            [sys.executable, "-m", "src.main", "--refresh", query],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+    except OSError:
+        pass
+
+
+async def refresh_answer(query: str):
+    """Regenerate and cache the answer for a query without any UI.
+
+    Search results are always fetched fresh; if they match the sources of a
+    stored answer, that answer is reused instead of generating a new one.
+
+    Args:
+        query: User query
+    """
+    Config.validate()
+
+    classification = get_query_classifier().classify(query)
+    race = build_race(classification)
+    answer_cache = get_answer_cache() if Config.ANSWER_CACHE_ENABLED else None
+    try:
+        sources = await search_sources(
+            query,
+            classification,
+            plan_search(query, classification),
+            SerpAPIClient(use_cache=False),
+            race,
+            answer_cache
+        )
+        search_data = sources["search_data"]
+
+        if sources["direct"] is not None:
+            answer = render_direct_answer(sources["direct"])
+        elif sources["reused"] is not None:
+            answer = sources["reused"]["answer"]
+        else:
+            await start_race(race, query, search_data)
+            answer = with_citations(await stream_answer(race, await race.wait_for_winner()), search_data)
+            if answer_cache is not None:
+                answer_cache.set(sources["answer_key"], answer)
+    finally:
+        await race.cancel()
+        await aclose_async_httpx_client()
+
+    get_semantic_cache().add(query, answer, search_data["results"])
+
+
 def main():
     """Main entry point for the CLI application."""
     parser = argparse.ArgumentParser(
@@ -45,167 +576,35 @@ def main():
         nargs="+",
         help="Search query to process"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass cached results and always call the APIs"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help=argparse.SUPPRESS  # Internal: background stale-while-revalidate refresh
+    )
 
     args = parser.parse_args()
     query = " ".join(args.query)
 
-    # Track total time
-    total_start = time.time()
-
-    try:
-        # Validate configuration (silent)
-        Config.validate()
-
-        # Display query header
-        Display.header(query)
-
-        # Step 1: Fetch search results (fixed at 7 for speed)
-        Display.step(1, 2, "Fetching search results...")
-
-        # Prepare agents upfront (instantiation is cheap)
-        agents = [
-            ComprehensiveAgent(),
-            ComprehensiveAgent(),
-            ComprehensiveAgent()
-        ]
-        executor = ThreadPoolExecutor(max_workers=3)
-        best_response = None
-        winner_num = None
-        agent_future_started = False
-
+    if args.refresh:
         try:
-            result_count = 7  # Fixed for optimal latency
-            serpapi_client = SerpAPIClient()
-            search_results = serpapi_client.search(query, num_results=result_count)
-
-            # === AGENTS START RACING IMMEDIATELY (BACKGROUND) ===
-            # Don't wait for UI - start agents NOW while we show the UI
-            futures = {
-                executor.submit(run_agent, agent, query, search_results): i
-                for i, agent in enumerate(agents, 1)
-            }
-            agent_future_started = True
-            # === BACKEND WORKING IN PARALLEL ===
-
-            # Track if we should fast-forward UI once an agent finishes
-            fast_forward_state = {"value": False}
-
-            def should_fast_forward() -> bool:
-                if fast_forward_state["value"]:
-                    return True
-                for future in futures.keys():
-                    if future.done() and future.exception() is None:
-                        fast_forward_state["value"] = True
-                        return True
-                return False
-
-            # === FRONTEND: Smooth sequential UI (purely cosmetic delays) ===
-            # Show success after fetch completes
-            Display.pause(0.4, jitter=0.18, minimum=0.2, fast_forward=should_fast_forward())  # Slight pause for smooth reading
-            Display.success(f"Retrieved {len(search_results)} results")
-
-            # Show ALL search results sequentially (one at a time for maximum engagement)
-            # While user reads these, agents are already processing in background
-            # With 7 sources @ 0.5s each = ~3.5s of engaging reading time
-            Display.pause(0.4, jitter=0.22, minimum=0.2, fast_forward=should_fast_forward())  # Frontend pause only
-            Display.search_results_preview(
-                search_results,
-                sequential_delay=0.5,
-                jitter=0.25,
-                is_fast_forward=should_fast_forward
-            )  # ~3.5s total with 7 sources
-
-            # By now agents have been working for ~4+ seconds already!
-            # Add more progress steps to keep user engaged
-            Display.pause(0.35, jitter=0.15, minimum=0.18, fast_forward=should_fast_forward())
-            Display.step(2, 5, "Analyzing query complexity...")
-            Display.progress_message(
-                "Identified key concepts and entities",
-                delay=0.5,
-                jitter=0.2,
-                is_fast_forward=should_fast_forward
-            )
-
-            Display.pause(0.38, jitter=0.18, minimum=0.2, fast_forward=should_fast_forward())
-            Display.step(3, 5, "Cross-referencing sources...")
-            Display.progress_message(
-                "Comparing information across sources",
-                delay=0.5,
-                jitter=0.2,
-                is_fast_forward=should_fast_forward
-            )
-            Display.progress_message(
-                "Fact-checking claims",
-                delay=0.45,
-                jitter=0.18,
-                is_fast_forward=should_fast_forward
-            )
-
-            Display.pause(0.42, jitter=0.2, minimum=0.22, fast_forward=should_fast_forward())
-            Display.step(4, 5, "Synthesizing information...")
-            Display.progress_message(
-                "Organizing key points",
-                delay=0.48,
-                jitter=0.18,
-                is_fast_forward=should_fast_forward
-            )
-            Display.progress_message(
-                "Building coherent narrative",
-                delay=0.52,
-                jitter=0.22,
-                is_fast_forward=should_fast_forward
-            )
-
-            Display.pause(0.36, jitter=0.17, minimum=0.18, fast_forward=should_fast_forward())
-            Display.step(5, 5, "Finalizing answer...")
-
-            # Use spinner to show progress during final generation (reactive UI)
-            # Agents have been working for ~10+ seconds already - exit immediately if done
-            Display.pause(0.3, jitter=0.12, minimum=0.15, fast_forward=should_fast_forward())  # Frontend delay only
-            with Display.spinner("Formatting response with citations"):
-                # as_completed() returns futures in order of completion
-                # We take the FIRST one that succeeds and exit immediately
-                for future in as_completed(futures):
-                    agent_num = futures[future]
-                    try:
-                        response_data = future.result()
-                        best_response = response_data['response']
-                        winner_num = agent_num
-                        # Immediately shutdown without waiting for other threads
-                        executor.shutdown(wait=False, cancel_futures=True)
-                        break
-                    except Exception as e:
-                        Display.warning(f"Agent {agent_num} failed: {str(e)}")
-                        continue
-
-                if best_response is None:
-                    raise Exception("All agents failed to generate a response")
-
-        finally:
-            # Clean up executor if not already shutdown
-            if agent_future_started and executor._shutdown == False:
-                executor.shutdown(wait=False, cancel_futures=True)
-
-        # Success - answer generated (brief confirmation)
-        Display.success("Answer complete! ⚡")
-        Display.pause(0.5, jitter=0.25, minimum=0.25, fast_forward=should_fast_forward())  # Dramatic pause before showing answer
-
-        # Calculate total elapsed time
-        total_elapsed = time.time() - total_start
-
-        # Display results with nice formatting
-        Display.answer(best_response, total_elapsed)
-
-        # Force exit IMMEDIATELY (don't wait for background threads at all)
-        # os._exit() bypasses Python cleanup and terminates instantly
-        os._exit(0)
+            asyncio.run(refresh_answer(query))
+        except Exception:
+            sys.exit(1)
+        return
 
+    try:
+        asyncio.run(answer_query(query, use_cache=not args.no_cache))
     except KeyboardInterrupt:
         Display.warning("\nOperation cancelled by user.")
-        os._exit(1)
+        sys.exit(1)
     except Exception as e:
         Display.error(f"Error: {str(e)}")
-        os._exit(1)
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,130 @@
+"""Extra context from SerpAPI (answer snippets, related questions, top stories) under a token budget."""
+
+import re
+from typing import List, Dict, Any
+from src.config import Config
+from src.utils.token_counter import count_tokens
+from src.utils.source_compactor import format_source_header
+
+
+# Base usefulness of each block kind; query-term overlap is added on top
+KIND_WEIGHTS = {
+    "answer_box": 3.0,
+    "knowledge_graph": 2.5,
+    "related_question": 2.0,
+    "top_story": 1.0,
+}
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def build_context_blocks(data: Dict[str, Any], first_index: int) -> List[Dict[str, Any]]:
+    """Turn the non-organic blocks of a SerpAPI response into citable sources.
+
+    Each block gets a citation index continuing after the organic results, so
+    agents can cite it like any other source. Blocks without a link are
+    dropped because they could not be cited.
+
+    Args:
+        data: Decoded SerpAPI JSON response
+        first_index: Citation index for the first block
+
+    Returns:
+        List of dicts with 'index', 'kind', 'title', 'link' and 'snippet'
+    """
+    blocks = []
+
+    answer_box = data.get("answer_box") or {}
+    answer_text = answer_box.get("answer") or answer_box.get("result") or answer_box.get("snippet")
+    if answer_text and answer_box.get("link"):
+        blocks.append({
+            "kind": "answer_box",
+            "title": answer_box.get("title", "Answer box"),
+            "link": answer_box["link"],
+            "snippet": str(answer_text),
+        })
+
+    knowledge_graph = data.get("knowledge_graph") or {}
+    source = knowledge_graph.get("source") or {}
+    if knowledge_graph.get("description") and source.get("link"):
+        blocks.append({
+            "kind": "knowledge_graph",
+            "title": knowledge_graph.get("title", source.get("name", "")),
+            "link": source["link"],
+            "snippet": knowledge_graph["description"],
+        })
+
+    for question in data.get("related_questions", []):
+        if question.get("question") and question.get("snippet") and question.get("link"):
+            blocks.append({
+                "kind": "related_question",
+                "title": question["question"],
+                "link": question["link"],
+                "snippet": question["snippet"],
+            })
+
+    for story in data.get("top_stories", []):
+        if story.get("title") and story.get("link"):
+            details = " · ".join(str(story[field]) for field in ("source", "date") if story.get(field))
+            blocks.append({
+                "kind": "top_story",
+                "title": story["title"],
+                "link": story["link"],
+                "snippet": details,
+            })
+
+    for offset, block in enumerate(blocks):
+        block["index"] = first_index + offset
+    return blocks
+
+
+def format_block(block: Dict[str, Any], compact: bool = None) -> str:
+    """Format one context block for the prompt, in the same shape as organic results.
+
+    Args:
+        block: Block from build_context_blocks()
+        compact: Use compact source headers. If not provided, uses Config.PROMPT_COMPACT_SOURCES
+    """
+    compact = compact if compact is not None else Config.PROMPT_COMPACT_SOURCES
+    label = block["kind"].replace("_", " ")
+    return f"{format_source_header(block, label, compact)}{block['snippet']}\n"
+
+
+def select_blocks(
+    query: str,
+    blocks: List[Dict[str, Any]],
+    budget_tokens: int = None
+) -> List[Dict[str, Any]]:
+    """Pick the most useful blocks that fit in a hard token budget.
+
+    Blocks are ranked by kind weight plus the fraction of query words they
+    contain, then added greedily while they fit. The result keeps citation
+    order so the prompt reads naturally.
+
+    Args:
+        query: The user query
+        blocks: Blocks from build_context_blocks()
+        budget_tokens: Token budget for all blocks. If not provided, uses
+            Config.CONTEXT_BLOCK_TOKEN_BUDGET
+
+    Returns:
+        The selected blocks, ordered by citation index
+    """
+    budget = budget_tokens if budget_tokens is not None else Config.CONTEXT_BLOCK_TOKEN_BUDGET
+    query_words = set(_WORD_PATTERN.findall(query.lower()))
+
+    def usefulness(block: Dict[str, Any]) -> float:
+        words = set(_WORD_PATTERN.findall(f"{block['title']} {block['snippet']}".lower()))
+        overlap = len(query_words & words) / len(query_words) if query_words else 0.0
+        return KIND_WEIGHTS.get(block["kind"], 0.0) + overlap
+
+    selected = []
+    used = 0
+    for block in sorted(blocks, key=usefulness, reverse=True):
+        # +1 for the blank line joining entries
+        cost = count_tokens(format_block(block)) + 1
+        if used + cost <= budget:
+            selected.append(block)
+            used += cost
+
+    return sorted(selected, key=lambda block: block["index"])
@@ -0,0 +1,182 @@
+"""Near-duplicate detection and merging of search results before prompting."""
+
+import re
+from typing import List, Dict, Any, Optional, FrozenSet
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid",
+    "ref", "ref_src", "ref_url", "source", "cmpid", "ncid", "spm", "_ga",
+})
+_TRACKING_PREFIXES = ("utm_",)
+_HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_INDEX_PAGE = re.compile(r"/(index|default)\.(html?|php|aspx?)$", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"\w+")
+
+NEAR_DUPLICATE_JACCARD = 0.6  # Shingle overlap at or above which snippets are near-duplicates
+MIN_SHINGLE_WORDS = 8  # Shorter snippets are too generic to compare
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL so that mirrors of the same page compare equal.
+
+    Lowercases the scheme and host, drops 'www.'/'m.'/'amp.' host prefixes,
+    AMP and index-page suffixes, fragments, trailing slashes and tracking
+    parameters, and sorts the remaining query parameters. http and https
+    are treated as the same page.
+
+    Args:
+        url: URL as returned by the search engine
+
+    Returns:
+        Canonical form of the URL (the input, stripped, if it cannot be parsed)
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    host = parts.netloc.lower()
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    if host.endswith(":80") or host.endswith(":443"):
+        host = host.rsplit(":", 1)[0]
+
+    path = _INDEX_PAGE.sub("/", parts.path)
+    if path.endswith("/amp"):
+        path = path[:-len("/amp")]
+    path = path.rstrip("/")
+
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    ]
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def shingles(text: str) -> Optional[FrozenSet[str]]:
+    """Return the set of word bigrams of a text.
+
+    Args:
+        text: Text to fingerprint
+
+    Returns:
+        The shingle set, or None if the text is too short to compare reliably
+    """
+    words = _WORD_PATTERN.findall(text.lower())
+    if len(words) < MIN_SHINGLE_WORDS:
+        return None
+    return frozenset(f"{a} {b}" for a, b in zip(words, words[1:]))
+
+
+def is_near_duplicate(a: Optional[FrozenSet[str]], b: Optional[FrozenSet[str]]) -> bool:
+    """Return True if two shingle sets overlap by at least NEAR_DUPLICATE_JACCARD.
+
+    Snippets are short and a search returns at most a few dozen, so the exact
+    Jaccard similarity is cheap; MinHash/SimHash sketches would only add
+    error at this size.
+    """
+    if not a or not b:
+        return False
+    return len(a & b) / len(a | b) >= NEAR_DUPLICATE_JACCARD
+
+
+def dedupe_results(
+    results: List[Dict[str, Any]],
+    first_index: int = 1,
+    seen: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    """Collapse near-duplicate results, keeping the best-ranked copy of each.
+
+    Results with the same canonical URL are merged: the kept result gets the
+    duplicate's snippet appended when it adds new text. Results whose
+    snippet is a near-duplicate (shingle overlap) of an already kept one, such as
+    syndicated or mirrored articles, are dropped. Results without a link
+    (e.g. some context blocks) are only compared by snippet. The survivors are
+    renumbered contiguously from first_index, so prompt indices and
+    citations stay aligned.
+
+    Args:
+        results: Results (or context blocks) in rank order
+        first_index: Citation index for the first kept result
+        seen: Already kept results to dedupe against (they are not modified)
+
+    Returns:
+        New list of kept results; each has a 'duplicates' count
+    """
+    kept: List[Dict[str, Any]] = []
+    fingerprints = [(_url_key(r), shingles(r.get("snippet", ""))) for r in seen or []]
+
+    for result in results:
+        url = _url_key(result)
+        fingerprint = shingles(result.get("snippet", ""))
+
+        match = None
+        for position, (kept_url, kept_fingerprint) in enumerate(fingerprints):
+            if (url is not None and url == kept_url) or is_near_duplicate(fingerprint, kept_fingerprint):
+                match = position
+                break
+
+        if match is None:
+            kept.append(dict(result, duplicates=0))
+            fingerprints.append((url, fingerprint))
+            continue
+
+        offset = match - len(seen or [])
+        if offset < 0:
+            # Duplicate of something already in 'seen'
+            continue
+        original = kept[offset]
+        original["duplicates"] += 1
+        snippet = result.get("snippet", "")
+        if (
+            url is not None
+            and url == fingerprints[match][0]
+            and snippet
+            and snippet not in original.get("snippet", "")
+            and not is_near_duplicate(fingerprint, fingerprints[match][1])
+        ):
+            original["snippet"] = f"{original.get('snippet', '')} … {snippet}".strip(" …")
+
+    for offset, result in enumerate(kept):
+        result["index"] = first_index + offset
+    return kept
+
+
+def _url_key(result: Dict[str, Any]) -> Optional[str]:
+    """Return the canonical URL of a result, or None if it has no link."""
+    link = (result.get("link") or "").strip()
+    return canonical_url(link) if link else None
+
+
+def dedupe_search_data(search_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Dedupe the organic results and context blocks of a search response.
+
+    Organic results are deduped among themselves and renumbered from 1;
+    context blocks are then deduped against them and each other and
+    numbered after the organic results.
+
+    Args:
+        search_data: Response from SerpAPIClient.search_full()
+
+    Returns:
+        Copy of search_data with deduped 'results' and 'context_blocks' and
+        'duplicates_removed' (how many entries were collapsed)
+    """
+    results = search_data.get("results", [])
+    blocks = search_data.get("context_blocks", [])
+
+    kept_results = dedupe_results(results)
+    kept_blocks = dedupe_results(blocks, first_index=len(kept_results) + 1, seen=kept_results)
+
+    removed = len(results) + len(blocks) - len(kept_results) - len(kept_blocks)
+    return dict(
+        search_data,
+        results=kept_results,
+        context_blocks=kept_blocks,
+        duplicates_removed=removed,
+    )
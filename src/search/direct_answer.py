@@ -0,0 +1,155 @@
+"""Zero-LLM answers built from SerpAPI answer_box and knowledge_graph blocks."""
+
+import re
+from typing import List, Dict, Any, Optional
+
+
+# Wording that asks for synthesis rather than a single fact
+_COMPLEX_PATTERN = re.compile(
+    r"\b(compare|comparison|versus|vs\.?|why|how (does|do|can|should|to)|explain|"
+    r"analy[sz]e|impacts?|effects?|pros and cons|advantages|disadvantages|benefits|"
+    r"differences?|should i|best way|strategies|implications|latest|developments)\b",
+    re.IGNORECASE
+)
+
+# "What is X" / "Who was X": the only questions a knowledge graph description answers
+_DEFINITION_PATTERN = re.compile(
+    r"^\s*(?:what|who)(?:'s|\s+is|\s+are|\s+was|\s+were)\s+(?:(?:a|an|the)\s+)?(?P<subject>.+?)[\s?.!]*$",
+    re.IGNORECASE
+)
+_WORD = re.compile(r"[a-z0-9]+")
+
+MAX_SIMPLE_QUERY_WORDS = 10
+
+
+def is_simple_query(query: str) -> bool:
+    """Return True if a query asks for a single fact a direct answer can settle.
+
+    Args:
+        query: The user query
+
+    Returns:
+        True for short factual lookups such as "What is the capital of France?"
+    """
+    if len(query.split()) > MAX_SIMPLE_QUERY_WORDS:
+        return False
+    return not _COMPLEX_PATTERN.search(query)
+
+
+def extract_direct_answer(search_data: Dict[str, Any], query: str) -> Optional[Dict[str, Any]]:
+    """Pull a direct answer out of a SerpAPI response.
+
+    Answer boxes are preferred over the knowledge graph. Within an answer box,
+    an explicit short answer (e.g. "Paris") or computed result wins over the
+    featured snippet. The knowledge graph description is only used for
+    definitional queries about the graph's own subject ("Who is Tim Cook"),
+    since it does not answer other questions about it ("Who is the CEO of
+    Apple" would get Apple's company blurb).
+
+    Args:
+        search_data: Response from SerpAPIClient.search_full()
+        query: The user query
+
+    Returns:
+        Dict with 'answer', 'details' (supporting lines), 'title' and 'link'
+        of the source and 'block' (the SerpAPI block used), or None if the
+        response has no usable direct answer
+    """
+    answer_box = search_data.get("answer_box") or {}
+    knowledge_graph = search_data.get("knowledge_graph") or {}
+
+    if answer_box:
+        answer = _answer_box_text(answer_box)
+        if answer:
+            details = [str(item) for item in answer_box.get("list", [])[:5]]
+            snippet = answer_box.get("snippet")
+            if snippet and snippet != answer:
+                details.insert(0, snippet)
+            return {
+                "answer": answer,
+                "details": details,
+                "title": answer_box.get("title") or "Google answer box",
+                "link": answer_box.get("link") or _first_link(search_data),
+                "block": "answer box",
+            }
+
+    description = knowledge_graph.get("description")
+    if knowledge_graph.get("title") and description and asks_for_definition(query, knowledge_graph["title"]):
+        kind = knowledge_graph.get("type")
+        answer = f"**{knowledge_graph['title']}**"
+        if kind:
+            answer += f" ({kind})"
+        source = knowledge_graph.get("source") or {}
+        return {
+            "answer": f"{answer}: {description}",
+            "details": [],
+            "title": source.get("name") or knowledge_graph["title"],
+            "link": source.get("link") or _first_link(search_data),
+            "block": "knowledge graph",
+        }
+
+    return None
+
+
+def asks_for_definition(query: str, title: str) -> bool:
+    """Return True if the query asks what or who the titled entity is.
+
+    Args:
+        query: The user query
+        title: Knowledge graph title, e.g. "Albert Einstein"
+
+    Returns:
+        True for "what is X" / "who is X" where every word of X is in the
+        title ("who was Einstein" matches "Albert Einstein")
+    """
+    match = _DEFINITION_PATTERN.match(query)
+    if not match:
+        return False
+    subject = _WORD.findall(match.group("subject").lower())
+    return bool(subject) and set(subject) <= set(_WORD.findall(title.lower()))
+
+
+def render_direct_answer(direct: Dict[str, Any]) -> str:
+    """Render a direct answer in the same markdown layout the agents use.
+
+    Args:
+        direct: Direct answer from extract_direct_answer()
+
+    Returns:
+        Markdown answer citing the direct-answer source as [1]
+    """
+    lines = ["## Direct Answer", f"{direct['answer']} [1]"]
+    if direct["details"]:
+        lines += ["", "## Key Points"]
+        lines += [f"- {detail} [1]" for detail in direct["details"]]
+    lines += ["", "## Citations", f"[1] {direct['title']} - {direct['link']}"]
+    return "\n".join(lines)
+
+
+def _answer_box_text(answer_box: Dict[str, Any]) -> Optional[str]:
+    """Return the main answer text of an answer box, whatever its type."""
+    for field in ("answer", "result"):
+        if answer_box.get(field):
+            return str(answer_box[field])
+
+    if answer_box.get("type") == "weather_result" and answer_box.get("temperature"):
+        unit = answer_box.get("unit", "")
+        weather = answer_box.get("weather", "")
+        location = answer_box.get("location", "")
+        return f"{answer_box['temperature']}°{unit[:1].upper()} and {weather.lower()} in {location}".strip()
+
+    if answer_box.get("price") and answer_box.get("stock"):
+        currency = answer_box.get("currency", "")
+        return f"{answer_box['stock']} is trading at {answer_box['price']} {currency}".strip()
+
+    definitions: List[str] = answer_box.get("definitions") or []
+    if definitions:
+        return str(definitions[0])
+
+    return answer_box.get("snippet")
+
+
+def _first_link(search_data: Dict[str, Any]) -> str:
+    """Return the top organic result link as a fallback citation."""
+    results = search_data.get("results") or []
+    return results[0]["link"] if results else ""
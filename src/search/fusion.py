@@ -0,0 +1,109 @@
+"""Reciprocal rank fusion of result lists from several search engines."""
+
+from typing import List, Dict, Any, Hashable, Tuple
+from src.config import Config
+from src.search.dedupe import canonical_url
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[Tuple[str, List[Dict[str, Any]]]],
+    limit: int,
+    k: int = None,
+    label_key: str = "engines"
+) -> List[Dict[str, Any]]:
+    """Merge ranked result lists into one, scoring each page by sum(1 / (k + rank)).
+
+    Results are matched across lists by canonical URL (results without a
+    link are never merged). Each merged result is the copy from the list
+    where the page ranked best, with the longest snippet any list had for
+    it, and records the lists that found it. RRF
+    needs no score calibration between engines, and a page that several
+    engines agree on rises above one that only a single engine ranks
+    highly.
+
+    Args:
+        ranked_lists: (label, results in rank order) pairs, e.g. one per
+            engine; earlier lists win ties
+        limit: Maximum number of merged results
+        k: RRF damping constant. If not provided, uses Config.RRF_K
+        label_key: Result field listing the labels of the lists that found it
+
+    Returns:
+        Merged results in fused order, with 'index' and 'position' set to
+        the fused rank and label_key listing where each was found
+    """
+    k = k if k is not None else Config.RRF_K
+    merged: Dict[Hashable, Dict[str, Any]] = {}
+    scores: Dict[Hashable, float] = {}
+    best_rank: Dict[Hashable, int] = {}
+
+    for label, results in ranked_lists:
+        for rank, result in enumerate(results, 1):
+            key = _fusion_key(label, rank, result)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+            if key not in merged:
+                merged[key] = dict(result, **{label_key: [label]})
+                best_rank[key] = rank
+                continue
+
+            entry = merged[key]
+            if label not in entry[label_key]:
+                entry[label_key].append(label)
+            if rank < best_rank[key]:
+                best_rank[key] = rank
+                merged[key] = dict(result, **{label_key: entry[label_key], "snippet": entry.get("snippet", "")})
+                entry = merged[key]
+            if len(result.get("snippet", "")) > len(entry.get("snippet", "")):
+                entry["snippet"] = result["snippet"]
+
+    # sorted() is stable, so ties keep first-seen order (earlier lists first)
+    order = sorted(merged, key=lambda key: scores[key], reverse=True)[:limit]
+    return [
+        dict(merged[key], index=rank, position=rank)
+        for rank, key in enumerate(order, 1)
+    ]
+
+
+def _fusion_key(label: str, rank: int, result: Dict[str, Any]) -> Hashable:
+    """Return the key a result is matched on across lists.
+
+    That is its canonical URL; a result without a link cannot be matched,
+    so it gets a key of its own (list label, rank and title).
+    """
+    link = (result.get("link") or "").strip()
+    return canonical_url(link) if link else (label, rank, result.get("title", ""))
+
+
+def fuse_search_data(responses: List[Tuple[str, Dict[str, Any]]], limit: int) -> Dict[str, Any]:
+    """Fuse parsed responses from several engines into one search response.
+
+    Organic results are merged with reciprocal_rank_fusion(). The answer box
+    and knowledge graph come from the first engine that returned one, and
+    every engine's context blocks are kept (duplicates are collapsed later
+    by dedupe_search_data) and numbered after the fused results.
+
+    Args:
+        responses: (engine name, response from SerpAPIClient._parse_response()) pairs
+        limit: Maximum number of organic results
+
+    Returns:
+        Dict with 'results', 'answer_box', 'knowledge_graph', 'context_blocks'
+        and 'engines' (the engines that contributed)
+    """
+    results = reciprocal_rank_fusion([(engine, data["results"]) for engine, data in responses], limit)
+    blocks = [block for _, data in responses for block in data.get("context_blocks", [])]
+
+    return {
+        "results": results,
+        "answer_box": next((data["answer_box"] for _, data in responses if data.get("answer_box")), None),
+        "knowledge_graph": next(
+            (data["knowledge_graph"] for _, data in responses if data.get("knowledge_graph")),
+            None
+        ),
+        "context_blocks": [
+            dict(block, index=len(results) + offset)
+            for offset, block in enumerate(blocks, 1)
+        ],
+        "engines": [engine for engine, _ in responses],
+    }
@@ -0,0 +1,228 @@
+"""Concurrent full-page fetch and passage extraction for search results."""
+
+import asyncio
+import re
+from html.parser import HTMLParser
+from typing import List, Dict, Any, Optional
+import httpx
+from src.config import Config
+from src.search.reranker import BM25Reranker
+from src.transport.http_pool import get_async_httpx_client
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text of content blocks, skipping boilerplate elements."""
+
+    SKIP_TAGS = frozenset({
+        "script", "style", "noscript", "template", "svg", "nav", "header",
+        "footer", "aside", "form", "button", "select", "iframe",
+    })
+    BLOCK_TAGS = frozenset({
+        "p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th", "dd", "dt",
+        "blockquote", "pre", "article", "section", "div", "br", "tr",
+    })
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self):
+        text = re.sub(r"\s+", " ", "".join(self._current)).strip()
+        if text:
+            self.blocks.append(text)
+        self._current = []
+
+
+def extract_main_text(html: str, min_chars: int = None) -> List[str]:
+    """Extract the main-content paragraphs of an HTML page.
+
+    Navigation, headers, footers, scripts and forms are skipped, and short
+    blocks (menus, buttons, captions) are dropped.
+
+    Args:
+        html: Page HTML
+        min_chars: Minimum paragraph length. If not provided, uses Config.PAGE_FETCH_MIN_PARAGRAPH_CHARS
+
+    Returns:
+        Paragraphs in document order
+    """
+    min_chars = min_chars if min_chars is not None else Config.PAGE_FETCH_MIN_PARAGRAPH_CHARS
+    parser = _TextExtractor()
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception:
+        # Malformed markup: keep whatever was parsed before the error
+        pass
+    return [block for block in parser.blocks if len(block) >= min_chars]
+
+
+def select_passages(query: str, paragraphs: List[str], max_passages: int, max_chars: int) -> List[str]:
+    """Pick the paragraphs most relevant to the query.
+
+    Args:
+        query: The user query
+        paragraphs: Candidate paragraphs from one page
+        max_passages: Maximum number of passages to keep
+        max_chars: Passages longer than this are cut at a word boundary
+
+    Returns:
+        The best passages, in document order
+    """
+    if not paragraphs:
+        return []
+
+    scores = BM25Reranker(rank_prior=0.0).scores(query, [{"snippet": p} for p in paragraphs])
+    best = sorted(i for i in scores.argsort()[::-1][:max_passages] if scores[i] > 0)
+
+    passages = []
+    for i in best:
+        passage = paragraphs[i]
+        if len(passage) > max_chars:
+            passage = passage[:max_chars].rsplit(" ", 1)[0] + "…"
+        passages.append(passage)
+    return passages
+
+
+class PageFetcher:
+    """Fetches result pages concurrently and attaches query-relevant passages.
+
+    Fetching is bounded everywhere: a semaphore limits concurrent requests,
+    each request has its own timeout and byte cap (the body is streamed and
+    abandoned at the cap), and the whole stage has a deadline after which
+    unfinished fetches are cancelled and their results simply keep their
+    snippet. The HTTP client is injectable, so the stage can be pointed at
+    a local stand-in server or an httpx.MockTransport.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient = None,
+        max_concurrency: int = None,
+        request_timeout: float = None,
+        max_bytes: int = None,
+        deadline: float = None
+    ):
+        """Initialize the page fetcher.
+
+        Args:
+            client: Async HTTP client. If not provided, uses the shared pooled client
+            max_concurrency: Concurrent requests. If not provided, uses Config.PAGE_FETCH_CONCURRENCY
+            request_timeout: Per-request timeout in seconds. If not provided,
+                uses Config.PAGE_FETCH_TIMEOUT
+            max_bytes: Maximum bytes read per page. If not provided, uses Config.PAGE_FETCH_MAX_BYTES
+            deadline: Seconds the whole stage may take. If not provided, uses Config.PAGE_FETCH_DEADLINE
+        """
+        self.client = client
+        self.max_concurrency = max_concurrency or Config.PAGE_FETCH_CONCURRENCY
+        self.request_timeout = request_timeout or Config.PAGE_FETCH_TIMEOUT
+        self.max_bytes = max_bytes or Config.PAGE_FETCH_MAX_BYTES
+        self.deadline = deadline or Config.PAGE_FETCH_DEADLINE
+        self.stats: Dict[str, int] = {}
+
+    async def enrich(self, query: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Attach 'passages' from each result's page, within the deadline.
+
+        Args:
+            query: The user query, used to pick relevant passages
+            results: Search results to enrich
+
+        Returns:
+            New list of results; those whose page arrived in time and had
+            relevant text get a 'passages' list. Sets self.stats with
+            'fetched', 'failed' and 'late' counts.
+        """
+        client = self.client or get_async_httpx_client()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch_one(result: Dict[str, Any]) -> Optional[List[str]]:
+            async with semaphore:
+                html = await self._fetch_html(client, result.get("link", ""))
+            if html is None:
+                return None
+            paragraphs = await asyncio.to_thread(extract_main_text, html)
+            return select_passages(
+                query,
+                paragraphs,
+                Config.PAGE_FETCH_PASSAGES,
+                Config.PAGE_FETCH_PASSAGE_CHARS
+            )
+
+        tasks = [asyncio.create_task(fetch_one(result)) for result in results]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.deadline)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        enriched = []
+        self.stats = {"fetched": 0, "failed": 0, "late": 0}
+        for result, task in zip(results, tasks):
+            if task.cancelled():
+                self.stats["late"] += 1
+                enriched.append(result)
+                continue
+            # Best effort: a page that failed in any way keeps its snippet-only result
+            passages = task.result() if task.exception() is None else None
+            if passages is None:
+                self.stats["failed"] += 1
+                enriched.append(result)
+                continue
+            self.stats["fetched"] += 1
+            enriched.append(dict(result, passages=passages) if passages else result)
+        return enriched
+
+    async def _fetch_html(self, client: httpx.AsyncClient, url: str) -> Optional[str]:
+        """Stream one page up to the byte cap, returning None on any failure or non-HTML."""
+        if not url.startswith(("http://", "https://")):
+            return None
+
+        try:
+            async with client.stream(
+                "GET",
+                url,
+                timeout=self.request_timeout,
+                follow_redirects=True,
+                headers={"Accept": "text/html,application/xhtml+xml"},
+            ) as response:
+                if response.status_code != 200:
+                    return None
+                if "html" not in response.headers.get("content-type", "html"):
+                    return None
+
+                chunks = []
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        # Closing the stream early abandons the rest of the body
+                        break
+                body = b"".join(chunks)[:self.max_bytes]
+                return body.decode(response.encoding or "utf-8", errors="replace")
+
+        except (httpx.HTTPError, httpx.InvalidURL, UnicodeDecodeError, LookupError):
+            # InvalidURL (a malformed result link) is not an HTTPError
+            return None
@@ -0,0 +1,271 @@
+"""Local query-complexity classifier that sizes the search and the answer."""
+
+import json
+import os
+import re
+import threading
+from typing import List, Dict, Any, Optional
+import numpy as np
+from src.config import Config
+from src.cache.freshness import classify_freshness, TIME_SENSITIVE
+
+
+FEATURE_NAMES = [
+    "bias",
+    "words",
+    "entities",
+    "comparison",
+    "explanation",
+    "multi_part",
+    "time_sensitive",
+    "factoid",
+]
+
+# Hand-tuned starting weights for the predicted number of useful results;
+# replaced by weights fitted on logged outcomes once enough exist
+DEFAULT_WEIGHTS = {
+    "bias": 4.5,
+    "words": 0.12,
+    "entities": 0.3,
+    "comparison": 2.0,
+    "explanation": 1.5,
+    "multi_part": 1.0,
+    "time_sensitive": 1.5,
+    "factoid": -1.0,
+}
+
+_COMPARISON_PATTERN = re.compile(
+    r"\b(compare|comparison|compared|versus|vs\.?|differences?|better|pros and cons|"
+    r"advantages|disadvantages|trade-?offs?)\b",
+    re.IGNORECASE
+)
+_EXPLANATION_PATTERN = re.compile(
+    r"\b(why|how|explain|analy[sz]e|impacts?|effects?|implications|causes?|"
+    r"mechanisms?|works?|strategies)\b",
+    re.IGNORECASE
+)
+_FACTOID_PATTERN = re.compile(
+    r"^\s*(what is|what's|who is|who was|when (is|was|did)|where is|how (many|much|tall|old|far))\b",
+    re.IGNORECASE
+)
+_MULTI_PART_PATTERN = re.compile(r"\b(and|or|as well as|along with)\b|[,;]", re.IGNORECASE)
+_ENTITY_PATTERN = re.compile(r"\b[A-Z][a-zA-Z0-9]+|\b[A-Z]{2,}\b")
+_CITATION_PATTERN = re.compile(r"\[(\d+)\]")
+
+
+class QueryClassifier:
+    """Predicts how many search results a query needs from cheap text features.
+
+    The prediction is a linear model over features such as length, named
+    entities and comparison/explanation wording. It runs in microseconds,
+    replacing an LLM round-trip. Outcomes (how many of the fetched results
+    the answer actually cited) are appended to a log in the cache directory,
+    and the weights are refitted with ridge regression every
+    Config.CLASSIFIER_REFIT_EVERY outcomes. A running count of logged
+    outcomes is kept with the weights, so recording one never reads the
+    log; refits trim it to the Config.CLASSIFIER_MAX_OUTCOMES most recent.
+    """
+
+    def __init__(self, weights_path: str = None, outcomes_path: str = None):
+        """Initialize the classifier, loading fitted weights if available.
+
+        Args:
+            weights_path: JSON file with fitted weights and the outcome count.
+                If not provided, uses Config.CACHE_DIR/query_classifier.json
+            outcomes_path: JSONL outcome log. If not provided, uses
+                Config.CACHE_DIR/query_outcomes.jsonl
+        """
+        self.weights_path = weights_path or os.path.join(Config.CACHE_DIR, "query_classifier.json")
+        self.outcomes_path = outcomes_path or os.path.join(Config.CACHE_DIR, "query_outcomes.jsonl")
+        self.weights = dict(DEFAULT_WEIGHTS)
+        self.outcomes_logged = 0
+        self._fitted = False
+        self._lock = threading.Lock()
+
+        try:
+            with open(self.weights_path) as f:
+                state = json.load(f)
+            fitted = {name: float(state[name]) for name in FEATURE_NAMES if name in state}
+            self.weights.update(fitted)
+            self._fitted = bool(fitted)
+            self.outcomes_logged = int(state.get("outcomes_logged", 0))
+        except (OSError, ValueError, TypeError):
+            pass
+
+    @staticmethod
+    def features(query: str) -> Dict[str, float]:
+        """Extract the classifier features of a query.
+
+        Args:
+            query: The user query
+
+        Returns:
+            Dict mapping each name in FEATURE_NAMES to its value
+        """
+        words = query.split()
+        # Capitalized words after the first are a cheap proxy for named entities
+        entities = len(_ENTITY_PATTERN.findall(" ".join(words[1:])))
+        return {
+            "bias": 1.0,
+            "words": float(len(words)),
+            "entities": float(min(entities, 5)),
+            "comparison": 1.0 if _COMPARISON_PATTERN.search(query) else 0.0,
+            "explanation": 1.0 if _EXPLANATION_PATTERN.search(query) else 0.0,
+            "multi_part": float(min(len(_MULTI_PART_PATTERN.findall(query)), 3)),
+            "time_sensitive": 1.0 if classify_freshness(query) == TIME_SENSITIVE else 0.0,
+            "factoid": 1.0 if _FACTOID_PATTERN.search(query) else 0.0,
+        }
+
+    def classify(self, query: str) -> Dict[str, Any]:
+        """Classify a query and choose the search and answer sizes for it.
+
+        Args:
+            query: The user query
+
+        Returns:
+            Dict with 'complexity' ('simple', 'moderate' or 'complex'),
+            'result_count' (between MIN and MAX_SEARCH_RESULTS), 'max_tokens',
+            'output_cap' (soft answer cap, or None when disabled) and 'model'
+            (model override for the class, or None)
+        """
+        features = self.features(query)
+        prediction = sum(self.weights[name] * features[name] for name in FEATURE_NAMES)
+        result_count = int(round(
+            max(Config.MIN_SEARCH_RESULTS, min(Config.MAX_SEARCH_RESULTS, prediction))
+        ))
+
+        if result_count <= Config.MIN_SEARCH_RESULTS + 1:
+            complexity = "simple"
+        elif result_count >= Config.MAX_SEARCH_RESULTS - 1:
+            complexity = "complex"
+        else:
+            complexity = "moderate"
+
+        return {
+            "complexity": complexity,
+            "result_count": result_count,
+            "max_tokens": Config.MAX_TOKENS_BY_COMPLEXITY[complexity],
+            "output_cap": (
+                Config.OUTPUT_SOFT_CAP_BY_COMPLEXITY[complexity]
+                if Config.OUTPUT_SOFT_CAP_ENABLED else None
+            ),
+            "model": Config.MODEL_BY_COMPLEXITY.get(complexity),
+        }
+
+    def record_outcome(self, query: str, answer: str, result_count: int):
+        """Log how many of the fetched results an answer used, refitting periodically.
+
+        The target is the highest cited organic result index. When the answer
+        cites the last result fetched, more results might have helped, so
+        the target is bumped by one.
+
+        Args:
+            query: The user query
+            answer: The final answer with [N] citations
+            result_count: Number of organic results that were fetched
+        """
+        cited = [int(n) for n in _CITATION_PATTERN.findall(answer) if 0 < int(n) <= result_count]
+        if not cited:
+            return
+        target = max(cited) + (1 if max(cited) == result_count else 0)
+
+        record = {"features": self.features(query), "target": target}
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.outcomes_path)), exist_ok=True)
+                with open(self.outcomes_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+            except OSError:
+                return
+            self.outcomes_logged += 1
+            refit = self.outcomes_logged % Config.CLASSIFIER_REFIT_EVERY == 0
+            if not refit:
+                self._save_state()
+
+        if refit and not self.fit():
+            with self._lock:
+                self._save_state()
+
+    def fit(self, outcomes: Optional[List[Dict[str, Any]]] = None) -> bool:
+        """Refit the weights on logged outcomes with ridge regression.
+
+        The penalty shrinks the weights towards DEFAULT_WEIGHTS rather than
+        zero, so a small log only nudges the hand-tuned model.
+
+        Args:
+            outcomes: Outcome records. If not provided, loads the outcome log
+                (trimming it to the Config.CLASSIFIER_MAX_OUTCOMES most recent)
+
+        Returns:
+            True if new weights were fitted and saved
+        """
+        if outcomes is None:
+            outcomes = self._load_outcomes()
+            if len(outcomes) > Config.CLASSIFIER_MAX_OUTCOMES:
+                outcomes = outcomes[-Config.CLASSIFIER_MAX_OUTCOMES:]
+                self._trim_outcomes(outcomes)
+        if len(outcomes) < Config.CLASSIFIER_MIN_OUTCOMES:
+            return False
+
+        X = np.array([[o["features"].get(name, 0.0) for name in FEATURE_NAMES] for o in outcomes])
+        y = np.array([o["target"] for o in outcomes], dtype=np.float64)
+        prior = np.array([DEFAULT_WEIGHTS[name] for name in FEATURE_NAMES])
+        penalty = Config.CLASSIFIER_RIDGE * np.eye(len(FEATURE_NAMES))
+
+        # argmin ||Xw - y||^2 + ridge * ||w - prior||^2
+        weights = np.linalg.solve(X.T @ X + penalty, X.T @ y + penalty @ prior)
+
+        with self._lock:
+            self.weights = {name: float(w) for name, w in zip(FEATURE_NAMES, weights)}
+            self._fitted = True
+            return self._save_state()
+
+    def _save_state(self) -> bool:
+        """Persist the fitted weights (if any) and the outcome count (caller holds the lock)."""
+        state = dict(self.weights) if self._fitted else {}
+        state["outcomes_logged"] = self.outcomes_logged
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.weights_path)), exist_ok=True)
+            tmp_path = f"{self.weights_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.weights_path)
+        except OSError:
+            return False
+        return True
+
+    def _trim_outcomes(self, outcomes: List[Dict[str, Any]]):
+        """Rewrite the outcome log with only the given (most recent) records."""
+        with self._lock:
+            try:
+                tmp_path = f"{self.outcomes_path}.tmp"
+                with open(tmp_path, "w") as f:
+                    f.writelines(json.dumps(record) + "\n" for record in outcomes)
+                os.replace(tmp_path, self.outcomes_path)
+            except OSError:
+                pass
+
+    def _load_outcomes(self) -> List[Dict[str, Any]]:
+        """Read the outcome log, skipping corrupt lines."""
+        outcomes = []
+        try:
+            with open(self.outcomes_path) as f:
+                for line in f:
+                    try:
+                        outcomes.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return outcomes
+
+
+_shared_classifier: Optional[QueryClassifier] = None
+
+
+def get_query_classifier() -> QueryClassifier:
+    """Return the process-wide query classifier."""
+    global _shared_classifier
+    if _shared_classifier is None:
+        _shared_classifier = QueryClassifier()
+    return _shared_classifier
@@ -0,0 +1,206 @@
+"""Local query decomposition and concurrent multi-search for complex questions."""
+
+import asyncio
+import re
+from typing import List, Dict, Any, Tuple
+from src.config import Config
+from src.search.fusion import reciprocal_rank_fusion
+from src.search.serpapi_client import SerpAPIClient
+
+
+_COMPARISON_CUE = re.compile(
+    r"^\s*(?:please\s+)?(?:(?P<explicit>compare|comparing|contrast|comparison of|"
+    r"what(?:'s| is| are) the differences? between|differences? between)|"
+    r"how (?:does|do|is|are))\s+(?:the\s+)?",
+    re.IGNORECASE
+)
+# Separators that always split two sides of a comparison
+_STRONG_SEPARATOR = re.compile(
+    r"\s+(?:versus|vs\.?|compare[sd]? (?:to|with)|against|relative to)\s+",
+    re.IGNORECASE
+)
+# 'and'/'or' only split a comparison when the query starts with an explicit comparison cue
+_WEAK_SEPARATOR = re.compile(r"\s+(?:and|or)\s+", re.IGNORECASE)
+# Prepositions that attach the shared aspect ("impacts of remote work on") to a target
+_PREPOSITION = re.compile(r"\s(?:on|in|for|of|among|across|within|at|to)\s", re.IGNORECASE)
+# Appended to bare comparison targets ("TCP" vs "UDP"), which say nothing about what is compared
+_COMPARISON_ASPECT = "characteristics"
+# 'and' followed by a new question ("what is X and how does it work")
+_CLAUSE_SEPARATOR = re.compile(
+    r"\s*(?:[;?]\s*|,?\s+and\s+(?=(?:what|how|why|when|where|who|which|is|are|does|do|can)\b))",
+    re.IGNORECASE
+)
+# A clause that refers back to another ("how does it work") cannot be searched on its own
+_PRONOUN = re.compile(r"\b(it|its|they|them|their|this|that|these|those)\b", re.IGNORECASE)
+
+
+def plan_subqueries(query: str, max_subqueries: int = None) -> List[str]:
+    """Split a comparison or multi-part question into focused sub-queries.
+
+    Runs locally in microseconds. Comparisons are split around 'versus',
+    'vs', 'compared to' (or 'and'/'or' after a cue such as 'compare' or
+    'difference between'), and the shared aspect is attached to each side:
+    "Compare the economic impacts of remote work on cities versus rural
+    areas" gives "economic impacts of remote work on cities" and "economic
+    impacts of remote work on rural areas". Bare targets get a generic
+    comparison aspect instead ("difference between TCP and UDP" gives "TCP
+    characteristics" and "UDP characteristics"). Multi-part questions are
+    split into their clauses.
+
+    Args:
+        query: The user query
+        max_subqueries: Maximum number of sub-queries. If not provided, uses
+            Config.PLANNER_MAX_SUBQUERIES
+
+    Returns:
+        Sub-queries to search in addition to the query itself (empty when
+        the query does not decompose)
+    """
+    limit = max_subqueries if max_subqueries is not None else Config.PLANNER_MAX_SUBQUERIES
+    text = query.strip().rstrip("?.! ")
+
+    subqueries = _split_comparison(text) or _split_clauses(text)
+    normalized = {query.strip().lower().rstrip("?.! ")}
+    planned = []
+    for subquery in subqueries:
+        subquery = subquery.strip(" ,;")
+        key = subquery.lower()
+        if subquery and key not in normalized:
+            normalized.add(key)
+            planned.append(subquery)
+    return planned[:limit] if len(planned) > 1 else []
+
+
+def _split_comparison(text: str) -> List[str]:
+    """Split 'A vs B (vs C)' comparisons, distributing the shared aspect over every side."""
+    cue = _COMPARISON_CUE.match(text)
+    body = text[cue.end():] if cue else text
+
+    parts = _STRONG_SEPARATOR.split(body)
+    if len(parts) < 2 and cue and cue.group("explicit"):
+        # "difference between X and Y": split on the last and/or
+        matches = list(_WEAK_SEPARATOR.finditer(body))
+        if matches:
+            last = matches[-1]
+            parts = [body[:last.start()], body[last.end():]]
+    parts = [part.strip() for part in parts]
+    if len(parts) < 2 or not all(parts):
+        return []
+
+    # Shared aspect before the first target: "impacts of remote work on | cities"
+    prepositions = list(_PREPOSITION.finditer(parts[0]))
+    if prepositions:
+        aspect = parts[0][:prepositions[-1].end()]
+        return [parts[0]] + [f"{aspect}{part}" for part in parts[1:]]
+
+    # Shared context after the last target: "Python vs | Rust for web backends"
+    context = _PREPOSITION.search(parts[-1])
+    if context:
+        tail = parts[-1][context.start():]
+        return [f"{part}{tail}" for part in parts[:-1]] + [parts[-1]]
+
+    # No shared aspect: a bare term alone would only find its definition
+    return [f"{part} {_COMPARISON_ASPECT}" for part in parts]
+
+
+def _split_clauses(text: str) -> List[str]:
+    """Split a multi-part question into its self-contained clauses."""
+    return [
+        clause for clause in _CLAUSE_SEPARATOR.split(text)
+        if clause and clause.strip() and not _PRONOUN.search(clause)
+    ]
+
+
+def merge_search_data(responses: List[Tuple[str, Dict[str, Any]]], limit: int) -> Dict[str, Any]:
+    """Merge the responses for a query and its sub-queries into one response.
+
+    Organic results are fused with reciprocal rank fusion, which interleaves
+    the lists by rank (so every sub-query is represented) and lifts pages
+    that several sub-queries found. Context blocks from every response are
+    kept and numbered after the merged results; dedupe_search_data()
+    collapses any duplicates later.
+
+    Args:
+        responses: (query, response from SerpAPIClient.asearch_full()) pairs,
+            the original query first
+        limit: Maximum number of organic results
+
+    Returns:
+        Dict with 'results', 'answer_box', 'knowledge_graph',
+        'context_blocks' and 'subqueries' (the queries that contributed)
+    """
+    results = reciprocal_rank_fusion(
+        [(query, data["results"]) for query, data in responses],
+        limit,
+        label_key="subqueries"
+    )
+    blocks = [block for _, data in responses for block in data.get("context_blocks", [])]
+    first = responses[0][1]
+
+    return dict(
+        first,
+        results=results,
+        context_blocks=[
+            dict(block, index=len(results) + offset)
+            for offset, block in enumerate(blocks, 1)
+        ],
+        subqueries=[query for query, _ in responses[1:]],
+    )
+
+
+async def asearch_plan(
+    client: SerpAPIClient,
+    query: str,
+    subqueries: List[str],
+    num_results: int
+) -> Dict[str, Any]:
+    """Search a query and its sub-queries concurrently and merge the results.
+
+    The plain query is searched alongside the sub-queries, so planning adds
+    no serial round-trip. A failed sub-query is dropped (and listed under
+    'subquery_errors'); a failure of the plain query is raised as usual.
+    client.last_from_cache is True only if every merged search was cached,
+    and client.last_engine_errors also lists engines that failed for a
+    sub-query.
+
+    Args:
+        client: SerpAPI client for the plain query; sub-queries use forks of it
+        query: The user query
+        subqueries: Extra queries from plan_subqueries()
+        num_results: Results to fetch per search, and to keep after merging
+
+    Returns:
+        Merged search response (see merge_search_data), or the plain
+        response unchanged when there are no sub-queries
+
+    Raises:
+        Exception: If the search for the plain query fails
+    """
+    if not subqueries:
+        return await client.asearch_full(query, num_results)
+
+    clients = [client] + [client.fork() for _ in subqueries]
+    queries = [query] + subqueries
+    outcomes = await asyncio.gather(
+        *(search_client.asearch_full(q, num_results) for search_client, q in zip(clients, queries)),
+        return_exceptions=True
+    )
+    if isinstance(outcomes[0], BaseException):
+        raise outcomes[0]
+
+    responses = []
+    errors = {}
+    from_cache = []
+    for search_client, q, outcome in zip(clients, queries, outcomes):
+        if isinstance(outcome, BaseException):
+            errors[q] = str(outcome)
+            continue
+        responses.append((q, outcome))
+        from_cache.append(search_client.last_from_cache)
+        if search_client is not client:
+            # Forks keep their own engine errors; surface them on the caller's client
+            for engine, error in search_client.last_engine_errors.items():
+                client.last_engine_errors.setdefault(engine, f'{error} (sub-query "{q}")')
+
+    client.last_from_cache = all(from_cache)
+    return dict(merge_search_data(responses, num_results), subquery_errors=errors)
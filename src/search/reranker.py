@@ -0,0 +1,92 @@
+"""Local BM25 reranking of search results against the query."""
+
+from collections import Counter
+from typing import List, Dict, Any
+import numpy as np
+from src.utils.query_tokenizer import tokenize_query
+from src.config import Config
+
+
+class BM25Reranker:
+    """Scores search results with Okapi BM25 over their title and snippet.
+
+    The candidate set itself is the corpus for document frequencies and
+    average length, so no index has to be built or stored. A small
+    reciprocal-rank prior keeps the search engine's order as a tie-breaker.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, rank_prior: float = None):
+        """Initialize the reranker.
+
+        Args:
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+            rank_prior: Weight of the 1/(1 + rank) prior relative to the best
+                BM25 score. If not provided, uses Config.RERANK_RANK_PRIOR
+        """
+        self.k1 = k1
+        self.b = b
+        self.rank_prior = rank_prior if rank_prior is not None else Config.RERANK_RANK_PRIOR
+
+    def scores(self, query: str, results: List[Dict[str, Any]]) -> np.ndarray:
+        """Score each result against the query.
+
+        Args:
+            query: The user query
+            results: Search results in engine rank order
+
+        Returns:
+            Array of scores, one per result (higher is better)
+        """
+        if not results:
+            return np.zeros(0)
+
+        terms = list(dict.fromkeys(tokenize_query(query)))
+        docs = [Counter(tokenize_query(f"{r.get('title', '')} {r.get('snippet', '')}")) for r in results]
+        lengths = np.array([sum(doc.values()) for doc in docs], dtype=np.float64)
+
+        bm25 = np.zeros(len(results))
+        if terms and lengths.sum() > 0:
+            # (documents x query terms) term frequencies
+            tf = np.array([[doc.get(term, 0) for term in terms] for doc in docs], dtype=np.float64)
+            df = (tf > 0).sum(axis=0)
+            idf = np.log(1.0 + (len(docs) - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * lengths / lengths.mean())
+            bm25 = (tf * (self.k1 + 1.0) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+        prior = 1.0 / (1.0 + np.arange(len(results)))
+        scale = bm25.max() if bm25.max() > 0 else 1.0
+        return bm25 / scale + self.rank_prior * prior
+
+    def rerank(self, query: str, results: List[Dict[str, Any]], top_k: int) -> List[Dict[str, Any]]:
+        """Return the top_k results in score order, renumbered from 1.
+
+        Args:
+            query: The user query
+            results: Search results in engine rank order
+            top_k: Number of results to keep
+
+        Returns:
+            New list of the best results, with 'index' set to their new rank
+        """
+        order = np.argsort(-self.scores(query, results), kind="stable")[:top_k]
+        return [dict(results[i], index=rank) for rank, i in enumerate(order, 1)]
+
+
+def rerank_search_data(query: str, search_data: Dict[str, Any], top_k: int) -> Dict[str, Any]:
+    """Keep the top_k organic results by BM25 score and renumber the context blocks after them.
+
+    Args:
+        query: The user query
+        search_data: Response from SerpAPIClient.search_full() (after dedupe)
+        top_k: Number of organic results to keep
+
+    Returns:
+        Copy of search_data with reranked 'results' and renumbered 'context_blocks'
+    """
+    results = BM25Reranker().rerank(query, search_data.get("results", []), top_k)
+    blocks = [
+        dict(block, index=len(results) + offset)
+        for offset, block in enumerate(search_data.get("context_blocks", []), 1)
+    ]
+    return dict(search_data, results=results, context_blocks=blocks)
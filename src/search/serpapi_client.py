@@ -1,28 +1,123 @@
 """SerpAPI client for performing Google searches."""
 
+import time
+import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 import requests
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple, Union
 from src.config import Config
+from src.cache.search_cache import SearchCache
+from src.search.context_blocks import build_context_blocks
+from src.search.fusion import fuse_search_data
+from src.transport.http_pool import get_requests_session, get_async_httpx_client
+from src.utils.latency_profile import LatencyProfile, get_latency_profile
+
+
+# HTTP statuses worth retrying: rate limiting and server-side failures
+TRANSIENT_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Name of each engine's result-count parameter (engines not listed return one page)
+ENGINE_COUNT_PARAMS = {
+    "google": "num",
+    "bing": "count",
+}
 
 
 class SerpAPIClient:
-    """Client for interacting with SerpAPI to fetch Google search results."""
+    """Client for interacting with SerpAPI to fetch Google search results.
+
+    Every search runs under a deadline (Config.SERPAPI_DEADLINE). Transient
+    failures are retried with jittered exponential backoff while time
+    remains. Only the async path (asearch_full) hedges: an attempt that is
+    slower than the learned p95 SerpAPI latency gets a duplicate request and
+    the first response wins. The duplicate is sent while the primary is
+    still in flight, so SerpAPI has nothing cached yet and every hedge costs
+    an extra search credit (last_hedged reports it). The sync path (search,
+    search_full) retries under the deadline but never hedges.
+
+    With several engines configured, they are all queried concurrently and
+    their results fused with reciprocal rank fusion. Secondary engines get
+    a shorter deadline (Config.SEARCH_ENGINE_DEADLINE) and are dropped if
+    they miss it or fail, so fan-out adds recall but no serial latency.
+    """
 
     BASE_URL = "https://serpapi.com/search"
+    PROFILE_KEY = "serpapi"
 
-    def __init__(self, api_key: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        cache: SearchCache = None,
+        use_cache: bool = True,
+        session: requests.Session = None,
+        async_client: httpx.AsyncClient = None,
+        latency_profile: LatencyProfile = None,
+        deadline: float = None,
+        engines: List[str] = None
+    ):
         """Initialize SerpAPI client.
 
         Args:
             api_key: SerpAPI key. If not provided, uses Config.SERPAPI_KEY
+            cache: Search result cache. If not provided, creates the default
+                on-disk cache (unless caching is disabled)
+            use_cache: Set to False to always hit SerpAPI
+            session: requests session to send requests with. If not provided,
+                uses the process-wide pooled session
+            async_client: httpx client for the async methods. If not provided,
+                uses the process-wide pooled client
+            latency_profile: Rolling latency profile used to time hedges. If
+                not provided, uses the shared one
+            deadline: Seconds allowed for all attempts of one search. If not
+                provided, uses Config.SERPAPI_DEADLINE
+            engines: SerpAPI engines to query, primary first. If not provided,
+                uses Config.SEARCH_ENGINES
         """
         self.api_key = api_key or Config.SERPAPI_KEY
         if not self.api_key:
             raise ValueError("SerpAPI key is required")
 
+        if not use_cache or not Config.SEARCH_CACHE_ENABLED:
+            self.cache = None
+        else:
+            self.cache = cache or SearchCache()
+        self.last_from_cache = False
+        self.session = session or get_requests_session()
+        self.async_client = async_client
+        self.latency_profile = latency_profile or get_latency_profile()
+        self.deadline = deadline or Config.SERPAPI_DEADLINE
+        self.engines = engines or Config.SEARCH_ENGINES
+        self.last_attempts = 0
+        self.last_hedged = False
+        self.last_engines: List[str] = []
+        self.last_engine_errors: Dict[str, str] = {}
+
+    def fork(self) -> "SerpAPIClient":
+        """Return a client sharing this one's settings, cache and connections.
+
+        Concurrent searches each need their own client, because the
+        per-search diagnostics (last_from_cache, last_engines, ...) are
+        stored on it.
+        """
+        return SerpAPIClient(
+            api_key=self.api_key,
+            cache=self.cache,
+            use_cache=self.cache is not None,
+            session=self.session,
+            async_client=self.async_client,
+            latency_profile=self.latency_profile,
+            deadline=self.deadline,
+            engines=self.engines,
+        )
+
     def search(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
         """Perform a Google search and return organic results.
 
+        Results are served from the search cache when a fresh entry exists
+        for the same normalized query and result count.
+
         Args:
             query: The search query
             num_results: Number of results to fetch (default: 10)
@@ -33,34 +128,413 @@ class SerpAPIClient:
         Raises:
             requests.RequestException: If the API request fails
         """
+        return self.search_full(query, num_results)["results"]
+
+    async def asearch(self, query: str, num_results: int = 10) -> List[Dict[str, Any]]:
+        """Async variant of search() using the shared async HTTP pool.
+
+        Args:
+            query: The search query
+            num_results: Number of results to fetch (default: 10)
+
+        Returns:
+            List of search result dictionaries containing title, link, snippet, etc.
+
+        Raises:
+            Exception: If the API request fails
+        """
+        return (await self.asearch_full(query, num_results))["results"]
+
+    def search_full(self, query: str, num_results: int = 10) -> Dict[str, Any]:
+        """Perform a Google search and return organic results plus direct-answer blocks.
+
+        Args:
+            query: The search query
+            num_results: Number of organic results to fetch (default: 10)
+
+        Returns:
+            Dict with 'results' (formatted organic results, as from search()),
+            'answer_box' and 'knowledge_graph' (raw SerpAPI blocks, or None)
+            and 'context_blocks' (citable extra context, see build_context_blocks)
+
+        Raises:
+            Exception: If the API request fails (on every engine)
+        """
+        self._start_search()
+        if len(self.engines) == 1:
+            outcomes = [self._search_engine(query, num_results, self.engines[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=len(self.engines)) as pool:
+                futures = [
+                    pool.submit(self._search_engine, query, num_results, engine)
+                    for engine in self.engines
+                ]
+            outcomes = [future.exception() or future.result() for future in futures]
+
+        # Latencies are recorded in memory per attempt and written once per search
+        self.latency_profile.save()
+        return self._merge_outcomes(outcomes, num_results)
+
+    async def asearch_full(self, query: str, num_results: int = 10) -> Dict[str, Any]:
+        """Async variant of search_full() using the shared async HTTP pool.
+
+        Latency samples are only recorded in memory: writing the profile is
+        blocking file I/O, so it is left to the end of the run (the shared
+        profile is saved by AgentRace.cancel()).
+
+        Args:
+            query: The search query
+            num_results: Number of organic results to fetch (default: 10)
+
+        Returns:
+            Dict with 'results', 'answer_box', 'knowledge_graph' and 'context_blocks'
+
+        Raises:
+            Exception: If the API request fails (on every engine)
+        """
+        self._start_search()
+        outcomes = await asyncio.gather(
+            *(self._asearch_engine(query, num_results, engine) for engine in self.engines),
+            return_exceptions=True
+        )
+        return self._merge_outcomes(outcomes, num_results)
+
+    def _search_engine(self, query: str, num_results: int, engine: str) -> Tuple[Dict[str, Any], bool]:
+        """Search one engine through the cache.
+
+        Returns:
+            Tuple of (parsed response, whether it came from the cache)
+        """
+        cached = self._cached(query, num_results, engine)
+        if cached is not None:
+            return cached, True
+
+        start = time.time()
+        data = self._fetch(query, num_results, engine, self._engine_deadline(engine))
+
+        if self.cache is not None:
+            self.cache.set(query, num_results, data, fetch_seconds=time.time() - start, engine=engine)
+
+        return data, False
+
+    async def _asearch_engine(self, query: str, num_results: int, engine: str) -> Tuple[Dict[str, Any], bool]:
+        """Async variant of _search_engine()."""
+        cached = self._cached(query, num_results, engine)
+        if cached is not None:
+            return cached, True
+
+        start = time.time()
+        data = await self._afetch(query, num_results, engine, self._engine_deadline(engine))
+
+        if self.cache is not None:
+            self.cache.set(query, num_results, data, fetch_seconds=time.time() - start, engine=engine)
+
+        return data, False
+
+    def _start_search(self):
+        """Reset the per-search diagnostics."""
+        self.last_from_cache = False
+        self.last_attempts = 0
+        self.last_hedged = False
+        self.last_engines = []
+        self.last_engine_errors = {}
+
+    def _engine_deadline(self, engine: str) -> float:
+        """Deadline for one engine: the full deadline for the primary, a shorter one for the rest."""
+        if engine == self.engines[0]:
+            return self.deadline
+        return min(self.deadline, Config.SEARCH_ENGINE_DEADLINE)
+
+    def _merge_outcomes(
+        self,
+        outcomes: List[Union[Tuple[Dict[str, Any], bool], BaseException]],
+        num_results: int
+    ) -> Dict[str, Any]:
+        """Combine per-engine outcomes (responses or errors) into one search response.
+
+        Failed engines are dropped and recorded in last_engine_errors. A
+        single engine's response is returned unchanged; several are fused.
+
+        Raises:
+            Exception: The primary engine's error, if no engine succeeded
+        """
+        responses = []
+        from_cache = []
+        for engine, outcome in zip(self.engines, outcomes):
+            if isinstance(outcome, BaseException):
+                self.last_engine_errors[engine] = str(outcome)
+                continue
+            responses.append((engine, outcome[0]))
+            from_cache.append(outcome[1])
+
+        if not responses:
+            raise outcomes[0]
+
+        self.last_engines = [engine for engine, _ in responses]
+        self.last_from_cache = all(from_cache)
+        if len(self.engines) == 1:
+            return responses[0][1]
+        return fuse_search_data(responses, num_results)
+
+    def _cached(self, query: str, num_results: int, engine: str = "google") -> Optional[Dict[str, Any]]:
+        """Return an engine's cached response, or None on a miss."""
+        if self.cache is None:
+            return None
+
+        cached = self.cache.get(query, num_results, engine=engine)
+        if cached is None:
+            return None
+        if isinstance(cached, list):
+            # Entry written before direct-answer blocks were kept
+            cached = {"results": cached, "answer_box": None, "knowledge_graph": None}
+        cached.setdefault("context_blocks", [])
+        return cached
+
+    def _fetch(
+        self,
+        query: str,
+        num_results: int,
+        engine: str = "google",
+        deadline: float = None
+    ) -> Dict[str, Any]:
+        """Fetch results from SerpAPI without consulting the cache.
+
+        Transient errors are retried with jittered backoff until the
+        deadline; each attempt's timeout is cut to the time left.
+
+        Args:
+            query: The search query
+            num_results: Number of results to fetch
+            engine: SerpAPI engine
+            deadline: Seconds allowed for all attempts. If not provided, uses self.deadline
+
+        Returns:
+            Parsed response (see _parse_response)
+
+        Raises:
+            Exception: If the API request fails or the deadline passes
+        """
+        params = self._build_params(query, num_results, engine)
+        deadline = deadline or self.deadline
+        deadline_at = time.monotonic() + deadline
+
+        for retry in range(Config.SERPAPI_MAX_RETRIES + 1):
+            remaining = deadline_at - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise requests.Timeout(f"no response within the {deadline:g}s deadline")
+                self.last_attempts += 1
+                start = time.monotonic()
+                response = self.session.get(
+                    self.BASE_URL,
+                    params=params,
+                    timeout=min(Config.SERPAPI_ATTEMPT_TIMEOUT, remaining)
+                )
+                response.raise_for_status()
+                self._record_latency(time.monotonic() - start, engine)
+                return self._parse_response(response.json())
+
+            except requests.RequestException as e:
+                backoff = self._backoff(retry)
+                if not self._is_transient(e) or retry == Config.SERPAPI_MAX_RETRIES \
+                        or time.monotonic() + backoff >= deadline_at:
+                    # Fail fast on API errors as per requirements
+                    raise Exception(f"SerpAPI request failed: {str(e)}") from e
+                time.sleep(backoff)
+
+    async def _afetch(
+        self,
+        query: str,
+        num_results: int,
+        engine: str = "google",
+        deadline: float = None
+    ) -> Dict[str, Any]:
+        """Async variant of _fetch() that also hedges slow attempts.
+
+        Args:
+            query: The search query
+            num_results: Number of results to fetch
+            engine: SerpAPI engine
+            deadline: Seconds allowed for all attempts. If not provided, uses self.deadline
+
+        Returns:
+            Parsed response (see _parse_response)
+
+        Raises:
+            Exception: If the API request fails or the deadline passes
+        """
+        params = self._build_params(query, num_results, engine)
+        deadline = deadline or self.deadline
+        deadline_at = time.monotonic() + deadline
+
+        for retry in range(Config.SERPAPI_MAX_RETRIES + 1):
+            remaining = deadline_at - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise httpx.TimeoutException(f"no response within the {deadline:g}s deadline")
+                data = await asyncio.wait_for(self._ahedged_get(params, deadline_at, engine), remaining)
+                return self._parse_response(data)
+
+            except asyncio.TimeoutError as e:
+                raise Exception(
+                    f"SerpAPI request failed: no response within the {deadline:g}s deadline"
+                ) from e
+            except httpx.HTTPError as e:
+                backoff = self._backoff(retry)
+                if not self._is_transient(e) or retry == Config.SERPAPI_MAX_RETRIES \
+                        or time.monotonic() + backoff >= deadline_at:
+                    # Fail fast on API errors as per requirements
+                    raise Exception(f"SerpAPI request failed: {str(e)}") from e
+                await asyncio.sleep(backoff)
+
+    async def _ahedged_get(
+        self,
+        params: Dict[str, Any],
+        deadline_at: float,
+        engine: str = "google"
+    ) -> Dict[str, Any]:
+        """Send one request, plus a duplicate if the first is slower than the hedge delay.
+
+        The first successful response wins and the other attempt is
+        cancelled; the duplicate is billed as a separate search either way. If one attempt fails while the other is still running,
+        the survivor is awaited; the error is raised only if both fail.
+
+        Args:
+            params: SerpAPI query parameters
+            deadline_at: time.monotonic() value after which no attempt may run
+            engine: SerpAPI engine (selects the latency profile)
+
+        Returns:
+            Decoded SerpAPI JSON response
+
+        Raises:
+            httpx.HTTPError: If every attempt fails
+        """
+        client = self.async_client or get_async_httpx_client()
+
+        async def attempt() -> Dict[str, Any]:
+            start = time.monotonic()
+            response = await client.get(
+                self.BASE_URL,
+                params=params,
+                timeout=max(0.0, min(Config.SERPAPI_ATTEMPT_TIMEOUT, deadline_at - start))
+            )
+            response.raise_for_status()
+            self._record_latency(time.monotonic() - start, engine)
+            return response.json()
+
+        self.last_attempts += 1
+        started = time.monotonic()
+        primary = asyncio.create_task(attempt())
+        pending = {primary}
+        error: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay(engine))
+            if not done:
+                # Primary is in the slow tail: race a duplicate against it
+                self.last_attempts += 1
+                self.last_hedged = True
+                pending.add(asyncio.create_task(attempt()))
+
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if primary in pending:
+                # The hedge won; the primary took at least this long. Recording
+                # the lower bound keeps the tail from looking faster than it is.
+                self._record_latency(time.monotonic() - started, engine)
+
+    def hedge_delay(self, engine: str = "google") -> float:
+        """Return how long to wait for an attempt before sending a duplicate.
+
+        Args:
+            engine: SerpAPI engine whose latency profile is consulted
+
+        Returns:
+            Delay in seconds (learned percentile of SerpAPI latency, or the
+            configured default until enough samples exist)
+        """
+        delay = self.latency_profile.percentile(
+            self._profile_key(engine),
+            Config.SERPAPI_HEDGE_PERCENTILE,
+            default=Config.SERPAPI_HEDGE_DEFAULT_DELAY
+        )
+        return max(delay, Config.SERPAPI_HEDGE_MIN_DELAY)
+
+    def _record_latency(self, seconds: float, engine: str = "google"):
+        """Record a successful attempt's latency in memory (see search_full for saving)."""
+        self.latency_profile.record(self._profile_key(engine), seconds)
+
+    def _profile_key(self, engine: str) -> str:
+        """Latency profile key for an engine (Google keeps the original key)."""
+        return self.PROFILE_KEY if engine == "google" else f"{self.PROFILE_KEY}:{engine}"
+
+    @staticmethod
+    def _backoff(retry: int) -> float:
+        """Full-jitter exponential backoff before retry number retry + 1."""
+        return random.uniform(0, Config.SERPAPI_RETRY_BASE_DELAY * 2 ** retry)
+
+    @staticmethod
+    def _is_transient(error: Exception) -> bool:
+        """Return True if a failed request is worth retrying.
+
+        Timeouts, connection errors, rate limiting and 5xx responses are
+        transient; other HTTP errors (bad key, bad request) are not.
+        """
+        response = getattr(error, "response", None)
+        if response is not None and getattr(response, "status_code", None) is not None:
+            return response.status_code in TRANSIENT_STATUSES
+        return isinstance(error, (httpx.TransportError, requests.ConnectionError, requests.Timeout))
+
+    def _build_params(self, query: str, num_results: int, engine: str = "google") -> Dict[str, Any]:
+        """Build the SerpAPI query parameters."""
         params = {
             "q": query,
             "api_key": self.api_key,
-            "engine": "google",
-            "num": num_results,
+            "engine": engine,
         }
+        count_param = ENGINE_COUNT_PARAMS.get(engine)
+        if count_param:
+            params[count_param] = num_results
+        return params
 
-        try:
-            response = requests.get(self.BASE_URL, params=params, timeout=30)
-            response.raise_for_status()
-            data = response.json()
-
-            # Extract organic results from SerpAPI response
-            organic_results = data.get("organic_results", [])
-
-            # Format results for agent consumption
-            formatted_results = []
-            for idx, result in enumerate(organic_results, 1):
-                formatted_results.append({
-                    "index": idx,
-                    "title": result.get("title", ""),
-                    "link": result.get("link", ""),
-                    "snippet": result.get("snippet", ""),
-                    "position": result.get("position", idx),
-                })
-
-            return formatted_results
-
-        except requests.RequestException as e:
-            # Fail fast on API errors as per requirements
-            raise Exception(f"SerpAPI request failed: {str(e)}") from e
+    def _parse_response(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Format a SerpAPI response for agent consumption.
+
+        Args:
+            data: Decoded SerpAPI JSON response
+
+        Returns:
+            Dict with 'results' (formatted organic results), the raw
+            'answer_box' and 'knowledge_graph' blocks (None when absent) and
+            'context_blocks' (answer snippets, related questions and top
+            stories, numbered after the organic results)
+        """
+        # Extract organic results from SerpAPI response
+        organic_results = data.get("organic_results", [])
+
+        formatted_results = []
+        for idx, result in enumerate(organic_results, 1):
+            formatted_results.append({
+                "index": idx,
+                "title": result.get("title", ""),
+                "link": result.get("link", ""),
+                "snippet": result.get("snippet", ""),
+                "position": result.get("position", idx),
+            })
+
+        return {
+            "results": formatted_results,
+            "answer_box": data.get("answer_box"),
+            "knowledge_graph": data.get("knowledge_graph"),
+            "context_blocks": build_context_blocks(data, first_index=len(formatted_results) + 1),
+        }
@@ -0,0 +1,135 @@
+"""Shared pooled HTTP transport used by the SerpAPI and OpenRouter clients.
+
+One keep-alive pool per protocol stack is shared by the whole process, so
+racing agents and repeated searches reuse warm TCP+TLS connections instead
+of paying a fresh handshake on every request.
+"""
+
+import threading
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from src.config import Config
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+_lock = threading.Lock()
+_requests_session = None
+_httpx_client = None
+_async_httpx_client = None
+
+
+def get_requests_session() -> requests.Session:
+    """Return the process-wide requests session with a keep-alive pool.
+
+    Returns:
+        Shared requests.Session
+    """
+    global _requests_session
+    with _lock:
+        if _requests_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                pool_maxsize=Config.HTTP_POOL_MAXSIZE
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _requests_session = session
+        return _requests_session
+
+
+def get_httpx_client() -> httpx.Client:
+    """Return the process-wide httpx client used by all OpenAI clients.
+
+    HTTP/2 is enabled when the optional ``h2`` package is installed, which
+    lets concurrent agent requests multiplex over a single connection.
+
+    Returns:
+        Shared httpx.Client
+    """
+    global _httpx_client
+    with _lock:
+        if _httpx_client is None:
+            _httpx_client = httpx.Client(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_POOL_MAXSIZE,
+                    max_keepalive_connections=Config.HTTP_POOL_MAXSIZE,
+                    keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(Config.HTTP_TIMEOUT, connect=10.0),
+            )
+        return _httpx_client
+
+
+def get_async_httpx_client() -> httpx.AsyncClient:
+    """Return the process-wide async httpx client for the asyncio pipeline.
+
+    Shared by AsyncOpenAI instances and async SerpAPI requests, so hundreds
+    of in-flight calls on one event loop draw from a single keep-alive pool.
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _async_httpx_client
+    with _lock:
+        if _async_httpx_client is None:
+            _async_httpx_client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=Config.ASYNC_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HTTP_POOL_MAXSIZE,
+                    keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=httpx.Timeout(Config.HTTP_TIMEOUT, connect=10.0),
+            )
+        return _async_httpx_client
+
+
+async def aclose_async_httpx_client():
+    """Close the shared async client (call before the event loop shuts down)."""
+    global _async_httpx_client
+    with _lock:
+        client, _async_httpx_client = _async_httpx_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def prewarm_openrouter() -> threading.Thread:
+    """Open a pooled connection to OpenRouter in the background.
+
+    Completes DNS, TCP and TLS setup while other work (e.g. the SerpAPI
+    request) is in flight, so the agents' first request finds a warm
+    connection in the pool. Failures are ignored: the agents will simply
+    connect on demand.
+
+    Returns:
+        The started daemon thread
+    """
+    def warm():
+        try:
+            get_httpx_client().head(Config.OPENROUTER_BASE_URL, timeout=5.0)
+        except httpx.HTTPError:
+            pass
+
+    thread = threading.Thread(target=warm, daemon=True)
+    thread.start()
+    return thread
+
+
+async def aprewarm_openrouter():
+    """Open a pooled async connection to OpenRouter.
+
+    Async counterpart of prewarm_openrouter(); run it as a task alongside
+    the SerpAPI request. Failures are ignored.
+    """
+    try:
+        await get_async_httpx_client().head(Config.OPENROUTER_BASE_URL, timeout=5.0)
+    except httpx.HTTPError:
+        pass
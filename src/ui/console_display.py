@@ -216,20 +216,12 @@ class Display:
                 elapsed = time.time() - start_time
 
     @staticmethod
-    def answer(response: str, elapsed_time: float = None):
-        """Display the final answer in a visually appealing format.
-
-        Args:
-            response: The markdown-formatted response
-            elapsed_time: Optional time taken to generate response
-        """
-        console.print()
-
+    def _answer_panel(response: str) -> Panel:
+        """Build the answer panel for a (possibly partial) response."""
         # Format answer with left-aligned headings
         formatted_content = format_answer_text(response)
 
-        # Create a panel for the answer
-        panel = Panel(
+        return Panel(
             formatted_content,
             title="[bold green]ANSWER[/bold green]",
             title_align="left",
@@ -237,16 +229,163 @@ class Display:
             box=box.ROUNDED,
             padding=(1, 2)
         )
-        console.print(panel)
 
-        # Show timing if provided
+    @staticmethod
+    def answer(response: str, elapsed_time: float = None, first_token_time: float = None):
+        """Display the final answer in a visually appealing format.
+
+        Args:
+            response: The markdown-formatted response
+            elapsed_time: Optional time taken to generate response
+            first_token_time: Optional time until the first token was shown
+        """
+        console.print()
+        console.print(Display._answer_panel(response))
+        Display.timing(elapsed_time, first_token_time)
+
+    @staticmethod
+    @contextmanager
+    def streaming_answer():
+        """Context manager that renders the answer panel as tokens arrive.
+
+        Yields a callable taking the full text received so far; the panel is
+        redrawn in place on each call.
+
+        Usage:
+            with Display.streaming_answer() as update:
+                for delta in stream:
+                    text += delta
+                    update(text)
+        """
+        console.print()
+        with Live(
+            Display._answer_panel(""),
+            console=console,
+            refresh_per_second=12,
+            vertical_overflow="visible"
+        ) as live:
+            def update(response: str):
+                live.update(Display._answer_panel(response))
+
+            yield update
+
+    @staticmethod
+    def timing(elapsed_time: float = None, first_token_time: float = None):
+        """Display the timing footer with time-to-first-token and total time.
+
+        Args:
+            elapsed_time: Optional total time taken to answer
+            first_token_time: Optional time until the first answer token was shown
+        """
+        parts = []
+        if first_token_time is not None:
+            parts.append(f"First token in {first_token_time:.1f}s")
         if elapsed_time is not None:
+            parts.append(f"Answered in {elapsed_time:.1f}s")
+
+        if parts:
             console.print(
-                f"\n[dim]⚡ Answered in {elapsed_time:.1f}s[/dim]",
+                f"\n[dim]⚡ {' · '.join(parts)}[/dim]",
                 style="dim"
             )
         console.print()
 
+    @staticmethod
+    def race_summary(launched: int, cancelled: int, tokens_saved: int, rejected: int = 0):
+        """Display how many agents were launched and the tokens saved by cancelling losers."""
+        plural = "s" if launched != 1 else ""
+        summary = f"🏁 {launched} agent{plural} launched"
+        if rejected:
+            summary += f" · rejected {rejected} at the quality gate"
+        if cancelled:
+            summary += f" · cancelled {cancelled} · saved ~{tokens_saved} output tokens"
+        console.print(f"[dim]{summary}[/dim]")
+
+    @staticmethod
+    def gate_summary(fastest_rejected: bool, rate: float, races: int):
+        """Display how often the fastest agent's answer fails the quality gate.
+
+        Args:
+            fastest_rejected: Whether the fastest answer failed in this race
+            rate: Rejection rate of the fastest answer over recent races (0-1)
+            races: Number of races the rate covers
+        """
+        plural = "s" if races != 1 else ""
+        history = f"{rate:.0%} of the last {races} race{plural}"
+        if fastest_rejected:
+            summary = f"🛡 Fastest answer failed the quality gate ({history})"
+        else:
+            summary = f"🛡 Fastest answer failed the quality gate in {history}"
+        console.print(f"[dim]{summary}[/dim]")
+
+    @staticmethod
+    def prompt_summary(report: Dict[str, Any]):
+        """Display the winning call's prompt size against its budget.
+
+        Args:
+            report: Prompt report from the agent (see BaseAgent._build_request),
+                with 'early_stop' if generation was stopped early
+        """
+        if "prompt_tokens_estimate" not in report:
+            return
+        summary = (
+            f"📝 Prompt ~{report['prompt_tokens_estimate']}/{report['prompt_budget']} tokens"
+            f" · max_tokens {report['max_tokens']}"
+        )
+        if report["results_truncated"] or report["results_dropped"]:
+            summary += (
+                f" · {report['results_truncated']} snippet(s) truncated,"
+                f" {report['results_dropped']} result(s) dropped"
+            )
+        if report.get("source_tokens_saved"):
+            summary += f" · compact sources saved ~{report['source_tokens_saved']} tokens"
+        if report.get("early_stop") == "citations":
+            summary += " · stopped at citations header"
+        elif report.get("early_stop") == "length":
+            summary += f" · cut at ~{report['early_stop_tokens']}-token cap"
+        console.print(f"[dim]{summary}[/dim]")
+
+    @staticmethod
+    def citation_summary(tokens: int, seconds: float):
+        """Display the output tokens (and generation time) saved by rendering citations locally.
+
+        Args:
+            tokens: Tokens in the locally rendered citation list
+            seconds: Estimated time the model would have spent generating them
+        """
+        if not tokens:
+            return
+        console.print(
+            f"[dim]📎 Citation list rendered locally · ~{tokens} output tokens (~{seconds:.1f}s) not generated[/dim]"
+        )
+
+    @staticmethod
+    def cache_summary(
+        search_hit: Optional[bool],
+        llm_stats: Optional[Dict[str, Any]],
+        answer_reused: Optional[bool] = None
+    ):
+        """Display cache effectiveness for this query.
+
+        Args:
+            search_hit: Whether search results came from the cache (None if caching is off)
+            llm_stats: Completion cache stats (None if caching is off)
+            answer_reused: Whether a stored answer for unchanged sources was reused
+                (None if caching is off)
+        """
+        parts = []
+        if search_hit is not None:
+            parts.append(f"search {'hit' if search_hit else 'miss'}")
+        if answer_reused is not None:
+            parts.append(f"answer {'reused' if answer_reused else 'generated'}")
+        if llm_stats is not None and llm_stats["hits"] + llm_stats["misses"]:
+            parts.append(
+                f"LLM {llm_stats['hits']}/{llm_stats['hits'] + llm_stats['misses']} hits "
+                f"({llm_stats['hit_rate'] * 100:.0f}%)"
+            )
+        if parts:
+            console.print(f"[dim]💾 Cache: {' · '.join(parts)}[/dim]")
+
     @staticmethod
     def timer_summary(elapsed_time: float):
         """Display timing summary."""
@@ -1,40 +1,141 @@
 """Utilities for formatting and validating numbered citations."""
 
 import re
-from typing import List, Tuple
+from typing import List, Tuple, Dict, Any, Optional, Set
+from src.utils.token_counter import count_tokens
+
+
+# A trailing citation/reference list, with or without a markdown header or colon
+CITATION_LIST_PATTERN = re.compile(
+    r'(?:\A|\n)[ \t]*(?:#+[ \t]*)?\**(?:Citations?|References|Sources)\**[ \t]*:?\**[ \t]*\n'
+    r'(?:[ \t]*(?:[-*][ \t]*)?\[\d+\][^\n]*\n?)*\s*$',
+    re.IGNORECASE
+)
+_CITATION = re.compile(r'\[(\d+)\]')
+# An unfinished marker at the end of a chunk ('[', '[1'), completed by the next one
+_PARTIAL_CITATION = re.compile(r'\[\d*$')
+
+
+class IncrementalCitationValidator:
+    """Checks inline [N] citations chunk by chunk while an answer streams.
+
+    A marker split across chunks ('[1' + '2]') is carried over to the next
+    chunk. feed() reports the first problem as soon as it appears, so a
+    racing agent that cites a source that does not exist, or writes a long
+    stretch without any citation, can be aborted long before it finishes.
+    """
+
+    def __init__(self, num_sources: Optional[int] = None, grace_tokens: Optional[int] = None):
+        """Initialize the validator.
+
+        Args:
+            num_sources: Number of citable sources; markers outside
+                1..num_sources are reported. If not provided, indices are not
+                range-checked
+            grace_tokens: Report an answer that has no citation after this
+                many tokens. If not provided, only finish() checks that
+                citations exist
+        """
+        self.num_sources = num_sources
+        self.grace_tokens = grace_tokens
+        self.cited: Set[int] = set()
+        self.out_of_range: Set[int] = set()
+        self.tokens = 0
+        self.issue: Optional[str] = None
+        self._tail = ""
+
+    def feed(self, delta: str) -> Optional[str]:
+        """Consume one chunk of the answer.
+
+        Args:
+            delta: Next chunk of answer text
+
+        Returns:
+            The first problem found (also kept in self.issue), or None while
+            the answer looks fine
+        """
+        text = self._tail + delta
+        partial = _PARTIAL_CITATION.search(text)
+        self._tail = partial.group(0) if partial else ""
+        if partial:
+            text = text[:partial.start()]
+
+        for match in _CITATION.finditer(text):
+            index = int(match.group(1))
+            self.cited.add(index)
+            if self.num_sources is not None and not 1 <= index <= self.num_sources:
+                self.out_of_range.add(index)
+
+        self.tokens += count_tokens(delta)
+        if self.issue is None:
+            if self.out_of_range:
+                self.issue = self._out_of_range_issue()
+            elif self.grace_tokens and not self.cited and self.tokens >= self.grace_tokens:
+                self.issue = f"No citations in the first ~{self.grace_tokens} tokens"
+        return self.issue
+
+    def finish(self) -> List[str]:
+        """Check the complete answer once the stream has ended.
+
+        Returns:
+            Every problem found (empty if the citations are valid)
+        """
+        self.feed("")
+        if not self.cited:
+            return ["No citations found in the text"]
+        if self.out_of_range:
+            return [self._out_of_range_issue()]
+        return []
+
+    def _out_of_range_issue(self) -> str:
+        return f"Citations refer to sources that do not exist: {sorted(self.out_of_range)}"
 
 
 class CitationFormatter:
-    """Handles citation formatting and validation."""
+    """Handles citation formatting and validation.
+
+    Agents write only inline [N] markers; the citation list is rendered
+    locally from the search results (see with_citation_list), so the model
+    never spends output tokens copying titles and URLs.
+    """
 
     @staticmethod
-    def validate_citations(text: str) -> Tuple[bool, List[str]]:
+    def validate_citations(
+        text: str,
+        num_sources: Optional[int] = None,
+        require_list: bool = False
+    ) -> Tuple[bool, List[str]]:
         """Validate that text contains properly formatted numbered citations.
 
+        Inline [N] markers are required. A citation list is optional (it is
+        normally added locally after generation), but if the text has one,
+        it must match the inline markers.
+
         Args:
             text: Text to validate
+            num_sources: Number of citable sources; markers outside 1..num_sources
+                are reported. If not provided, indices are not range-checked
+            require_list: Also require a citation list at the end (the
+                pre-rendering answer shape)
 
         Returns:
             Tuple of (is_valid, list_of_issues)
         """
-        issues = []
-
-        # Check for citation pattern [N]
+        # Inline [N] markers, checked the same way as a streamed answer
         citation_pattern = r'\[(\d+)\]'
-        citations = re.findall(citation_pattern, text)
+        validator = IncrementalCitationValidator(num_sources)
+        validator.feed(CitationFormatter.strip_citation_list(text))
+        issues = validator.finish()
 
-        if not citations:
-            issues.append("No citations found in the text")
+        if not validator.cited:
             return False, issues
 
         # Check for citation list at the end
         citation_list_pattern = r'Citations?:\s*\n(?:\[\d+\][^\n]+\n?)+'
         if not re.search(citation_list_pattern, text, re.IGNORECASE):
-            issues.append("Missing citation list at the end")
-            return False, issues
-
-        # Extract citation numbers used in text
-        text_citations = set(int(c) for c in citations)
+            if require_list:
+                issues.append("Missing citation list at the end")
+            return len(issues) == 0, issues
 
         # Extract citations from the list
         citation_list_match = re.search(
@@ -46,6 +147,9 @@ class CitationFormatter:
         if citation_list_match:
             list_text = citation_list_match.group(1)
             list_citations = set(int(c) for c in re.findall(r'\[(\d+)\]', list_text))
+            text_citations = set(
+                int(c) for c in re.findall(citation_pattern, text[:citation_list_match.start()])
+            )
 
             # Verify all text citations are in the list
             missing_in_list = text_citations - list_citations
@@ -95,3 +199,66 @@ class CitationFormatter:
             Formatted citation string
         """
         return f"[{index}] {title} - {url}"
+
+    @staticmethod
+    def cited_indices(text: str) -> List[int]:
+        """Return the distinct [N] indices cited in the body of the text, in ascending order.
+
+        Args:
+            text: Answer text (a trailing citation list is ignored)
+
+        Returns:
+            Sorted list of cited indices
+        """
+        body = CitationFormatter.strip_citation_list(text)
+        return sorted(set(int(c) for c in re.findall(r'\[(\d+)\]', body)))
+
+    @staticmethod
+    def strip_citation_list(text: str) -> str:
+        """Remove a trailing citation list (e.g. one the model wrote anyway).
+
+        Args:
+            text: Answer text
+
+        Returns:
+            The text without its trailing citation list, right-stripped
+        """
+        return CITATION_LIST_PATTERN.sub("", text).rstrip()
+
+    @staticmethod
+    def format_citation_list(text: str, sources: List[Dict[str, Any]]) -> str:
+        """Render the citation list for the sources an answer cites.
+
+        Args:
+            text: Answer text with inline [N] markers
+            sources: Citable sources (search results and context blocks),
+                each with 'index', 'title' and 'link'
+
+        Returns:
+            A '## Citations' section listing each cited source that exists,
+            or an empty string if the answer cites none
+        """
+        by_index = {source["index"]: source for source in sources}
+        entries = [
+            CitationFormatter.format_citation_entry(index, by_index[index]["title"], by_index[index]["link"])
+            for index in CitationFormatter.cited_indices(text)
+            if index in by_index
+        ]
+        if not entries:
+            return ""
+        return "## Citations\n" + "\n".join(entries)
+
+    @staticmethod
+    def with_citation_list(text: str, sources: List[Dict[str, Any]]) -> str:
+        """Replace any model-written citation list with one rendered from the sources.
+
+        Args:
+            text: Answer text with inline [N] markers
+            sources: Citable sources (search results and context blocks)
+
+        Returns:
+            The answer body followed by the rendered citation list
+        """
+        body = CitationFormatter.strip_citation_list(text)
+        citation_list = CitationFormatter.format_citation_list(body, sources)
+        return f"{body}\n\n{citation_list}" if citation_list else body
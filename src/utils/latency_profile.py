@@ -0,0 +1,122 @@
+"""Rolling per-key latency profiles persisted between runs."""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Dict, Deque, Optional
+from src.config import Config
+
+
+class LatencyProfile:
+    """Keeps a rolling window of latency samples per key (e.g. per model).
+
+    Keys may also hold 0/1 outcome samples (see mean()), e.g. how often the
+    fastest racing agent was rejected.
+
+    Samples are persisted as JSON in the cache directory so that adaptive
+    policies such as request hedging keep learning across CLI invocations.
+    """
+
+    def __init__(self, path: str = None, window: int = None):
+        """Initialize the profile, loading any previously saved samples.
+
+        Args:
+            path: JSON file path. If not provided, uses Config.CACHE_DIR/latency_profile.json
+            window: Samples kept per key. If not provided, uses Config.LATENCY_WINDOW
+        """
+        self.path = path or os.path.join(Config.CACHE_DIR, "latency_profile.json")
+        self.window = window or Config.LATENCY_WINDOW
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def record(self, key: str, seconds: float):
+        """Add a latency sample for a key.
+
+        Args:
+            key: Profile key, e.g. "ttft:openai/gpt-4o-mini"
+            seconds: Observed latency in seconds
+        """
+        with self._lock:
+            samples = self._samples.setdefault(key, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, key: str, q: float, default: float) -> float:
+        """Return the q-th percentile (0-1) of the samples for a key.
+
+        Args:
+            key: Profile key
+            q: Percentile as a fraction, e.g. 0.9 for p90
+            default: Value returned until enough samples exist
+
+        Returns:
+            Percentile latency in seconds (nearest-rank), or default
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+
+        if len(samples) < Config.LATENCY_MIN_SAMPLES:
+            return default
+
+        rank = min(len(samples) - 1, max(0, int(round(q * len(samples))) - 1))
+        return samples[rank]
+
+    def mean(self, key: str, default: float) -> float:
+        """Return the mean of the samples for a key, e.g. a rate of 0/1 outcomes.
+
+        Args:
+            key: Profile key
+            default: Value returned while there are no samples
+
+        Returns:
+            Mean of the stored samples, or default
+        """
+        with self._lock:
+            samples = list(self._samples.get(key, ()))
+        return sum(samples) / len(samples) if samples else default
+
+    def count(self, key: str) -> int:
+        """Return how many samples are stored for a key."""
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def save(self):
+        """Persist all samples to disk (atomic replace; errors are ignored)."""
+        with self._lock:
+            data = {key: list(samples) for key, samples in self._samples.items()}
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The profile is an optimization; never fail a query over it
+            pass
+
+    def _load(self):
+        """Load samples saved by previous runs, ignoring a missing or corrupt file."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for key, samples in data.items():
+            self._samples[key] = deque(
+                (float(s) for s in samples[-self.window:]),
+                maxlen=self.window
+            )
+
+
+_shared_profile: Optional[LatencyProfile] = None
+
+
+def get_latency_profile() -> LatencyProfile:
+    """Return the process-wide latency profile."""
+    global _shared_profile
+    if _shared_profile is None:
+        _shared_profile = LatencyProfile()
+    return _shared_profile
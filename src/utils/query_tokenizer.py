@@ -0,0 +1,46 @@
+"""Word normalization shared by the semantic cache and the reranker."""
+
+import re
+from typing import List
+
+
+STOPWORDS = frozenset("""
+a an and are as at be been being but by can could did do does doing for from had has have
+how i in into is it its me my of on or our please should so tell than that the their them
+then there these this those to was we were what whats when where which who whom whose why
+will with would you your about explain show give find know
+""".split())
+
+# Question words change what is being asked ("when" vs "where was X born")
+QUESTION_WORDS = frozenset("how what whats when where which who whom whose why".split())
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def tokenize_query(query: str) -> List[str]:
+    """Split a query into normalized content words.
+
+    Lowercases, drops possessives and stopwords, and applies light plural
+    stemming so that surface variations map to the same tokens.
+
+    Args:
+        query: Raw text, e.g. a user query or a result title and snippet
+
+    Returns:
+        List of normalized tokens (may be empty)
+    """
+    return [stem_word(word) for word in split_words(query) if word and word not in STOPWORDS]
+
+
+def split_words(text: str) -> List[str]:
+    """Lowercase a text and split it into words without possessives."""
+    return [word.split("'")[0] for word in _WORD_PATTERN.findall(text.lower().replace("’", "'"))]
+
+
+def stem_word(word: str) -> str:
+    """Light plural stemming ("countries" -> "country", "states" -> "state")."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
@@ -1,19 +1,36 @@
 """Utilities for validating agent responses."""
 
-from typing import Dict, List
+import re
+from typing import Dict, List, Optional
+from src.config import Config
 from src.utils.citation_formatter import CitationFormatter
+from src.utils.token_counter import count_tokens
+
+
+_CITATION = re.compile(r'\[\d+\]')
+_HEADING = re.compile(r'^[ \t]*(?:#+[ \t]|\*\*[^*]+\*\*[ \t]*:?[ \t]*$)')
 
 
 class ResponseValidator:
     """Validates agent responses for consistency and quality."""
 
     @staticmethod
-    def validate_agent_response(response: str, agent_name: str) -> Dict[str, any]:
+    def validate_agent_response(
+        response: str,
+        agent_name: str,
+        num_sources: Optional[int] = None
+    ) -> Dict[str, any]:
         """Validate a single agent response.
 
+        Responses with inline [N] citations only (the citation list is
+        rendered locally) and responses that include their own list are
+        both accepted.
+
         Args:
             response: The agent's response text
             agent_name: Name of the agent for error reporting
+            num_sources: Number of citable sources, to reject citations of
+                sources that do not exist. If not provided, not checked
 
         Returns:
             Dict with 'valid' (bool), 'issues' (list), and 'response' (str) keys
@@ -26,7 +43,7 @@ class ResponseValidator:
             return {"valid": False, "issues": issues, "response": response}
 
         # Validate citation format
-        is_valid, citation_issues = CitationFormatter.validate_citations(response)
+        is_valid, citation_issues = CitationFormatter.validate_citations(response, num_sources)
         if not is_valid:
             issues.extend([f"{agent_name}: {issue}" for issue in citation_issues])
 
@@ -36,14 +53,84 @@ class ResponseValidator:
             "response": response
         }
 
+    @staticmethod
+    def check_quality(
+        response: str,
+        agent_name: str,
+        num_sources: Optional[int] = None,
+        required_sections: Optional[List[str]] = None,
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, any]:
+        """Cheap local quality gate for a finished answer (microseconds, no LLM call).
+
+        Runs validate_agent_response() and then checks:
+        - citation coverage: the share of statements (non-heading lines)
+          carrying an [N] marker is at least Config.GATE_MIN_CITATION_COVERAGE
+        - length bounds: at least Config.GATE_MIN_TOKENS tokens, and not so
+          close to max_tokens that the answer was probably cut off
+        - section structure: every required section heading is present
+
+        Args:
+            response: The agent's response text
+            agent_name: Name of the agent for error reporting
+            num_sources: Number of citable sources (see validate_agent_response)
+            required_sections: Section headings the answer must have, e.g.
+                'Key Points'. If not provided, structure is not checked
+            max_tokens: Output limit the answer was generated under. If not
+                provided, the upper length bound is not checked
+
+        Returns:
+            Dict with 'valid' (bool), 'issues' (list), 'response' (str),
+            'tokens' and 'citation_coverage' (0-1) keys
+        """
+        validation = ResponseValidator.validate_agent_response(response, agent_name, num_sources)
+        issues = validation["issues"]
+        body = CitationFormatter.strip_citation_list(response or "")
+
+        tokens = count_tokens(body)
+        if tokens < Config.GATE_MIN_TOKENS:
+            issues.append(f"{agent_name}: Answer too short ({tokens} tokens)")
+        elif max_tokens and tokens >= max_tokens * Config.GATE_MAX_TOKENS_FRACTION:
+            issues.append(f"{agent_name}: Answer reached its {max_tokens}-token limit and was probably cut off")
+
+        statements = [
+            line for line in body.splitlines()
+            if line.strip() and not _HEADING.match(line) and not line.rstrip().endswith(":")
+        ]
+        cited = sum(1 for line in statements if _CITATION.search(line))
+        coverage = cited / len(statements) if statements else 0.0
+        if statements and coverage < Config.GATE_MIN_CITATION_COVERAGE:
+            issues.append(f"{agent_name}: Only {cited} of {len(statements)} statements cite a source")
+
+        missing = [
+            section for section in required_sections or []
+            if not re.search(
+                rf'^[ \t]*(?:#+[ \t]*|\*\*){re.escape(section)}\b',
+                body,
+                re.IGNORECASE | re.MULTILINE
+            )
+        ]
+        if missing:
+            issues.append(f"{agent_name}: Missing sections: {', '.join(missing)}")
+
+        return {
+            "valid": len(issues) == 0,
+            "issues": issues,
+            "response": response,
+            "tokens": tokens,
+            "citation_coverage": coverage,
+        }
+
     @staticmethod
     def validate_all_responses(
-        agent_responses: List[Dict[str, str]]
+        agent_responses: List[Dict[str, str]],
+        num_sources: Optional[int] = None
     ) -> Dict[str, any]:
         """Validate all agent responses.
 
         Args:
             agent_responses: List of dicts with 'agent_name' and 'response' keys
+            num_sources: Number of citable sources (see validate_agent_response)
 
         Returns:
             Dict with 'valid' (bool), 'issues' (list), and 'responses' (list) keys
@@ -55,7 +142,7 @@ class ResponseValidator:
             agent_name = response_data.get("agent_name", "Unknown Agent")
             response = response_data.get("response", "")
 
-            validation = ResponseValidator.validate_agent_response(response, agent_name)
+            validation = ResponseValidator.validate_agent_response(response, agent_name, num_sources)
             all_issues.extend(validation["issues"])
             validated_responses.append(response_data)
 
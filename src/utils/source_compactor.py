@@ -0,0 +1,96 @@
+"""Compact source headers for agent prompts (short IDs instead of full URLs)."""
+
+import re
+from typing import Dict, Any
+from urllib.parse import urlsplit
+
+
+_HOST_PREFIXES = ("www.", "m.", "amp.")
+# Separators between a page title and the site name appended to it
+_TITLE_SUFFIX = re.compile(r"\s+(?:[-|–—·:]|::)\s+([^-|–—·:]{1,40})$")
+_ALNUM = re.compile(r"[^a-z0-9]")
+
+MAX_TITLE_WORDS = 12
+MAX_SUFFIX_WORDS = 4
+
+
+def source_label(url: str) -> str:
+    """Return the short site label for a URL, e.g. 'en.wikipedia.org'.
+
+    The scheme, 'www.'/'m.'/'amp.' prefixes, path and query string
+    (including any tracking parameters) are dropped.
+
+    Args:
+        url: Result URL
+
+    Returns:
+        The host part of the URL, or the URL itself if it has no host
+    """
+    try:
+        host = urlsplit(url.strip()).hostname or ""
+    except ValueError:
+        host = ""
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    return host or url.strip()
+
+
+def compact_title(title: str, label: str = "") -> str:
+    """Shorten a result title for the prompt.
+
+    A trailing site name (" - Wikipedia", " | Reuters") is dropped when it
+    repeats the source label or is a short '|'-separated suffix, and very
+    long titles are cut to MAX_TITLE_WORDS words.
+
+    Args:
+        title: Result title
+        label: Source label from source_label()
+
+    Returns:
+        The shortened title
+    """
+    title = title.strip()
+    match = _TITLE_SUFFIX.search(title)
+    if match and match.start() > 0:
+        suffix = match.group(1).strip()
+        key = _ALNUM.sub("", suffix.lower())
+        site_labels = label.lower().split(".")
+        # 'en.wikipedia.org' -> 'wikipedia', 'bbc.co.uk' -> 'bbc'
+        site_name = max(site_labels[:-1] or site_labels, key=len)
+        repeats_site = bool(key and site_name) and (key in _ALNUM.sub("", label.lower()) or site_name in key)
+        if repeats_site or (" | " in match.group(0) and len(suffix.split()) <= MAX_SUFFIX_WORDS):
+            title = title[:match.start()].rstrip()
+
+    words = title.split()
+    if len(words) > MAX_TITLE_WORDS:
+        title = " ".join(words[:MAX_TITLE_WORDS]) + "…"
+    return title
+
+
+def format_source_header(source: Dict[str, Any], label: str = "", compact: bool = True) -> str:
+    """Format the header lines of one source for the prompt, up to 'Snippet: '.
+
+    The citation index is the source's short ID: the model cites [N], and
+    the real link is looked up locally by index when the citation list is
+    rendered, so the prompt only needs the site name.
+
+    Args:
+        source: Search result or context block with 'index', 'title' and 'link'
+        label: Optional kind label shown before the title, e.g. 'related question'
+        compact: Use the compact form; False gives the full title and URL
+
+    Returns:
+        Header text ending with 'Snippet: '
+    """
+    kind = f"({label}) " if label else ""
+    if not compact:
+        return (
+            f"[{source['index']}] {kind}{source['title']}\n"
+            f"URL: {source['link']}\n"
+            f"Snippet: "
+        )
+
+    site = source_label(source["link"])
+    return f"[{source['index']}] {kind}{compact_title(source['title'], site)} ({site})\nSnippet: "
@@ -0,0 +1,114 @@
+"""Early stopping of streamed answers once the answer body is complete."""
+
+import re
+from src.utils.token_counter import count_tokens
+
+
+# Sent as API stop sequences: generation ends before a citation list header.
+# Providers match stops as plain substrings, so each one includes the line
+# break after the header: "\n## Sources" alone would also end the answer at
+# a body heading such as "## Sources of Revenue". Other wordings are left to
+# the full-line check in EarlyStopGuard.
+STOP_SEQUENCES = ["\n## Citations\n", "\nCitations:\n", "\n## References\n", "\n## Sources\n"]
+
+# Any citation/reference list header line (markdown heading, bold or plain, optional colon)
+_MARKER_LINE = re.compile(
+    r"^[ \t]*(?:#+[ \t]*)?\**(?:citations?|references|sources)\**[ \t]*:?\**[ \t]*$",
+    re.IGNORECASE
+)
+_MARKER_WORDS = ("citations", "references", "sources")
+_LINE_PIECES = re.compile(r"[^\n]*\n|[^\n]+")
+
+STOP_CITATIONS = "citations"
+STOP_LENGTH = "length"
+
+
+def _could_become_marker(line: str) -> bool:
+    """Return True if an incomplete line may still turn into a citation header."""
+    core = line.strip().lstrip("#").strip().strip("*").strip().rstrip(":").strip().lower()
+    return not core or any(word.startswith(core) for word in _MARKER_WORDS)
+
+
+class EarlyStopGuard:
+    """Watches a streamed answer and decides when generation can stop.
+
+    Generation stops on a citation list header (the list is rendered
+    locally, so anything after it is wasted output) and, optionally, at the
+    first line break after a soft output cap, so a long answer to a simple
+    question ends at a clean paragraph or bullet rather than mid-sentence
+    at max_tokens.
+
+    Only the start of a line that could still become a header ('#',
+    '**Cit', 'Sour') is held back; all other text passes through
+    immediately, so streaming stays token by token.
+    """
+
+    def __init__(self, soft_cap_tokens: int = None):
+        """Initialize the guard.
+
+        Args:
+            soft_cap_tokens: Stop at the first line break after this many
+                output tokens. If not provided, only citation headers stop
+                the stream
+        """
+        self.soft_cap_tokens = soft_cap_tokens
+        self.tokens = 0
+        self.stopped = False
+        self.reason = None
+        self._pending = ""
+        self._line_is_body = False
+        self._line_is_heading = False
+
+    def feed(self, delta: str) -> str:
+        """Consume one streamed delta.
+
+        Args:
+            delta: Text delta from the model
+
+        Returns:
+            The text that may be shown now (possibly empty). Once self.stopped
+            is True, the caller should stop consuming the stream.
+        """
+        if self.stopped:
+            return ""
+
+        out = []
+        for piece in _LINE_PIECES.findall(delta):
+            complete = piece.endswith("\n")
+            if self._line_is_body:
+                out.append(piece)
+            else:
+                self._pending += piece
+                line = self._pending.rstrip("\n")
+                if complete and _MARKER_LINE.match(line):
+                    self._stop(STOP_CITATIONS)
+                    break
+                if complete or not _could_become_marker(line):
+                    self._line_is_heading = line.lstrip().startswith("#")
+                    out.append(self._pending)
+                    self._pending = ""
+                    self._line_is_body = True
+
+            self.tokens += count_tokens(piece)
+            if complete:
+                self._line_is_body = False
+                if (
+                    self.soft_cap_tokens
+                    and self.tokens >= self.soft_cap_tokens
+                    and not self._line_is_heading
+                ):
+                    self._stop(STOP_LENGTH)
+                    break
+        return "".join(out)
+
+    def flush(self) -> str:
+        """Return held-back text once the stream has ended on its own."""
+        pending, self._pending = self._pending, ""
+        if self.stopped or _MARKER_LINE.match(pending.rstrip("\n")):
+            return ""
+        return pending
+
+    def _stop(self, reason: str):
+        self.stopped = True
+        self.reason = reason
+        self._pending = ""
@@ -0,0 +1,91 @@
+"""Local, offline token counting and truncation for prompt budgeting."""
+
+import re
+from typing import List
+
+
+# GPT-style pre-tokenization: contractions, words with their leading space,
+# digit groups of up to three, punctuation runs (including '_') and
+# whitespace, then a catch-all so that the pieces always rejoin to the text
+_PIECE_PATTERN = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+|."
+)
+
+# Letters per token for word pieces longer than a common whole-word token
+_CHARS_PER_WORD_TOKEN = 6
+
+
+def _piece_tokens(piece: str) -> int:
+    """Approximate the BPE token count of one pre-tokenized piece."""
+    stripped = piece.strip()
+    if not stripped:
+        # Runs of whitespace/newlines merge into a single token
+        return 1
+    if stripped[0].isalpha():
+        return 1 + (len(stripped) - 1) // _CHARS_PER_WORD_TOKEN
+    if stripped[0].isdigit():
+        return 1
+    # Punctuation merges in pairs ("##", "](", ".\n")
+    return (len(stripped) + 1) // 2
+
+
+def _split_pieces(text: str) -> List[str]:
+    """Pre-tokenize text, checking that the pieces rejoin to exactly the text.
+
+    Raises:
+        ValueError: If the pattern skipped part of the text (a bug in _PIECE_PATTERN)
+    """
+    pieces = _PIECE_PATTERN.findall(text)
+    # findall never overlaps, so equal total length means nothing was skipped
+    if sum(len(piece) for piece in pieces) != len(text):
+        raise ValueError(f"Token pieces do not cover the text: {text[:40]!r}")
+    return pieces
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens the way a GPT-style BPE tokenizer roughly would.
+
+    Runs locally with no vocabulary download. Common English words count as
+    one token, long words as one token per ~6 letters, digit groups of up
+    to three as one token and punctuation as one token per two characters.
+    This approximates cl100k/o200k counts for English prose and search
+    snippets, which is enough for budgeting; it is not exact.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Approximate number of tokens
+    """
+    if not text:
+        return 0
+    return sum(_piece_tokens(piece) for piece in _split_pieces(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, suffix: str = "…") -> str:
+    """Cut text to at most max_tokens tokens, at a word boundary.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token limit (including the suffix)
+        suffix: Appended when the text is cut
+
+    Returns:
+        The original text if it fits, otherwise its longest prefix that fits
+        followed by the suffix (empty if nothing fits)
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - count_tokens(suffix)
+    kept: List[str] = []
+    used = 0
+    for piece in _split_pieces(text):
+        cost = _piece_tokens(piece)
+        if used + cost > budget:
+            break
+        kept.append(piece)
+        used += cost
+
+    prefix = "".join(kept).rstrip()
+    return prefix + suffix if prefix else ""